@@ -0,0 +1,11 @@
+"""Benchmarks for the Battleship game.
+
+Run every benchmark with ``python -m benchmarks``; see ``--help`` for
+saving results as a JSON baseline and comparing against a previous one.
+The ``geometry`` suite times density computation on 10x10, 15x15 and
+20x20 boards.
+``python -m benchmarks.allocations`` reports the CoordinateSets allocated
+per game, ``python -m benchmarks.imports`` the start-up cost of importing
+the game and its precomputed tables, and ``python -m benchmarks.server_load``
+the sessions per second and move latency of the game server.
+"""
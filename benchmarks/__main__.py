@@ -0,0 +1,59 @@
+"""Run the benchmark suite.
+
+Usage
+-----
+python -m benchmarks [--save BASELINE.json] [--compare BASELINE.json]
+"""
+import argparse
+import sys
+
+from benchmarks import (bench_bitboard, bench_boards, bench_games,
+                        bench_geometry, runner)
+
+
+SUITES = {
+    "bitboard": bench_bitboard,
+    "boards": bench_boards,
+    "games": bench_games,
+    "geometry": bench_geometry,
+}
+
+
+def main() -> int:
+    """Run the selected suites and compare against a baseline."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("suites", nargs="*", metavar="SUITE",
+                        help=f"suites to run: {', '.join(SUITES)} "
+                             "(default: all)")
+    parser.add_argument("--save", metavar="PATH",
+                        help="write results to a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="flag regressions against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown ratio flagged as a regression")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timing repeats per benchmark")
+    args = parser.parse_args()
+    for suite in args.suites:
+        if suite not in SUITES:
+            parser.error(f"unknown suite: {suite}")
+
+    benchmarks = []
+    for suite in args.suites or SUITES:
+        benchmarks += SUITES[suite].benchmarks()
+    results = runner.run(benchmarks, repeat=args.repeat)
+
+    if args.save:
+        runner.save(results, args.save)
+    if args.compare:
+        print()
+        regressions = runner.compare(results, runner.load(args.compare),
+                                     args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) found")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Allocation benchmark of the CoordinateSets churned through per game.
+
+Usage
+-----
+python -m benchmarks.allocations [--games N]
+
+Counts every CoordinateSet created while playing seeded CPU vs CPU games,
+and uses `tracemalloc` to measure the bytes each set occupies and the peak
+memory traced per game.
+"""
+import argparse
+import random
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import game.bitboard as bitboard
+from benchmarks.bench_games import LEVEL_GAMES
+from game import CPU, kernel
+
+
+SET_CLASSES = [bitboard.CoordinateSet, bitboard.FrozenCoordinateSet]
+
+
+@contextmanager
+def count_sets() -> Iterator[List[int]]:
+    """Count the CoordinateSets created within the context.
+
+    Yields a one item list holding the running count.
+    """
+    created = [0]
+    patched = []
+    for cls in SET_CLASSES:
+        init = cls.__dict__['__init__']
+        new = cls.__dict__['_new'].__func__
+
+        def counted_init(self, *args, __init=init):
+            created[0] += 1
+            __init(self, *args)
+
+        def counted_new(cls, mask, __new=new):
+            created[0] += 1
+            return __new(cls, mask)
+
+        patched.append((cls, init, cls.__dict__['_new']))
+        cls.__init__ = counted_init
+        cls._new = classmethod(counted_new)
+    try:
+        yield created
+    finally:
+        for cls, init, new in patched:
+            cls.__init__ = init
+            cls._new = new
+
+
+def set_size(num_sets: int = 10_000) -> float:
+    """Return the bytes traced per CoordinateSet."""
+    sets = [None] * num_sets
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(num_sets):
+        sets[i] = bitboard.CoordinateSet(bitboard.BB_ALL)
+    size = (tracemalloc.get_traced_memory()[0] - before) / num_sets
+    tracemalloc.stop()
+    return size
+
+
+def peak_memory(level: int, games: int) -> float:
+    """Return the mean peak bytes traced while playing a game."""
+    cpus = [CPU('cpu1', level), CPU('cpu2', level)]
+    peak = 0
+    tracemalloc.start()
+    for seed in range(games):
+        random.seed(seed)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        kernel.play_game(*cpus)
+        peak += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return peak / games
+
+
+def sets_created(level: int, games: int) -> float:
+    """Return the mean CoordinateSets created per game."""
+    cpus = [CPU('cpu1', level), CPU('cpu2', level)]
+    with count_sets() as created:
+        for seed in range(games):
+            random.seed(seed)
+            kernel.play_game(*cpus)
+    return created[0] / games
+
+
+def main() -> int:
+    """Print the CoordinateSet allocations per game by CPU level."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.allocations")
+    parser.add_argument("--games", type=int,
+                        help="games per level (default: as the games suite)")
+    args = parser.parse_args()
+
+    size = set_size()
+    print(f"bytes per CoordinateSet: {size:.1f}")
+    print(f"{'level':<7}{'sets/game':>12}{'set bytes/game':>16}"
+          f"{'peak bytes/game':>17}")
+    for level, games in LEVEL_GAMES.items():
+        games = args.games or games
+        created = sets_created(level, games)
+        print(f"{level:<7}{created:>12,.0f}{created * size:>16,.0f}"
+              f"{peak_memory(level, games):>17,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Micro-benchmarks for the `game.bitboard` primitives."""
+import random
+from typing import List
+
+import game.bitboard as bitboard
+from benchmarks.runner import Benchmark
+
+
+KERNELS = ["popcount", "flip_vertical", "flip_horizontal", "flip_diagonal",
+           "flip_anti_diagonal"]
+
+
+def cross_check(rng: random.Random, boards: int = 1_000) -> None:
+    """Check every bit kernel against its reference implementation."""
+    for _ in range(boards):
+        bb = rng.getrandbits(100)
+        for name in KERNELS:
+            kernel = getattr(bitboard, name)
+            reference = getattr(bitboard, f"{name}_reference")
+            if kernel(bb) != reference(bb):
+                raise AssertionError(f"bitboard.{name} differs from its "
+                                     f"reference on {bb:#x}")
+
+
+def benchmarks() -> List[Benchmark]:
+    """Return the bitboard benchmarks."""
+    rng = random.Random(0)
+    cross_check(rng)
+    bb = rng.getrandbits(100) & rng.getrandbits(100)
+    other = rng.getrandbits(100)
+    coords = bitboard.CoordinateSet(bb)
+    others = bitboard.CoordinateSet(other)
+    scratch = bitboard.CoordinateSet(bb)
+    frozen = bitboard.FrozenCoordinateSet(other)
+
+    cases = [
+        ("bitboard.popcount", lambda: bitboard.popcount(bb), 10_000),
+        ("bitboard.scan_forward", lambda: list(bitboard.scan_forward(bb)),
+         2_000),
+        ("bitboard.flip_vertical", lambda: bitboard.flip_vertical(bb), 500),
+        ("bitboard.flip_horizontal", lambda: bitboard.flip_horizontal(bb),
+         500),
+        ("bitboard.flip_diagonal", lambda: bitboard.flip_diagonal(bb), 500),
+        ("bitboard.flip_anti_diagonal",
+         lambda: bitboard.flip_anti_diagonal(bb), 200),
+        ("bitboard.popcount_reference",
+         lambda: bitboard.popcount_reference(bb), 10_000),
+        ("bitboard.flip_vertical_reference",
+         lambda: bitboard.flip_vertical_reference(bb), 500),
+        ("bitboard.flip_horizontal_reference",
+         lambda: bitboard.flip_horizontal_reference(bb), 500),
+        ("bitboard.flip_diagonal_reference",
+         lambda: bitboard.flip_diagonal_reference(bb), 500),
+        ("bitboard.flip_anti_diagonal_reference",
+         lambda: bitboard.flip_anti_diagonal_reference(bb), 200),
+        ("bitboard.near_attacks",
+         lambda: bitboard.near_attacks(bitboard.E5, bb, bitboard.DELTAS),
+         2_000),
+        ("CoordinateSet.__or__", lambda: coords | others, 10_000),
+        ("CoordinateSet.__or__[int]", lambda: coords | other, 10_000),
+        ("CoordinateSet.__ior__", lambda: scratch.__ior__(others), 10_000),
+        ("CoordinateSet.__and__", lambda: coords & others, 10_000),
+        ("CoordinateSet.__sub__", lambda: coords - others, 10_000),
+        ("CoordinateSet.isdisjoint", lambda: coords.isdisjoint(others),
+         10_000),
+        ("CoordinateSet.issubset", lambda: coords.issubset(others), 10_000),
+        ("CoordinateSet.__eq__", lambda: coords == others, 10_000),
+        ("CoordinateSet.__iter__", lambda: list(coords), 2_000),
+        ("FrozenCoordinateSet.__hash__", lambda: hash(frozen), 10_000),
+    ]
+    return [Benchmark(*case) for case in cases]
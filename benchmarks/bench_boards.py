@@ -0,0 +1,75 @@
+"""Board-level benchmarks on fixed mid-game positions.
+
+Queries are timed without the transposition cache, except for the cases
+marked ``cached``.  The ``resolve`` cases play a fixed sequence of salvos
+on fresh boards, shot by shot and in bulk.
+"""
+import copy
+import random
+from typing import Callable, List
+
+import game.bitboard as bitboard
+from benchmarks.positions import positions
+from benchmarks.runner import Benchmark
+from game.gameboards import AttackBoard, ShipBoard, ship_possibilities
+from game.layouts import random_layout
+from game.ship import CLASSIC_FLEET, Ship
+
+SALVO_SIZE = 5
+SALVOS = 20
+
+
+def _resolve(bulk: bool, seed: int = 0) -> Callable[[], None]:
+    """Return a callable resolving `SALVOS` salvos of `SALVO_SIZE` shots
+    against a fixed fleet, with `ShipBoard.resolve_salvo` if `bulk`.
+    """
+    rng = random.Random(seed)
+    layout = random_layout(CLASSIC_FLEET.lengths, rng)
+    coords = list(bitboard.COORDINATES)
+    rng.shuffle(coords)
+    salvos = [coords[i:i + SALVO_SIZE]
+              for i in range(0, SALVO_SIZE * SALVOS, SALVO_SIZE)]
+    masks = [bitboard.into_mask(salvo) for salvo in salvos]
+
+    def boards():
+        ship_board = ShipBoard()
+        for ship, mask in zip(CLASSIC_FLEET, layout):
+            ship_board.add_ship_mask(ship, mask)
+        return ship_board, AttackBoard()
+
+    def per_shot() -> None:
+        ship_board, attack_board = boards()
+        for salvo in salvos:
+            for coord in salvo:
+                attack_board.add_peg(coord, ship_board.attack_result(coord))
+
+    def per_salvo() -> None:
+        ship_board, attack_board = boards()
+        for mask in masks:
+            attack_board.add_salvo(ship_board.resolve_salvo(mask))
+    return per_salvo if bulk else per_shot
+
+
+def benchmarks() -> List[Benchmark]:
+    """Return the board benchmarks."""
+    carrier = Ship('Carrier')
+    cases = []
+    for name, board in positions().items():
+        cached = copy.copy(board)
+        board.transpositions = None
+        cases += [
+            (f"ship_possibilities[{name}]",
+             lambda board=board: ship_possibilities(carrier, board.attacked),
+             200),
+            (f"ship_densities[{name}]",
+             lambda board=board: board.ship_densities(), 20),
+            (f"max_ship_densities[{name}]",
+             lambda board=board: board.max_ship_densities(), 50),
+            (f"get_ship_attacks[{name}]",
+             lambda board=board: board.get_ship_attacks(), 500),
+            (f"max_ship_densities[{name}, cached]",
+             lambda board=cached: board.max_ship_densities(), 500),
+        ]
+    cases += [("resolve[per shot]", _resolve(False), 20),
+              ("resolve[salvo]", _resolve(True), 20)]
+    return [Benchmark(*case) for case in cases]
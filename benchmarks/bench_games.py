@@ -0,0 +1,36 @@
+"""End-to-end benchmarks of full CPU vs CPU games per CPU level, in the
+classic and salvo variants.
+"""
+import random
+from typing import List
+
+from benchmarks.runner import Benchmark
+from game import CPU, kernel
+
+
+LEVEL_GAMES = {0: 20, 1: 20, 2: 20, 3: 10, 4: 2}
+SALVO_GAMES = {0: 20, 1: 20, 2: 20, 3: 10}
+
+
+def _games(level: int, games: int, play_game=kernel.play_game):
+    """Return a callable playing `games` seeded games at `level`."""
+    cpus = [CPU('cpu1', level), CPU('cpu2', level)]
+
+    def play() -> None:
+        for seed in range(games):
+            random.seed(seed)
+            play_game(*cpus)
+    return play
+
+
+def benchmarks() -> List[Benchmark]:
+    """Return the games-per-second benchmarks, one per CPU level and
+    variant.
+    """
+    return ([Benchmark(f"game[level {level}]", _games(level, games), 1,
+                       games)
+             for level, games in LEVEL_GAMES.items()]
+            + [Benchmark(f"game[salvo, level {level}]",
+                         _games(level, games, kernel.play_salvo_game), 1,
+                         games)
+               for level, games in SALVO_GAMES.items()])
@@ -0,0 +1,57 @@
+"""Benchmarks of how density computation scales with the board size.
+
+Each size is timed on a midgame position with a quarter of the board
+attacked, without the transposition cache, and over full level 3 games.
+"""
+import random
+from typing import List
+
+from benchmarks.positions import attack_board
+from benchmarks.runner import Benchmark
+from game import CPU, kernel
+from game.gameboards import AttackBoard
+from game.geometry import Geometry
+
+
+SIZES = [10, 15, 20]
+ATTACKED = 0.25
+GAMES = 5
+
+
+def _games(geometry: Geometry, games: int):
+    """Return a callable playing `games` seeded level 3 games."""
+    cpus = [CPU('cpu1', 3, geometry=geometry),
+            CPU('cpu2', 3, geometry=geometry)]
+
+    def play() -> None:
+        for seed in range(games):
+            random.seed(seed)
+            kernel.play_game(*cpus)
+    return play
+
+
+def benchmarks() -> List[Benchmark]:
+    """Return the board size benchmarks."""
+    cases = []
+    for size in SIZES:
+        geometry = Geometry(size)
+        board = attack_board(int(ATTACKED * geometry.size),
+                             geometry=geometry)
+        board.transpositions = None
+        name = f"{size}x{size}"
+        cases += [
+            Benchmark(f"new_board[{name}]",
+                      lambda geometry=geometry: AttackBoard(
+                          geometry=geometry), 20),
+            Benchmark(f"ship_densities[{name}]",
+                      lambda board=board: board.ship_densities(), 20),
+            Benchmark(f"max_ship_densities[{name}]",
+                      lambda board=board: board.max_ship_densities(), 50),
+            Benchmark(f"density_counter[{name}]",
+                      lambda board=board: board.density_counter(), 50),
+            Benchmark(f"get_ship_attacks[{name}]",
+                      lambda board=board: board.get_ship_attacks(), 500),
+            Benchmark(f"game[level 3, {name}]", _games(geometry, GAMES), 1,
+                      GAMES),
+        ]
+    return cases
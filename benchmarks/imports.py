@@ -0,0 +1,79 @@
+"""Import-time benchmark of the game package.
+
+Usage
+-----
+python -m benchmarks.imports [--repeat N]
+
+Times fresh interpreters importing `game`, then using every precomputed
+table, loaded from the packaged table file or built from scratch, against
+the bare interpreter start-up.  Each is the median of `--repeat` runs.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+
+USE_TABLES = ("import game.symmetry; from game import tables; "
+              "[tables.get(name) for name in tables.names()]")
+
+CASES: Dict[str, str] = {
+    "interpreter": "pass",
+    "import game": "import game",
+    "import game + load tables": f"import game; {USE_TABLES}",
+    "import game + build tables": ("import game; from game import tables; "
+                                   f"tables.PATH = None; {USE_TABLES}"),
+}
+
+TIMER = """
+import time
+_start = time.perf_counter()
+{code}
+print(time.perf_counter() - _start)
+"""
+
+
+def time_startup(code: str, repeat: int) -> List[float]:
+    """Return the seconds taken by `code` in each of `repeat` fresh
+    interpreters, including interpreter start-up.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True,
+                       stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def time_code(code: str, repeat: int) -> List[float]:
+    """Return the seconds taken by `code` alone in each of `repeat` fresh
+    interpreters.
+    """
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", TIMER.format(code=code)],
+                             check=True, capture_output=True, text=True)
+        times.append(float(out.stdout))
+    return times
+
+
+def main() -> int:
+    """Print the median start-up and import times of each case."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.imports")
+    parser.add_argument("--repeat", type=int, default=20,
+                        help="fresh interpreters per case")
+    args = parser.parse_args()
+
+    print(f"{'case':<28}{'process ms':>12}{'in-process ms':>15}")
+    for name, code in CASES.items():
+        process = statistics.median(time_startup(code, args.repeat))
+        in_process = statistics.median(time_code(code, args.repeat))
+        print(f"{name:<28}{process * 1e3:>12.1f}{in_process * 1e3:>15.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
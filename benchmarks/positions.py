@@ -0,0 +1,40 @@
+"""Fixed game positions shared by the benchmarks."""
+import random
+from typing import Dict
+
+from game import CPU
+from game.gameboards import AttackBoard
+from game.geometry import CLASSIC_GEOMETRY, Geometry
+from game.kernel import place_ships
+
+
+POSITION_SHOTS = {
+    "opening": 0,
+    "early": 10,
+    "midgame": 25,
+    "late": 45,
+}
+
+
+def attack_board(shots: int, seed: int = 0, level: int = 2,
+                 geometry: Geometry = CLASSIC_GEOMETRY) -> AttackBoard:
+    """Return the AttackBoard of a CPU after `shots` attacks on a random
+    fleet.
+    """
+    random.seed(seed)
+    attacker = CPU('attacker', level, geometry=geometry)
+    defender = CPU('defender', geometry=geometry)
+    place_ships(attacker)
+    place_ships(defender)
+    for _ in range(shots):
+        if defender.is_dead():
+            break
+        coord = attacker.choose_index()
+        attacker.add_attack_peg(coord, defender.attacked(coord))
+    return attacker.attack_board
+
+
+def positions(seed: int = 0) -> Dict[str, AttackBoard]:
+    """Return each named benchmark position."""
+    return {name: attack_board(shots, seed)
+            for name, shots in POSITION_SHOTS.items()}
@@ -0,0 +1,95 @@
+"""Timing, storage and comparison of benchmark results."""
+import json
+import platform
+import timeit
+from typing import Callable, Dict, List, NamedTuple
+
+
+class Benchmark(NamedTuple):
+    """A named callable to time.
+
+    Attributes:
+    -----------
+    name : str
+        Unique benchmark name.
+    func : Callable[[], object]
+        The code being timed.
+    number : int
+        Calls per timing repeat.
+    items : int
+        Items (e.g. games) processed per call.
+    """
+    name: str
+    func: Callable[[], object]
+    number: int
+    items: int = 1
+
+
+Results = Dict[str, float]
+
+
+def time_benchmark(benchmark: Benchmark, repeat: int = 5) -> float:
+    """Return the best seconds per item over `repeat` timings."""
+    timer = timeit.Timer(benchmark.func)
+    best = min(timer.repeat(repeat=repeat, number=benchmark.number))
+    return best / (benchmark.number * benchmark.items)
+
+
+def run(benchmarks: List[Benchmark], repeat: int = 5,
+        verbose: bool = True) -> Results:
+    """Time every benchmark, returning seconds per item by name."""
+    results = {}
+    for benchmark in benchmarks:
+        seconds = time_benchmark(benchmark, repeat)
+        results[benchmark.name] = seconds
+        if verbose:
+            print(f"{benchmark.name:<40} {format_time(seconds)}"
+                  f" {1 / seconds:>14,.1f}/s")
+    return results
+
+
+def format_time(seconds: float) -> str:
+    """Format a duration with a readable unit."""
+    for unit, scale in [("s", 1), ("ms", 1e-3), ("us", 1e-6)]:
+        if seconds >= scale:
+            return f"{seconds / scale:>9.3f} {unit:<2}"
+    return f"{seconds / 1e-9:>9.3f} ns"
+
+
+def save(results: Results, path: str) -> None:
+    """Write results to a JSON baseline file."""
+    baseline = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load(path: str) -> Results:
+    """Read results from a JSON baseline file."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(results: Results, baseline: Results,
+            threshold: float = 0.10) -> List[str]:
+    """Print each benchmark against `baseline` and return the names of
+    benchmarks more than `threshold` slower.
+    """
+    regressions = []
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+        ratio = seconds / baseline[name]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "faster"
+        print(f"{name:<40} {format_time(baseline[name])} -> "
+              f"{format_time(seconds)} {ratio:>6.2f}x {flag}")
+    return regressions
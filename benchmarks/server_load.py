@@ -0,0 +1,151 @@
+"""Load generator for the game server.
+
+Usage
+-----
+python -m benchmarks.server_load [--sessions N] [--concurrency N]
+                                 [--level LEVEL] [--port PORT] [--workers N]
+
+Opens `--concurrency` connections at a time to a `game.server`, each
+playing one game against a CPU of `--level` with random shots, until
+`--sessions` games are done.  Reports the sessions completed per second
+and the latency of each move: from sending a shot until the server asks
+for the next, which includes the CPU's reply.  Without `--port`, a server
+with `--workers` worker processes is started on a free port for the run.
+"""
+import argparse
+import asyncio
+import random
+import signal
+import sys
+import time
+from typing import Optional, Tuple
+
+from game.bitboard import COORDINATE_NAMES
+from game.server import HOST, LEVEL
+from game.timing import LatencyHistogram, format_ns
+
+
+SESSIONS = 200
+CONCURRENCY = 50
+
+
+async def play_session(host: str, port: int, level: int,
+                       latencies: LatencyHistogram) -> None:
+    """Connect and play one game with random shots, recording the
+    latency of each move.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    targets = list(COORDINATE_NAMES)
+    random.shuffle(targets)
+    start = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("Server closed the connection")
+            words = line.decode().split()
+            if words[0] == 'READY':
+                if start is not None:
+                    break
+                writer.write(f'NEW {level}\n'.encode())
+            elif words[0] == 'PLACE':
+                writer.write(b'PLACE RANDOM\n')
+            elif words[0] in ('TURN', 'WIN', 'LOSE', 'DRAW'):
+                if start is not None:
+                    latencies.add(time.perf_counter_ns() - start)
+                if words[0] != 'TURN':
+                    continue
+                writer.write(f'FIRE {targets.pop()}\n'.encode())
+                start = time.perf_counter_ns()
+            elif words[0] == 'ERR':
+                raise RuntimeError(line.decode().strip())
+            await writer.drain()
+        writer.write(b'QUIT\n')
+        await writer.drain()
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def generate_load(host: str, port: int, sessions: int,
+                        concurrency: int, level: int
+                        ) -> Tuple[float, LatencyHistogram]:
+    """Play `sessions` games over at most `concurrency` connections at a
+    time, returning the seconds taken and the move latencies.
+    """
+    latencies = LatencyHistogram()
+    remaining = sessions
+
+    async def client() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await play_session(host, port, level, latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies
+
+
+async def start_server(workers: Optional[int]
+                       ) -> Tuple[asyncio.subprocess.Process, int]:
+    """Start a server on a free port, returning its process and port."""
+    args = [sys.executable, '-m', 'game.server', '--port', '0']
+    if workers is not None:
+        args += ['--workers', str(workers)]
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE)
+    line = (await process.stdout.readline()).decode()
+    if not line.startswith('Listening on '):
+        process.kill()
+        raise RuntimeError("Server failed to start")
+    return process, int(line.rsplit(':', 1)[1])
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Run the load against the server of `args`, starting one if no
+    port is given.
+    """
+    process = None
+    port = args.port
+    if port is None:
+        process, port = await start_server(args.workers)
+    try:
+        elapsed, latencies = await generate_load(
+            args.host, port, args.sessions, args.concurrency, args.level)
+    finally:
+        if process is not None:
+            # The server shuts its worker pool down on an interrupt.
+            process.send_signal(signal.SIGINT)
+            await process.wait()
+    print(f"{args.sessions} sessions at level {args.level}, "
+          f"{args.concurrency} concurrent: {elapsed:.2f} s, "
+          f"{args.sessions / elapsed:.1f} sessions/s")
+    print(f"{latencies.count} moves: "
+          f"mean {format_ns(latencies.mean())}, "
+          + ", ".join(f"p{p} {format_ns(latencies.percentile(p))}"
+                      for p in (50, 90, 99))
+          + f", max {format_ns(latencies.max)}")
+
+
+def main() -> int:
+    """Generate load and print the throughput and move latencies."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.server_load")
+    parser.add_argument("--sessions", type=int, default=SESSIONS,
+                        help="games to play")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help="connections open at a time")
+    parser.add_argument("--level", type=int, default=LEVEL,
+                        help="CPU level played against")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int,
+                        help="port of a running server (default: start one)")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes of the server started")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Module for analysing archives of game records.
+
+Record files are split into byte ranges of whole games, which worker
+processes reduce to per-level counters; the counters of every range are then
+merged.  Statistics are kept per level of the player taking the shots:
+
+- shots and hits on each coordinate,
+- the turn on which each ship type is sunk,
+- the turn of the first hit of each game.
+
+Usage
+-----
+python -m game.analytics RECORDS [--workers N]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Optional
+
+from game.archive import ByteRange, GameArchive, read_range
+from game.gameboards import render_board
+from game.records import MISS, decode_result
+from game.ship import SHIP_NAMES, SHIPS
+
+
+CHUNK_SIZE = 2_000
+MAX_TURNS = 101
+
+SHADES = ' .:-=+*#%@'
+
+
+class LevelStats:
+    """Counters over the shots of every player of one CPU level.
+
+    Attributes:
+    -----------
+    games : int
+        Games played by a player of the level.
+    shots : List[int]
+        Shots at each coordinate.
+    hits : List[int]
+        Hits on each coordinate.
+    sink_turns : List[List[int]]
+        Per ship type, the number of games it was sunk on each turn.
+    first_hits : List[int]
+        Number of games whose first hit came on each turn.
+    """
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.shots = [0] * 100
+        self.hits = [0] * 100
+        self.sink_turns = [[0] * (MAX_TURNS + 1) for _ in SHIPS]
+        self.first_hits = [0] * (MAX_TURNS + 1)
+
+    def merge(self, other: 'LevelStats') -> None:
+        """Add the counters of `other`."""
+        self.games += other.games
+        _add(self.shots, other.shots)
+        _add(self.hits, other.hits)
+        for ship_type in SHIPS:
+            _add(self.sink_turns[ship_type], other.sink_turns[ship_type])
+        _add(self.first_hits, other.first_hits)
+
+    def hit_rates(self) -> List[float]:
+        """Return the share of shots at each coordinate which hit."""
+        return [hits / shots if shots else 0.0
+                for shots, hits in zip(self.shots, self.hits)]
+
+    def mean_sink_turn(self, ship_type: int) -> float:
+        """Return the mean turn on which a ship type is sunk."""
+        return _mean(self.sink_turns[ship_type])
+
+    def mean_first_hit(self) -> float:
+        """Return the mean turn of the first hit."""
+        return _mean(self.first_hits)
+
+
+def _add(counts: List[int], other: List[int]) -> None:
+    """Add `other` to `counts` element-wise."""
+    for i, count in enumerate(other):
+        counts[i] += count
+
+
+def _mean(turn_counts: List[int]) -> float:
+    """Return the mean of a histogram of turns."""
+    total = sum(turn_counts)
+    if not total:
+        return 0.0
+    return sum(turn * count for turn, count in enumerate(turn_counts)) / total
+
+
+class ArchiveStats:
+    """Per-level statistics of an archive of game records."""
+
+    def __init__(self) -> None:
+        self.levels: Dict[int, LevelStats] = {}
+
+    def level(self, level: int) -> LevelStats:
+        """Return the statistics of `level`, creating them if needed."""
+        if level not in self.levels:
+            self.levels[level] = LevelStats()
+        return self.levels[level]
+
+    def merge(self, other: 'ArchiveStats') -> None:
+        """Add the statistics of `other`."""
+        for level, stats in other.levels.items():
+            self.level(level).merge(stats)
+
+    def report(self) -> str:
+        """Return heatmaps and turn statistics for every level."""
+        out = []
+        for level in sorted(self.levels):
+            stats = self.levels[level]
+            out.append(f'*** Level {level}: {stats.games} games ***')
+            out.append('Shots:')
+            out.append(heatmap(stats.shots))
+            out.append('Hit rate:')
+            out.append(heatmap(stats.hit_rates()))
+            for ship_type in SHIPS:
+                out.append(f'{SHIP_NAMES[ship_type]:<12} sunk on turn '
+                           f'{stats.mean_sink_turn(ship_type):.1f}')
+            out.append(f'First hit on turn {stats.mean_first_hit():.1f}\n')
+        return '\n'.join(out)
+
+
+def heatmap(values: List[float]) -> str:
+    """Render per-coordinate values on the game board layout, shading
+    each coordinate relative to the largest value.
+    """
+    top = max(values) or 1
+    symbols = [SHADES[min(int(value / top * len(SHADES)), len(SHADES) - 1)]
+               for value in values]
+    return render_board(symbols)
+
+
+def analyze_range(path: str, byte_range: ByteRange) -> ArchiveStats:
+    """Reduce the records within `byte_range` of a file to statistics."""
+    stats = ArchiveStats()
+    for record in read_range(path, byte_range):
+        players = [stats.level(level) for level in record.levels]
+        first_hit: List[Optional[int]] = [None, None]
+        for player in players:
+            player.games += 1
+        shots = record.shots
+        for half_turn in range(record.num_shots()):
+            coord = shots[2 * half_turn]
+            code = shots[2 * half_turn + 1]
+            player = half_turn & 1
+            counters = players[player]
+            counters.shots[coord] += 1
+            if code == MISS:
+                continue
+            turn = half_turn // 2 + 1
+            counters.hits[coord] += 1
+            if first_hit[player] is None:
+                first_hit[player] = turn
+                counters.first_hits[turn] += 1
+            _, sunk, ship_type = decode_result(code)
+            if sunk:
+                counters.sink_turns[ship_type][turn] += 1
+    return stats
+
+
+def analyze(path: str, workers: Optional[int] = None,
+            chunk_size: int = CHUNK_SIZE) -> ArchiveStats:
+    """Compute the statistics of a record file.
+
+    PARAMS
+    ------
+    path : str
+        The record file.
+    workers : int, optional
+        Number of worker processes, defaults to the number of CPUs.  A
+        single worker analyses every record in this process.
+    chunk_size : int
+        Number of games handed to a worker at a time.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with GameArchive(path) as archive:
+        byte_ranges = archive.byte_ranges(chunk_size)
+
+    stats = ArchiveStats()
+    if workers == 1:
+        for byte_range in byte_ranges:
+            stats.merge(analyze_range(path, byte_range))
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pool.map(analyze_range, repeat(path), byte_ranges):
+            stats.merge(chunk)
+    return stats
+
+
+def main() -> int:
+    """Print the statistics of a record file."""
+    parser = argparse.ArgumentParser(prog="python -m game.analytics")
+    parser.add_argument("records", help="game record file")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    print(analyze(args.records, args.workers).report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
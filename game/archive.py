@@ -0,0 +1,139 @@
+"""Module for random access to game record files.
+
+An archive memory-maps a record file written by `game.records.RecordWriter`
+and indexes the byte offset of every record, so game N and shot T of it are
+read without decoding the games before it.
+"""
+import mmap
+from array import array
+from typing import Iterator, List, Tuple, Union
+
+from game.records import (FLEET_BYTES, RECORD_HEADER, SHOT_BYTES,
+                          DecodedShot, GameRecord, check_header,
+                          decode_result, record_size)
+
+
+ByteRange = Tuple[int, int]
+
+
+class GameArchive:
+    """A memory-mapped, indexed game record file.
+
+    Use as a context manager, or call `close`.
+
+    Attributes:
+    -----------
+    path : str
+        The record file.
+    offsets : array
+        Byte offset of each record, with the end of the last record
+        appended.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        self.buffer: Union[mmap.mmap, bytes] = b''
+        try:
+            self.buffer = _map(self._file)
+            self.offsets = self._index()
+        except BaseException:
+            self.close()
+            raise
+
+    def _index(self) -> array:
+        """Return the offset of every record in the file."""
+        offsets = array('Q')
+        offset = check_header(self.buffer)
+        end = len(self.buffer)
+        while offset < end:
+            if end - offset < RECORD_HEADER.size:
+                raise ValueError(f"Truncated game record at byte {offset}")
+            offsets.append(offset)
+            offset += record_size(self.buffer, offset)
+        if offset != end:
+            raise ValueError(f"Truncated game record at byte {offsets[-1]}")
+        offsets.append(offset)
+        return offsets
+
+    def __enter__(self) -> 'GameArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _offset(self, game: int) -> int:
+        """Return the byte offset of `game`, counting negative indices
+        from the end as for a list.
+        """
+        if not -len(self) <= game < len(self):
+            raise IndexError(f"game {game} out of range")
+        return self.offsets[game % len(self)]
+
+    def __getitem__(self, game: int) -> GameRecord:
+        return GameRecord.decode(self.buffer, self._offset(game))
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for offset in self.offsets[:-1]:
+            yield GameRecord.decode(self.buffer, offset)
+
+    def num_shots(self, game: int) -> int:
+        """Return the number of shots in `game`."""
+        return RECORD_HEADER.unpack_from(self.buffer, self._offset(game))[3]
+
+    def shot(self, game: int, half_turn: int) -> DecodedShot:
+        """Return `(coordinate, hit, sunk, ship_type)` of one shot of
+        `game`, read directly from the file.
+        """
+        if not 0 <= half_turn < self.num_shots(game):
+            raise IndexError(f"shot {half_turn} out of range")
+        offset = (self._offset(game) + RECORD_HEADER.size
+                  + 2 * FLEET_BYTES + half_turn * SHOT_BYTES)
+        return ((self.buffer[offset],)
+                + decode_result(self.buffer[offset + 1]))
+
+    def turn(self, game: int, turn: int) -> List[DecodedShot]:
+        """Return the shots of `turn` (from 1) of `game`: the first
+        player's, then the second player's if taken.
+        """
+        half_turns = range(2 * (turn - 1),
+                           min(2 * turn, self.num_shots(game)))
+        return [self.shot(game, half_turn) for half_turn in half_turns]
+
+    def byte_ranges(self, chunk_size: int) -> List[ByteRange]:
+        """Split the records into byte ranges of `chunk_size` games."""
+        return [(self.offsets[start],
+                 self.offsets[min(start + chunk_size, len(self))])
+                for start in range(0, len(self), chunk_size)]
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self._file.close()
+
+
+def _map(file) -> Union[mmap.mmap, bytes]:
+    """Memory-map a file for reading."""
+    try:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # An empty file cannot be mapped.
+        return b''
+
+
+def read_range(path: str, byte_range: ByteRange) -> Iterator[GameRecord]:
+    """Iterate over the records within `byte_range` of a record file."""
+    offset, stop = byte_range
+    with open(path, 'rb') as file:
+        buffer = _map(file)
+        try:
+            while offset < stop:
+                yield GameRecord.decode(buffer, offset)
+                offset += record_size(buffer, offset)
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
@@ -7,9 +7,14 @@ https://www.hasbro.com/common/instruct/Battleship.PDF
 """
 
 import os
-from typing import Tuple
+from time import perf_counter_ns
+from typing import Optional, Tuple
 
-from game.player import Human, Player
+from game.bitboard import coordinate_name
+from game.player import CPU, QUIT, Human, Player
+from game.records import GameRecord
+from game.ship import SHIP_SYMBOLS
+from game.timing import CHOOSE, PLACE, RESOLVE, MoveTimings
 
 
 class GameLog:
@@ -28,6 +33,27 @@ class GameLog:
             self.log.append([])
         self.log[turn_num - 1].append(log)
 
+    @classmethod
+    def from_record(cls, record: GameRecord) -> 'GameLog':
+        """Render a `GameRecord` in the log's human-readable form."""
+        log = cls()
+        num_shots = record.num_shots()
+        for half_turn, (coord, hit, sunk, ship_type) in enumerate(
+                record.moves()):
+            shot_log = coordinate_name(coord)
+            if hit:
+                symbol = SHIP_SYMBOLS[ship_type]
+                shot_log += symbol if sunk else symbol.lower()
+            log.add(half_turn // 2 + 1, shot_log)
+        if record.winner is None:
+            log.add(num_shots // 2 + 1, 'Q!!')
+        elif num_shots and (num_shots - 1) % 2 == record.winner:
+            log.log[-1][-1] += '**'
+        else:
+            # The loser quit instead of taking their shot.
+            log.add(num_shots // 2 + 1, 'Q**')
+        return log
+
     def debug(self, log: str) -> None:
         """Add a debug log entry."""
         self.debug_log.append(log)
@@ -57,11 +83,17 @@ GameResult = Tuple[Player, Player]
 
 
 class Battleship:
-    """A game of Battleship."""
+    """A game of Battleship.
 
-    def __init__(self, player1: Player, player2: Player) -> None:
+    Pass a `MoveTimings` as `timings` to record how long each player spends
+    placing ships, choosing coordinates and having shots resolved.
+    """
+
+    def __init__(self, player1: Player, player2: Player,
+                 timings: Optional[MoveTimings] = None) -> None:
         self.players = [player1, player2]
         self.log = GameLog()
+        self.timings = timings
 
         self.set_boards()
 
@@ -76,13 +108,15 @@ class Battleship:
         result : GameResult
             (winner, loser)
         """
+        timings = self.timings
         half_turns = 0
         winner = None
         loser = None
         output = "Let's Play!!!"
+        max_turns = self.players[0].geometry.size
         while winner is None:
             turn_num = int(half_turns / 2) + 1
-            if turn_num > 100:
+            if turn_num > max_turns:
                 # break if somehow we get to a full board with no winner.
                 self.log.add(turn_num, 'Q!!')
                 break
@@ -95,17 +129,27 @@ class Battleship:
                 print(output)
                 attacker.show_boards()
 
+            if timings is not None:
+                start = perf_counter_ns()
             attk_coord = attacker.choose_coordinate()
-            if 'Q' in attk_coord:
+            if timings is not None:
+                timings.record(getattr(attacker, 'level', None), CHOOSE,
+                               turn_num, perf_counter_ns() - start)
+            if attk_coord in QUIT:
                 winner = defender
                 loser = attacker
                 self.log.add(turn_num, 'Q**')
                 continue
             if not attacker.attack_board.unattacked(attk_coord):
                 continue
+            if timings is not None:
+                start = perf_counter_ns()
             result = defender.attacked(attk_coord)
             defender.add_ship_peg(attk_coord, result)
             attacker.add_attack_peg(attk_coord, result)
+            if timings is not None:
+                timings.record(getattr(attacker, 'level', None), RESOLVE,
+                               turn_num, perf_counter_ns() - start)
             hit, sunk, ship = result
             shot_log = attk_coord
             output = f'{attacker.name} attacks {attk_coord}: '
@@ -133,7 +177,13 @@ class Battleship:
         for player in self.players:
             player.clear_boards()
             player.set_ships_placed(False)
-            self.place_ships(player)
+            if self.timings is None:
+                self.place_ships(player)
+            else:
+                start = perf_counter_ns()
+                self.place_ships(player)
+                self.timings.record(getattr(player, 'level', None), PLACE,
+                                    0, perf_counter_ns() - start)
             player.set_ships_placed(True)
 
     def show_log(self) -> None:
@@ -146,6 +196,9 @@ class Battleship:
 
     def place_ships(self, player: Player) -> None:
         """Guide player in placing ships on board."""
+        if isinstance(player, CPU):
+            player.place_fleet()
+            return
         for ship in player.ship_board.ships:
             built = False
             while not built:
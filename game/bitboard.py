@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from typing import Iterable, Iterator, List, SupportsInt, Union
 
+from game import tables
+
 
 ROW_NAMES = ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10']
 COL_NAMES = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']
@@ -22,11 +24,15 @@ COORDINATES = [
     A0, B0, C0, D0, E0, F0, G0, H0, I0, J0
 ] = range(100)
 COORDINATE_NAMES = [c + r for r in ROW_NAMES for c in COL_NAMES]
+_COORDINATE_INDEX = {name: i for i, name in enumerate(COORDINATE_NAMES)}
 
 
 def parse_coordinate(name: str) -> Coordinate:
     """Get coordinate value from name"""
-    return COORDINATE_NAMES.index(name)
+    try:
+        return _COORDINATE_INDEX[name]
+    except KeyError:
+        raise ValueError(f"{name!r} is not a coordinate") from None
 
 
 def coordinate_name(coordinate: Coordinate) -> str:
@@ -36,12 +42,12 @@ def coordinate_name(coordinate: Coordinate) -> str:
 
 def coordinate_row(coordinate: Coordinate) -> int:
     """Get index of coordinate's row where ``0`` is row 1, ``9`` is row 10"""
-    return int(coordinate / 10)
+    return coordinate // 10
 
 
 def coordinate_col(coordinate: Coordinate) -> int:
     """Get index of coordinate's column where ``0`` is column A."""
-    return int(coordinate % 10)
+    return coordinate % 10
 
 
 def coordinate_mirror(coordinate: Coordinate) -> Coordinate:
@@ -60,8 +66,14 @@ def step_distance(a: Coordinate, b: Coordinate) -> int:
                abs(coordinate_row(a) - coordinate_row(b)))
 
 
-COORDINATES_180 = [coordinate_mirror(c) for c in COORDINATES]
-COORDINATES_180_H = [coordinate_mirror_horizontal(c) for c in COORDINATES]
+@tables.table('coordinates_180')
+def _coordinates_180() -> List[Coordinate]:
+    return [coordinate_mirror(c) for c in COORDINATES]
+
+
+@tables.table('coordinates_180_h')
+def _coordinates_180_h() -> List[Coordinate]:
+    return [coordinate_mirror_horizontal(c) for c in COORDINATES]
 
 
 Bitboard = int
@@ -143,28 +155,121 @@ def scan_reversed(bb: Bitboard) -> Iterator[Coordinate]:
         bb ^= BB_COORDINATES[coord]
 
 
-def popcount(bb: Bitboard) -> int:
+if hasattr(int, 'bit_count'):
+    def popcount(bb: Bitboard) -> int:
+        """Returns number of `1`s in the Bitboard."""
+        return bb.bit_count()
+else:
+    def popcount(bb: Bitboard) -> int:
+        """Returns number of `1`s in the Bitboard."""
+        return bin(bb).count("1")
+
+
+BB_ROW_MASK = BB_ROW_1
+
+
+def _row_table(coordinate_of) -> List[Bitboard]:
+    """Map every 10-bit row pattern to a Bitboard, moving the coordinate in
+    column ``c`` of row 1 to ``coordinate_of(c)``.
+    """
+    table = []
+    for bits in range(BB_ROW_MASK + 1):
+        bb = BB_EMPTY
+        for col in scan_forward(bits):
+            bb |= BB_COORDINATES[coordinate_of(col)]
+        table.append(bb)
+    return table
+
+
+# Row 1 reversed, and row 1 laid along column A / column J from row 10.
+# Row ``r`` of a board maps to the same pattern shifted ``r`` places, so
+# one table per flip covers every row.
+@tables.table('row_reversed')
+def _row_reversed() -> List[Bitboard]:
+    return _row_table(lambda col: 9 - col)
+
+
+@tables.table('row_transposed')
+def _row_transposed() -> List[Bitboard]:
+    return _row_table(lambda col: 10 * col)
+
+
+@tables.table('row_anti_transposed')
+def _row_anti_transposed() -> List[Bitboard]:
+    return _row_table(lambda col: 10 * (9 - col))
+
+
+def flip_vertical(bb: Bitboard) -> Bitboard:
+    """Flips the board vertically."""
+    return (
+        (bb >> 90) |
+        (bb >> 70 & BB_ROW_2) |
+        (bb >> 50 & BB_ROW_3) |
+        (bb >> 30 & BB_ROW_4) |
+        (bb >> 10 & BB_ROW_5) |
+        (bb << 10 & BB_ROW_6) |
+        (bb << 30 & BB_ROW_7) |
+        (bb << 50 & BB_ROW_8) |
+        (bb << 70 & BB_ROW_9) |
+        (bb << 90 & BB_ROW_10)
+    )
+
+
+def flip_horizontal(bb: Bitboard) -> Bitboard:
+    """Flips the board horizontally."""
+    row_reversed = tables.get('row_reversed')
+    bb_flipped = BB_EMPTY
+    for shift in range(0, 100, 10):
+        bb_flipped |= row_reversed[bb >> shift & BB_ROW_MASK] << shift
+    return bb_flipped
+
+
+def flip_diagonal(bb: Bitboard) -> Bitboard:
+    """Flips the board diagonally."""
+    row_transposed = tables.get('row_transposed')
+    bb_flipped = BB_EMPTY
+    for row in range(10):
+        bb_flipped |= row_transposed[bb >> 10 * row & BB_ROW_MASK] << row
+    return bb_flipped
+
+
+def flip_anti_diagonal(bb: Bitboard) -> Bitboard:
+    """Flips the board anti-diagonally."""
+    row_anti_transposed = tables.get('row_anti_transposed')
+    bb_flipped = BB_EMPTY
+    for row in range(10):
+        bb_flipped |= (row_anti_transposed[bb >> 10 * row & BB_ROW_MASK]
+                       << 9 - row)
+    return bb_flipped
+
+
+# Reference implementations of the kernels above, one coordinate at a
+# time, to cross-check them against.
+
+def popcount_reference(bb: Bitboard) -> int:
     """Returns number of `1`s in the Bitboard."""
     return bin(bb).count("1")
 
 
-def flip_vertical(bb: Bitboard) -> Bitboard:
+def flip_vertical_reference(bb: Bitboard) -> Bitboard:
     """Flips the board vertically."""
+    coordinates_180 = tables.get('coordinates_180')
     bb_flipped = BB_EMPTY
     for c in scan_forward(bb):
-        bb_flipped |= BB_COORDINATES[COORDINATES_180[c]]
+        bb_flipped |= BB_COORDINATES[coordinates_180[c]]
     return bb_flipped
 
 
-def flip_horizontal(bb: Bitboard) -> Bitboard:
+def flip_horizontal_reference(bb: Bitboard) -> Bitboard:
     """Flips the board horizontally."""
+    coordinates_180_h = tables.get('coordinates_180_h')
     bb_flipped = BB_EMPTY
     for c in scan_forward(bb):
-        bb_flipped |= BB_COORDINATES[COORDINATES_180_H[c]]
+        bb_flipped |= BB_COORDINATES[coordinates_180_h[c]]
     return bb_flipped
 
 
-def flip_diagonal(bb: Bitboard) -> Bitboard:
+def flip_diagonal_reference(bb: Bitboard) -> Bitboard:
     """Flips the board diagonally."""
     bb_flipped = BB_EMPTY
     for c in scan_forward(bb):
@@ -173,9 +278,10 @@ def flip_diagonal(bb: Bitboard) -> Bitboard:
     return bb_flipped
 
 
-def flip_anti_diagonal(bb: Bitboard) -> Bitboard:
+def flip_anti_diagonal_reference(bb: Bitboard) -> Bitboard:
     """Flips the board anti-diagonally."""
-    return flip_diagonal(flip_horizontal(flip_vertical(bb)))
+    return flip_diagonal_reference(
+        flip_horizontal_reference(flip_vertical_reference(bb)))
 
 
 def shift_down(bb: Bitboard) -> Bitboard:
@@ -297,6 +403,7 @@ def shared(a: Coordinate, b: Coordinate) -> Bitboard:
     return BB_EMPTY
 
 
+@tables.table('rays')
 def _rays() -> List[List[Bitboard]]:
     """Calculate all possible rays on the board."""
     rays = []
@@ -312,16 +419,13 @@ def _rays() -> List[List[Bitboard]]:
     return rays
 
 
-BB_RAYS = _rays()
-
-
 def ray(a: Coordinate, b: Coordinate) -> Bitboard:
     """Return Bitboard representation of all Coordinates between and
     including a and b.
     """
     if a not in COORDINATES or b not in COORDINATES:
         raise ValueError(f"Invalid Coordinates: ({a}, {b})")
-    return BB_RAYS[a][b]
+    return tables.get('rays')[a][b]
 
 
 def between(a: Coordinate, b: Coordinate) -> Bitboard:
@@ -330,33 +434,134 @@ def between(a: Coordinate, b: Coordinate) -> Bitboard:
     """
     if a not in COORDINATES or b not in COORDINATES:
         raise ValueError(f"Invalid Coordinates: ({a}, {b})")
-    bb = BB_RAYS[a][b] & ((BB_ALL << a) ^ (BB_ALL << b))
+    bb = tables.get('rays')[a][b] & ((BB_ALL << a) ^ (BB_ALL << b))
     return bb & (bb - 1)
 
 
+def _placements(length: int) -> List[Bitboard]:
+    """Calculate all legal placements of a ship of `length` on the board."""
+    rays = tables.get('rays')
+    placements = []
+    if length < 1:
+        return placements
+    for bow in COORDINATES:
+        tails = [bow + length - 1]
+        if length > 1:
+            tails.append(bow + 10 * (length - 1))
+        for tail in tails:
+            if tail in COORDINATES and rays[bow][tail]:
+                placements.append(rays[bow][tail])
+    return placements
+
+
+MAX_SHIP_LENGTH = 10
+
+
+@tables.table('placements')
+def _all_placements() -> List[List[Bitboard]]:
+    return [_placements(length) for length in range(MAX_SHIP_LENGTH + 1)]
+
+
+@tables.table('coordinate_placements')
+def _coordinate_placements() -> List[List[List[int]]]:
+    coordinate_placements = []
+    for placements in tables.get('placements'):
+        by_coordinate = [[] for _ in COORDINATES]
+        for i, bb in enumerate(placements):
+            for coord in scan_forward(bb):
+                by_coordinate[coord].append(i)
+        coordinate_placements.append(by_coordinate)
+    return coordinate_placements
+
+
+@tables.table('placement_coordinates')
+def _placement_coordinates() -> List[List[List[Coordinate]]]:
+    return [[list(scan_forward(bb)) for bb in placements]
+            for placements in tables.get('placements')]
+
+
+def placement(bow: Coordinate, length: int, delta: int) -> Bitboard:
+    """Return the Bitboard of a ship of `length` laid from `bow` in the
+    direction of `delta`, or `BB_EMPTY` if the ship would not fit.
+    """
+    tail = bow + delta * (length - 1)
+    if not 0 <= tail < 100:
+        return BB_EMPTY
+    return tables.get('rays')[bow][tail]
+
+
+def placements(length: int, occupied: Bitboard = BB_EMPTY) -> List[Bitboard]:
+    """Return all placements of a ship of `length` which avoid `occupied`."""
+    return [bb for bb in tables.get('placements')[length]
+            if not bb & occupied]
+
+
 IntoCoordinateSet = Union[SupportsInt, Iterable[Coordinate]]
 
 
+def coordinate_mask(coordinate: Coordinate,
+                    bb_all: Bitboard = BB_ALL) -> Bitboard:
+    """Return the Bitboard of a coordinate on the board of every coordinate
+    `bb_all`.
+
+    raises `IndexError` if the coordinate is off the board.
+    """
+    if coordinate < 0 or not bb_all >> coordinate & 1:
+        raise IndexError(f"Coordinate out of range: {coordinate}")
+    return 1 << coordinate
+
+
+def into_mask(coordinates: IntoCoordinateSet,
+              bb_all: Bitboard = BB_ALL) -> Bitboard:
+    """Return the Bitboard of an int, CoordinateSet or iterable of
+    coordinates, within the board of every coordinate `bb_all`.
+
+    Ints and CoordinateSets are handled without allocating a set.
+
+    raises `IndexError` if an iterable holds a coordinate off the board.
+    """
+    if type(coordinates) is int:
+        return coordinates & bb_all
+    if isinstance(coordinates, CoordinateSet):
+        return coordinates.mask
+    try:
+        return coordinates.__int__() & bb_all
+    except AttributeError:
+        pass
+
+    mask = BB_EMPTY
+    for coordinate in coordinates:
+        mask |= coordinate_mask(coordinate, bb_all)
+    return mask
+
+
 class CoordinateSet:
     """A set of coordinates.
 
     The coordinate set is represented internally by a 100-bit integer
     mask of the included coordinates.  Allows for bitwise operations and
-    operations available to set class objects.
+    operations available to set class objects.  Operations return a set of
+    the left operand's type, and accept ints and CoordinateSets without
+    wrapping them in a new set.
+
+    Sets on boards of other sizes are subclasses; see
+    `game.geometry.Geometry.coordinate_set`.
     """
 
+    __slots__ = ('mask',)
+
     def __init__(self, coordinates: IntoCoordinateSet = BB_EMPTY) -> None:
-        try:
-            self.mask = coordinates.__int__() & BB_ALL
-            return
-        except AttributeError:
-            self.mask = 0
+        self.mask = into_mask(coordinates)
 
-        for coordinate in coordinates:
-            self.add(coordinate)
+    @classmethod
+    def _new(cls, mask: Bitboard):
+        """Create a set from a mask already within the board."""
+        coordinate_set = object.__new__(cls)
+        coordinate_set.mask = mask
+        return coordinate_set
 
     def __contains__(self, coordinate: Coordinate) -> bool:
-        return bool(self.mask & BB_COORDINATES[coordinate])
+        return coordinate >= 0 and bool(self.mask >> coordinate & 1)
 
     def __iter__(self) -> Iterator[Coordinate]:
         return scan_forward(self.mask)
@@ -368,35 +573,36 @@ class CoordinateSet:
         return popcount(self.mask)
 
     def add(self, coordinate: Coordinate) -> None:
-        """Add `coordinate` to the set."""
-        self.mask |= BB_COORDINATES[coordinate]
+        """Add `coordinate` to the set.
+
+        raises `IndexError` if the coordinate is off the board.
+        """
+        self.mask |= coordinate_mask(coordinate)
 
     def discard(self, coordinate: Coordinate) -> None:
         """Remove `coordinate` from the set."""
-        self.mask &= ~BB_COORDINATES[coordinate]
+        self.mask &= ~(1 << coordinate)
 
     def isdisjoint(self, other: IntoCoordinateSet) -> bool:
         """Return `True` if the set has no elements in common with
         `other`.
         """
-        return not bool(self & other)
+        return not self.mask & into_mask(other)
 
     def issubset(self, other: IntoCoordinateSet) -> bool:
         """Return `True` if all elements in this set are in `other`."""
-        return not bool(self & ~other)
+        return not self.mask & ~into_mask(other)
 
     def issuperset(self, other: IntoCoordinateSet) -> bool:
         """Return `True` if all elements in `other` are in this set."""
-        return not bool(~self & other)
+        return not into_mask(other) & ~self.mask
 
     def union(self, other: IntoCoordinateSet):
         """Return a new set with elements from this set and `other`."""
         return self | other
 
     def __or__(self, other: IntoCoordinateSet):
-        other = CoordinateSet(other)
-        other.mask |= self.mask
-        return other
+        return self._new(self.mask | into_mask(other))
 
     def intersection(self, other: IntoCoordinateSet):
         """Return a new set with common elements from this set and
@@ -405,9 +611,7 @@ class CoordinateSet:
         return self & other
 
     def __and__(self, other: IntoCoordinateSet):
-        other = CoordinateSet(other)
-        other.mask &= self.mask
-        return other
+        return self._new(self.mask & into_mask(other))
 
     def difference(self, other: IntoCoordinateSet):
         """Return a new set with elements in this set but not in
@@ -416,9 +620,7 @@ class CoordinateSet:
         return self - other
 
     def __sub__(self, other: IntoCoordinateSet):
-        other = CoordinateSet(other)
-        other.mask = self.mask & ~other.mask
-        return other
+        return self._new(self.mask & ~into_mask(other))
 
     def symmetric_difference(self, other: IntoCoordinateSet):
         """Return a new set with elements in either this set or `other`
@@ -427,51 +629,50 @@ class CoordinateSet:
         return self ^ other
 
     def __xor__(self, other: IntoCoordinateSet):
-        other = CoordinateSet(other)
-        other.mask ^= self.mask
-        return other
+        return self._new(self.mask ^ into_mask(other))
 
     def copy(self):
         """Return a shallow copy of the set."""
-        return CoordinateSet(self.mask)
+        return self._new(self.mask)
 
     def update(self, other: IntoCoordinateSet) -> None:
         """Update the set, adding elements from `other`."""
-        self |= other
+        self.mask |= into_mask(other)
 
     def __ior__(self, other: IntoCoordinateSet):
-        self.mask |= CoordinateSet(other).mask
+        self.mask |= into_mask(other)
         return self
 
     def intersection_update(self, other: IntoCoordinateSet) -> None:
         """Remove set elements not common  with it and `other`."""
-        self &= other
+        self.mask &= into_mask(other)
 
     def __iand__(self, other: IntoCoordinateSet):
-        self.mask &= CoordinateSet(other).mask
+        self.mask &= into_mask(other)
         return self
 
     def difference_update(self, other: IntoCoordinateSet) -> None:
         """Removing set elements found in `other`."""
-        self -= other
+        self.mask &= ~into_mask(other)
 
     def __isub__(self, other: IntoCoordinateSet):
-        self.mask &= ~CoordinateSet(other).mask
+        self.mask &= ~into_mask(other)
         return self
 
     def symmetric_difference_update(self, other: IntoCoordinateSet) -> None:
         """Remove set elements common to it and `other`."""
-        self ^= other
+        self.mask ^= into_mask(other)
 
     def __ixor__(self, other: IntoCoordinateSet):
-        self.mask ^= CoordinateSet(other).mask
+        self.mask ^= into_mask(other)
+        return self
 
     def remove(self, coordinate: Coordinate) -> None:
         """Remove a coordinate from the set.
 
         raises `KeyError` if provided coordinate is not in set.
         """
-        mask = BB_COORDINATES[coordinate]
+        mask = 1 << coordinate
         if self.mask & mask:
             self.mask ^= mask
         else:
@@ -510,15 +711,15 @@ class CoordinateSet:
 
     def __eq__(self, other: object) -> bool:
         try:
-            return self.mask == CoordinateSet(other).mask
+            return self.mask == into_mask(other)
         except (TypeError, ValueError):
             return NotImplemented
 
     def __lshift__(self, shift: int):
-        return CoordinateSet((self.mask << shift) & BB_ALL)
+        return self._new((self.mask << shift) & BB_ALL)
 
     def __rshift__(self, shift: int):
-        return CoordinateSet((self.mask >> shift) & BB_ALL)
+        return self._new((self.mask >> shift) & BB_ALL)
 
     def __ilshift__(self, shift: int):
         self.mask = (self.mask << shift) & BB_ALL
@@ -529,7 +730,7 @@ class CoordinateSet:
         return self
 
     def __invert__(self):
-        return CoordinateSet(~self.mask & BB_ALL)
+        return self._new(~self.mask & BB_ALL)
 
     def __int__(self) -> int:
         return self.mask
@@ -538,12 +739,12 @@ class CoordinateSet:
         return self.mask
 
     def __repr__(self) -> str:
-        return f'CoordinateSet({self.mask:#036_x})'
+        return f'{type(self).__name__}({self.mask:#036_x})'
 
     def __str__(self) -> str:
         out = ''
 
-        for coord in COORDINATES_180:
+        for coord in tables.get('coordinates_180'):
             mask = BB_COORDINATES[coord]
             out += '1' if self.mask & mask else '.'
 
@@ -559,14 +760,14 @@ class CoordinateSet:
         """All coordinates on a row or column between and including the
         two input value coordinates (if they are aligned).
         """
-        return cls(ray(a, b))
+        return cls._new(ray(a, b))
 
     @classmethod
     def between(cls, a: Coordinate, b: Coordinate):
         """All coordinates on a row or column between but excluding the
         two input value coordinates (if they are aligned).
         """
-        return cls(between(a, b))
+        return cls._new(between(a, b))
 
     @classmethod
     def from_coordinate(cls, coordinate: Coordinate):
@@ -575,4 +776,68 @@ class CoordinateSet:
         """
         if isinstance(coordinate, str):
             coordinate = parse_coordinate(coordinate)
-        return cls(BB_COORDINATES[coordinate])
+        return cls._new(coordinate_mask(coordinate))
+
+
+class FrozenCoordinateSet(CoordinateSet):
+    """An immutable, hashable set of coordinates.
+
+    Hashes and compares equal to its mask.  Mutating methods raise
+    `AttributeError`, and in-place operators return a new set as they do
+    for a `frozenset`.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, coordinates: IntoCoordinateSet = BB_EMPTY) -> None:
+        object.__setattr__(self, 'mask', into_mask(coordinates))
+
+    @classmethod
+    def _new(cls, mask: Bitboard):
+        """Create a set from a mask already within the board."""
+        coordinate_set = object.__new__(cls)
+        object.__setattr__(coordinate_set, 'mask', mask)
+        return coordinate_set
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __reduce__(self):
+        return type(self), (self.mask,)
+
+    def __hash__(self) -> int:
+        return hash(self.mask)
+
+    def copy(self):
+        """Return the set itself, as it cannot change."""
+        return self
+
+    __ior__ = CoordinateSet.__or__
+    __iand__ = CoordinateSet.__and__
+    __isub__ = CoordinateSet.__sub__
+    __ixor__ = CoordinateSet.__xor__
+    __ilshift__ = CoordinateSet.__lshift__
+    __irshift__ = CoordinateSet.__rshift__
+
+
+# Tables built on first use, by the module attribute names they replace.
+_LAZY_TABLES = {
+    'BB_RAYS': 'rays',
+    'BB_PLACEMENTS': 'placements',
+    'COORDINATE_PLACEMENTS': 'coordinate_placements',
+    'PLACEMENT_COORDINATES': 'placement_coordinates',
+    'COORDINATES_180': 'coordinates_180',
+    'COORDINATES_180_H': 'coordinates_180_h',
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_TABLES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = tables.get(_LAZY_TABLES[name])
+    # Later lookups find the table without calling back in here.
+    globals()[name] = value
+    return value
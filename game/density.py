@@ -0,0 +1,100 @@
+"""Module for counting ship placement densities with bit-sliced counters.
+
+The count for every coordinate is stored across a handful of Bitboards, one
+per binary digit, so that folding a placement mask into the counter is a few
+big-int operations rather than one list entry per covered coordinate.
+"""
+from typing import Iterable, List, Tuple
+
+from game.bitboard import BB_ALL, BB_COORDINATES, BB_EMPTY, Bitboard
+
+
+def half_adder(a: Bitboard, b: Bitboard) -> Tuple[Bitboard, Bitboard]:
+    """Add two Bitboards coordinate-wise, returning `(sum, carry)`."""
+    return a ^ b, a & b
+
+
+def carry_save_adder(a: Bitboard, b: Bitboard,
+                     c: Bitboard) -> Tuple[Bitboard, Bitboard]:
+    """Add three Bitboards coordinate-wise, returning `(sum, carry)`."""
+    u = a ^ b
+    return u ^ c, (a & b) | (u & c)
+
+
+class DensityCounter:
+    """A per-coordinate counter stored as bit-sliced Bitboards.
+
+    ``planes[i]`` holds bit ``i`` of the count for every coordinate.
+
+    PARAMS
+    ------
+    masks : Iterable[Bitboard]
+        Placement masks to count.
+    """
+
+    def __init__(self, masks: Iterable[Bitboard] = ()) -> None:
+        self.planes: List[Bitboard] = []
+        self.update(masks)
+
+    def _add(self, mask: Bitboard, plane: int = 0) -> None:
+        """Ripple `mask` into the counter starting at bit `plane`."""
+        planes = self.planes
+        while mask:
+            if plane >= len(planes):
+                planes.extend([BB_EMPTY] * (plane - len(planes)))
+                planes.append(mask)
+                return
+            planes[plane], mask = half_adder(planes[plane], mask)
+            plane += 1
+
+    def add(self, mask: Bitboard, weight: int = 1) -> None:
+        """Count every coordinate in `mask` `weight` times."""
+        plane = 0
+        while weight:
+            if weight & 1:
+                self._add(mask, plane)
+            weight >>= 1
+            plane += 1
+
+    def update(self, masks: Iterable[Bitboard]) -> None:
+        """Count every coordinate of each mask in `masks`.
+
+        Masks are folded in pairs through a carry-save adder so that only
+        the carries ripple into the higher planes.
+        """
+        ones = BB_EMPTY
+        masks = iter(masks)
+        for a in masks:
+            b = next(masks, BB_EMPTY)
+            ones, carry = carry_save_adder(ones, a, b)
+            self._add(carry, 1)
+        self._add(ones)
+
+    def count(self, coordinate: int) -> int:
+        """Return the count for `coordinate`."""
+        bb_coord = 1 << coordinate
+        return sum(1 << i for i, plane in enumerate(self.planes)
+                   if plane & bb_coord)
+
+    def tolist(self) -> List[int]:
+        """Convert counter to a list of counts indexed by coordinate."""
+        return [self.count(coord) for coord in range(len(BB_COORDINATES))]
+
+    def nonzero(self) -> Bitboard:
+        """Return the coordinates with a count of at least one."""
+        bb = BB_EMPTY
+        for plane in self.planes:
+            bb |= plane
+        return bb
+
+    def max_density(self, mask: Bitboard = BB_ALL) -> Bitboard:
+        """Return the coordinates in `mask` with the highest nonzero count.
+
+        Walks the planes from the most significant bit down, keeping only
+        the candidates which have the bit set whenever any of them do.
+        """
+        candidates = mask & self.nonzero()
+        for plane in reversed(self.planes):
+            if candidates & plane:
+                candidates &= plane
+        return candidates
@@ -1,12 +1,21 @@
 """Module for the gameboards.  Each player in a game of Battleship has two
-gameboards which are each a 10x10 grid of coordinates.  One board is used to
-store the player's ship locations and the other is to track attacks of the
-opponent's ship-board.
+gameboards which are each a grid of coordinates, 10x10 unless another
+`game.geometry.Geometry` is given.  One board is used to store the player's
+ship locations and the other is to track attacks of the opponent's
+ship-board.
 """
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
 import game.bitboard as bitboard
-from game.ship import Ship
+from game.density import DensityCounter
+from game.geometry import CLASSIC_GEOMETRY, Geometry
+from game.posterior import (MAX_NODES, Posterior, placement_cover,
+                            posterior)
+from game.sampling import SAMPLES, DensityEstimate, sample_densities
+from game.ship import CLASSIC_FLEET, Fleet, Ship
+from game.symmetry import Canonical, canonicalize
+from game.transposition import (TRANSPOSITIONS, TranspositionCache,
+                                fleet_key, zobrist_key)
 
 
 AttackResult = Tuple[bool, bool, Optional[Ship]]
@@ -14,6 +23,19 @@ Coordinate = Union[str, bitboard.Coordinate]
 CoordinateSet = bitboard.CoordinateSet
 
 
+class SalvoResult(NamedTuple):
+    """The results of a salvo, every shot of which is resolved at once.
+
+    `ship_hits` holds the shots which hit each ship struck, and `sunk` the
+    ships the salvo sank, in fleet order.  The shots which missed are
+    ``shots ^ hit``.
+    """
+    shots: bitboard.Bitboard
+    hit: bitboard.Bitboard
+    ship_hits: Dict[Ship, bitboard.Bitboard]
+    sunk: Tuple[Ship, ...]
+
+
 PEGS = [HIT, MISS] = ["+", "x"]
 
 Direction = str
@@ -32,16 +54,19 @@ DELTAS_ALL = DELTAS_H + DELTAS_V
 EMPTY_COORDINATE = '.'
 
 
-def parse_coordinate(coordinate: Coordinate) -> bitboard.Coordinate:
+def parse_coordinate(coordinate: Coordinate,
+                     geometry: Geometry = CLASSIC_GEOMETRY
+                     ) -> bitboard.Coordinate:
     """Convert coordinate to `bitboard.Coordinate`."""
     if isinstance(coordinate, str):
-        coordinate = bitboard.parse_coordinate(coordinate)
+        coordinate = geometry.parse_coordinate(coordinate)
     return coordinate
 
 
 def ship_coordinates(coordinate: Coordinate,
                      distance: int,
-                     direction: str) -> CoordinateSet:
+                     direction: str,
+                     geometry: Geometry = CLASSIC_GEOMETRY) -> CoordinateSet:
     """Return the coordinates of the head and tail of the ship.
 
     PARAMS
@@ -52,25 +77,29 @@ def ship_coordinates(coordinate: Coordinate,
         The total number of coordinates to include in set.
     direction : str
         The direction on the grid from bow to tail.
+    geometry : Geometry
+        The board.
 
     RETURNS
     -------
     coordinates : CoordinateSet
     """
-    coordinate = parse_coordinate(coordinate)
-    if coordinate not in bitboard.COORDINATES:
+    coordinate = parse_coordinate(coordinate, geometry)
+    if coordinate not in geometry.coordinates:
         raise ValueError(f"Invalid bow cooridinate: {coordinate}")
-    if direction.upper() not in DIRECTIONS:
+    if direction.upper() not in geometry.directions:
         raise ValueError(f"Invalid direction: {direction}")
 
-    delta = DIRECTIONS[direction.upper()]
+    delta = geometry.directions[direction.upper()]
     tail = coordinate + delta * (distance - 1)
-    if tail not in bitboard.COORDINATES:
+    if tail not in geometry.coordinates:
         raise ValueError(f"Invalid tail coordinate: {tail}")
-    return bitboard.CoordinateSet.ray(coordinate, tail)
+    return geometry.coordinate_set.ray(coordinate, tail)
 
 
-def coord_possibilities(ship: Ship, pegs: CoordinateSet) -> CoordinateSet:
+def coord_possibilities(ship: Ship, pegs: CoordinateSet,
+                        geometry: Geometry = CLASSIC_GEOMETRY
+                        ) -> CoordinateSet:
     """Return a set of possible ship coordinates.
 
     Params
@@ -79,25 +108,25 @@ def coord_possibilities(ship: Ship, pegs: CoordinateSet) -> CoordinateSet:
         Type of ship.
     pegs : CoordinateSet
         Set of occupied coordinates which block ship placement.
+    geometry : Geometry
+        The board.
 
     Returns
     -------
     ship_set : CoordinateSet
         All possible coordinates ship could occupy.
     """
-    ship_set = CoordinateSet()
-    for bow in ~pegs:
-        for _dir in ["RIGHT", "DOWN"]:
-            try:
-                coords = ship_coordinates(bow, len(ship), _dir)
-                if coords and coords.isdisjoint(pegs):
-                    ship_set.update(coords)
-            except ValueError:
-                continue
+    ship_set = geometry.coordinate_set()
+    pegs = int(pegs)
+    for mask in geometry.placements[len(ship)]:
+        if not mask & pegs:
+            ship_set.mask |= mask
     return ship_set
 
 
-def ship_possibilities(ship: Ship, pegs: CoordinateSet) -> List[CoordinateSet]:
+def ship_possibilities(ship: Ship, pegs: CoordinateSet,
+                       geometry: Geometry = CLASSIC_GEOMETRY
+                       ) -> List[CoordinateSet]:
     """Return all possible full ship locations.
 
     Params
@@ -106,58 +135,60 @@ def ship_possibilities(ship: Ship, pegs: CoordinateSet) -> List[CoordinateSet]:
         Type of ship.
     pegs : CoordinateSet
         Set of occupied coordinates which block ship placement.
+    geometry : Geometry
+        The board.
 
     Returns
     -------
     ship_list : List[CoordinateSet]
         All possible coordinate sets ship could occupy.
     """
-    ship_list = []
-    for bow in ~pegs:
-        for _dir in ["RIGHT", "DOWN"]:
-            try:
-                coords = ship_coordinates(bow, len(ship), _dir)
-                if coords and coords.isdisjoint(pegs):
-                    ship_list.append(coords)
-            except ValueError:
-                continue
-    return ship_list
+    coordinate_set = geometry.coordinate_set
+    pegs = int(pegs)
+    return [coordinate_set(mask) for mask in geometry.placements[len(ship)]
+            if not mask & pegs]
+
+
+def render_board(symbols: List[str],
+                 geometry: Geometry = CLASSIC_GEOMETRY) -> str:
+    """Render one single character symbol per coordinate as a board with
+    row and column labels.
+    """
+    return geometry.render(symbols)
 
 
 class GameBoard:
-    """A gameboard for the Battleship game."""
-    def __init__(self) -> None:
+    """A gameboard for the Battleship game.
+
+    OPTIONAL PARAMS
+    ---------------
+    fleet : Fleet
+        The ships placed on the board, or hunted on an attack board.
+    geometry : Geometry
+        The size of the board.
+
+    raises `ValueError` if the fleet does not fit on the board.
+    """
+    def __init__(self, fleet: Fleet = CLASSIC_FLEET,
+                 geometry: Geometry = CLASSIC_GEOMETRY) -> None:
+        if sum(fleet.lengths) > geometry.size:
+            raise ValueError(f"A fleet of {sum(fleet.lengths)} coordinates "
+                             f"does not fit on a {geometry} board")
+        self.fleet = fleet
+        self.geometry = geometry
         self._clear_board()
 
     def __str__(self) -> str:
-        out = []
-        out.append('+---------------------+\n')
-        for coordinate in bitboard.COORDINATES_180:
-            bb_coordinate = bitboard.BB_COORDINATES[coordinate]
-            if bb_coordinate & bitboard.BB_COL_A:
-                out.append('| ')
-            out.append(self.symbols[coordinate])
-            if bb_coordinate & bitboard.BB_COL_J:
-                out.append(f' | {int(coordinate / 10) + 1}\n')
-            elif coordinate != bitboard.J1:
-                out.append(' ')
-        out.append('+---------------------+\n')
-        out.append('  A B C D E F G H I J')
-        return ''.join(out)
+        return render_board(self.symbols, self.geometry)
 
     def _clear_board(self):
-        self.attacked = CoordinateSet()
-        self.hit = CoordinateSet()
-        self.miss = CoordinateSet()
-        self.occupied = CoordinateSet()
-        self.ships = {
-            Ship('Carrier'): CoordinateSet(),
-            Ship('Battleship'): CoordinateSet(),
-            Ship('Destroyer'): CoordinateSet(),
-            Ship('Submarine'): CoordinateSet(),
-            Ship('Patrol Boat'): CoordinateSet()
-        }
-        self.symbols = [EMPTY_COORDINATE for _ in range(100)]
+        new_set = self.geometry.coordinate_set
+        self.attacked = new_set()
+        self.hit = new_set()
+        self.miss = new_set()
+        self.occupied = new_set()
+        self.ships = {ship: new_set() for ship in self.fleet}
+        self.symbols = [EMPTY_COORDINATE for _ in self.geometry.coordinates]
         self.sunk = []
 
     def clear_board(self) -> None:
@@ -166,7 +197,7 @@ class GameBoard:
 
     def add_peg(self, coordinate: Coordinate, result: AttackResult) -> None:
         """Add a peg to the board."""
-        coordinate = parse_coordinate(coordinate)
+        coordinate = parse_coordinate(coordinate, self.geometry)
         hit, sunk, ship = result
         self.attacked.add(coordinate)
         if hit:
@@ -206,11 +237,30 @@ class ShipBoard(GameBoard):
         bool
             True if ship added successfully.
         """
-        ship_coords = ship_coordinates(bow, len(ship_obj), direction)
-        if ship_coords and ship_coords.isdisjoint(self.occupied):
-            self.ships[ship_obj] = ship_coords
-            self.occupied.update(ship_coords)
-            for _c in ship_coords:
+        geometry = self.geometry
+        bow = parse_coordinate(bow, geometry)
+        if bow not in geometry.coordinates:
+            raise ValueError(f"Invalid bow cooridinate: {bow}")
+        if direction.upper() not in geometry.directions:
+            raise ValueError(f"Invalid direction: {direction}")
+
+        ship_mask = geometry.placement(bow, len(ship_obj),
+                                       geometry.directions[direction.upper()])
+        return self.add_ship_mask(ship_obj, ship_mask)
+
+    def add_ship_mask(self, ship_obj: Ship,
+                      ship_mask: bitboard.Bitboard) -> bool:
+        """Add a Ship to the board at the coordinates in `ship_mask`.
+
+        Returns
+        -------
+        bool
+            True if ship added successfully.
+        """
+        if ship_mask and not ship_mask & self.occupied.mask:
+            self.ships[ship_obj] = self.geometry.coordinate_set(ship_mask)
+            self.occupied.mask |= ship_mask
+            for _c in bitboard.scan_forward(ship_mask):
                 self.symbols[_c] = ship_obj.symbol()
             return True
         return False
@@ -227,7 +277,7 @@ class ShipBoard(GameBoard):
         -------
         result : bool
         """
-        coordinate = parse_coordinate(coordinate)
+        coordinate = parse_coordinate(coordinate, self.geometry)
         self.attacked.add(coordinate)
         hit = coordinate in self.occupied
         sunk = False
@@ -241,9 +291,39 @@ class ShipBoard(GameBoard):
             self.miss.add(coordinate)
         return (hit, sunk, ship)
 
+    def resolve_salvo(self, shots: bitboard.Bitboard) -> SalvoResult:
+        """Return the results of attacking every coordinate in `shots`
+        at once, as `attack_result` would one shot at a time.
+
+        Params
+        ------
+        shots : Bitboard
+            The coordinates being attacked.
+
+        Returns
+        -------
+        result : SalvoResult
+        """
+        shots &= self.geometry.bb_all
+        hit_before = self.hit.mask
+        hit = shots & self.occupied.mask
+        self.attacked.mask |= shots
+        self.hit.mask |= hit
+        self.miss.mask |= shots ^ hit
+        afloat = ~self.hit.mask
+        ship_hits = {}
+        sunk = []
+        for ship, mask in self.ships.items():
+            mask = mask.mask
+            if mask & hit:
+                ship_hits[ship] = mask & hit
+                if not mask & afloat and mask & ~hit_before:
+                    sunk.append(ship)
+        return SalvoResult(shots, hit, ship_hits, tuple(sunk))
+
     def check_hit(self, coordinate: Coordinate) -> bool:
         """Check coordinate for Ship and return corresponding Peg."""
-        coordinate = parse_coordinate(coordinate)
+        coordinate = parse_coordinate(coordinate, self.geometry)
         return coordinate in self.occupied
 
     def check_sunk(self, ship_type: Ship) -> bool:
@@ -268,12 +348,15 @@ class ShipBoard(GameBoard):
         <class `gamebox.ship.Ship`> or None
             Ship object if one is present, else None.
         """
-        coordinate = parse_coordinate(coordinate)
-        return Ship.from_symbol(self.symbols[coordinate]) or None
+        bb_coordinate = 1 << parse_coordinate(coordinate, self.geometry)
+        for ship, mask in self.ships.items():
+            if mask.mask & bb_coordinate:
+                return ship
+        return None
 
     def add_peg(self, coordinate: Coordinate, result: AttackResult) -> None:
         """Add a peg to the board."""
-        coordinate = parse_coordinate(coordinate)
+        coordinate = parse_coordinate(coordinate, self.geometry)
         hit, sunk, ship = result
         if hit:
             peg = ship.symbol()
@@ -292,28 +375,177 @@ class AttackBoard(GameBoard):
     ---------------
     unknown_ship_symbol : str
         The symbol to represent when a ship is hit but unknown
+
+    Attributes:
+    -----------
+    zobrist : int
+        Zobrist hash of the pegs on the board, updated as pegs are added.
+    live_placements : Dict[Ship, int]
+        Bitset over the geometry's `placements` of each ship's placements which
+        avoid every miss and every hit on another ship, and cover every
+        hit on the ship itself.
+    density_counts : List[int]
+        Number of live placements of ships not yet hit covering each
+        coordinate.
+    transpositions : TranspositionCache, optional
+        Cache of query results shared by every board, or None to always
+        recompute.
     """
 
+    transpositions: Optional[TranspositionCache] = TRANSPOSITIONS
+
     def __str__(self) -> str:
         return f'Sank: {" ".join(self.sunk)}\n' + super().__str__()
 
+    def _clear_board(self):
+        super()._clear_board()
+        geometry = self.geometry
+        self.zobrist = fleet_key(self.fleet, geometry)
+        self.live_placements = {}
+        self.density_counts = [0] * geometry.size
+        for ship in self.ships:
+            placements = geometry.coordinate_placements[len(ship)]
+            self.live_placements[ship] = (1 << len(
+                geometry.placements[len(ship)])) - 1
+            for coordinate in geometry.coordinates:
+                self.density_counts[coordinate] += len(placements[coordinate])
+
+    def _uncount(self, length: int, placements: int) -> None:
+        """Remove `placements` of a ship of `length` from the density
+        counts.
+        """
+        counts = self.density_counts
+        placement_coordinates = self.geometry.placement_coordinates[length]
+        for i in bitboard.scan_forward(placements):
+            for coordinate in placement_coordinates[i]:
+                counts[coordinate] -= 1
+
+    def _update_placements(self, coordinate: bitboard.Coordinate,
+                           hit: bool, ship: Optional[Ship]) -> None:
+        """Narrow the live placements to a new peg, uncounting only the
+        placements it rules out.
+        """
+        if hit and not self.ships[ship]:
+            self._uncount(len(ship), self.live_placements[ship])
+        for other, live in self.live_placements.items():
+            cover = placement_cover(len(other), self.geometry)[coordinate]
+            if hit and other == ship:
+                self.live_placements[other] = live & cover
+                continue
+            removed = live & cover
+            if removed:
+                self.live_placements[other] = live ^ removed
+                if not self.ships[other]:
+                    self._uncount(len(other), removed)
+
+    def add_peg(self, coordinate: Coordinate, result: AttackResult) -> None:
+        """Add a peg to the board, updating its hash and live placements."""
+        coordinate = parse_coordinate(coordinate, self.geometry)
+        hit, _, ship = result
+        if coordinate not in self.attacked:
+            if hit:
+                self.zobrist ^= zobrist_key(coordinate, ship.ship_type(),
+                                            self.geometry, ship.copy)
+            else:
+                self.zobrist ^= zobrist_key(coordinate, None, self.geometry)
+            self._update_placements(coordinate, hit, ship)
+        super().add_peg(coordinate, result)
+
+    def add_salvo(self, result: SalvoResult) -> None:
+        """Add the pegs of a resolved salvo to the board, as `add_peg`
+        would shot by shot.
+        """
+        shots, hit, ship_hits, sunk = result
+        miss = shots ^ hit
+        new = shots & ~self.attacked.mask
+        if new:
+            new_hits = {ship: hits & new for ship, hits in ship_hits.items()
+                        if hits & new}
+            self._update_salvo_placements(new & miss, new_hits)
+            for _c in bitboard.scan_forward(new & miss):
+                self.zobrist ^= zobrist_key(_c, None, self.geometry)
+            for ship, hits in new_hits.items():
+                for _c in bitboard.scan_forward(hits):
+                    self.zobrist ^= zobrist_key(_c, ship.ship_type(),
+                                                self.geometry, ship.copy)
+        self.attacked.mask |= shots
+        self.hit.mask |= hit
+        self.miss.mask |= miss
+        for _c in bitboard.scan_forward(miss):
+            self.symbols[_c] = MISS
+        for ship, hits in ship_hits.items():
+            self.ships[ship].mask |= hits
+            for _c in bitboard.scan_forward(hits):
+                self.symbols[_c] = ship.symbol()
+        self.sunk.extend(ship.symbol() for ship in sunk)
+
+    def _update_salvo_placements(self, miss: bitboard.Bitboard,
+                                 ship_hits: Dict[Ship, bitboard.Bitboard]
+                                 ) -> None:
+        """Narrow the live placements to the new pegs of a salvo, each
+        ship with one pass over its placement bitset.
+
+        Narrowing commutes, so this leaves the same placements and density
+        counts as `_update_placements` for each peg in turn.
+        """
+        hit = 0
+        for hits in ship_hits.values():
+            hit |= hits
+        for ship, live in self.live_placements.items():
+            length = len(ship)
+            cover = placement_cover(length, self.geometry)
+            own = ship_hits.get(ship, bitboard.BB_EMPTY)
+            counted = not self.ships[ship]
+            if own and counted:
+                self._uncount(length, live)
+                counted = False
+            for _c in bitboard.scan_forward(own):
+                live &= cover[_c]
+            removed = 0
+            for _c in bitboard.scan_forward(miss | hit ^ own):
+                removed |= cover[_c]
+            removed &= live
+            if removed:
+                live ^= removed
+                if counted:
+                    self._uncount(length, removed)
+            self.live_placements[ship] = live
+
+    def _cached(self, query: str, compute):
+        """Return the result of `compute()`, looked up in and stored to
+        the transposition cache under `query` and the board's hash.
+        """
+        cache = self.transpositions
+        if cache is None:
+            return compute()
+        key = (query, self.zobrist)
+        attacked = self.attacked.mask
+        hit = self.hit.mask
+        value = cache.get(key, attacked, hit)
+        if value is None:
+            value = compute()
+            cache.put(key, attacked, hit, value)
+        return value
+
     def unattacked(self, coordinate: Coordinate) -> bool:
         """Check if coordinate is available to be attacked."""
-        coordinate = parse_coordinate(coordinate)
+        coordinate = parse_coordinate(coordinate, self.geometry)
         return coordinate not in self.attacked
 
     def _ship_attacks(self, ship: Ship) -> CoordinateSet:
         """Return sets of coordinates in which a ship could be attacked."""
-        locations = CoordinateSet()
+        geometry = self.geometry
+        locations = geometry.coordinate_set()
         ship_set = self.ships[ship]
+        deltas_v = [geometry.width, -geometry.width]
 
         # Calculate known coordinates for ship.  We know all coordinates
         # between ship_head and ship_tail should be attacked.
         ship_head = list(ship_set)[0]
         ship_tail = list(ship_set)[-1]
-        head_to_tail = bitboard.step_distance(ship_head, ship_tail) + 1
+        head_to_tail = geometry.step_distance(ship_head, ship_tail) + 1
         max_d = len(ship) - head_to_tail
-        known_ship = CoordinateSet.ray(ship_head, ship_tail)
+        known_ship = geometry.coordinate_set.ray(ship_head, ship_tail)
 
         # Return coordinates between head and tail.
         if max_d == 0:
@@ -322,29 +554,19 @@ class AttackBoard(GameBoard):
         deltas = []
         if len(known_ship) == 1:
             ship_coord = list(known_ship)[0]
-            for _d in ["LEFT", "RIGHT"]:
-                try:
-                    if ship_coordinates(ship_coord, len(ship), _d):
-                        deltas += DELTAS_H
-                        break
-                except ValueError:
-                    continue
-            for _d in ["UP", "DOWN"]:
-                try:
-                    if ship_coordinates(ship_coord, len(ship), _d):
-                        deltas += DELTAS_V
-                        break
-                except ValueError:
-                    continue
+            for _deltas in [DELTAS_H, deltas_v]:
+                if any(geometry.placement(ship_coord, len(ship), _d)
+                       for _d in _deltas):
+                    deltas += _deltas
         else:
-            for row in bitboard.BB_ROWS:
+            for row in geometry.rows:
                 if ship_set.issubset(row):
                     deltas = DELTAS_H
             if not deltas:
-                deltas = DELTAS_V
+                deltas = deltas_v
 
         for coord in known_ship:
-            mask = bitboard.near_attacks(coord, self.attacked,
+            mask = geometry.near_attacks(coord, self.attacked.mask,
                                          deltas, max_d=1)
             locations.update(mask)
 
@@ -352,24 +574,34 @@ class AttackBoard(GameBoard):
 
     def get_ship_attacks(self) -> CoordinateSet:
         """Return a set of potential ship coordinates."""
-        ship_attacks = CoordinateSet()
-        for ship in self.ships:
-            if self.ships[ship] and len(self.ships[ship]) < len(ship):
-                attacks = self._ship_attacks(ship)
-                ship_attacks.update(attacks)
-        return ship_attacks
-
-    def smallest_unsunk_ship(self) -> Ship:
-        """Return the smallest unsunk ship."""
-        smallest = Ship('Carrier')
+        wounded = [ship for ship, mask in self.ships.items()
+                   if mask and len(mask) < len(ship)]
+        new_set = self.geometry.coordinate_set
+        if not wounded:
+            return new_set()
+        return new_set(self._cached(
+            'ship_attacks', lambda: self._get_ship_attacks(wounded)))
+
+    def _get_ship_attacks(self, wounded: List[Ship]) -> bitboard.Bitboard:
+        ship_attacks = self.geometry.coordinate_set()
+        for ship in wounded:
+            ship_attacks.update(self._ship_attacks(ship))
+        return ship_attacks.mask
+
+    def smallest_unsunk_ship(self) -> Optional[Ship]:
+        """Return the smallest unsunk ship, or None if every ship is
+        sunk.
+        """
+        smallest = None
         for ship, mask in self.ships.items():
-            if len(ship) != len(mask) and len(ship) < len(smallest):
+            if len(ship) != len(mask) and (smallest is None
+                                           or len(ship) < len(smallest)):
                 smallest = ship
         return smallest
 
     def _coord_possibilities(self, ship: Ship) -> CoordinateSet:
         """Return coordinates a ship could legally occupy."""
-        return coord_possibilities(ship, self.attacked)
+        return coord_possibilities(ship, self.attacked, self.geometry)
 
     def coord_densities(self) -> List[Coordinate]:
         """Return a list of coordinates weighted by occurrences of possible
@@ -382,16 +614,108 @@ class AttackBoard(GameBoard):
         return density
 
     def _ship_possibilities(self, ship: Ship) -> List[CoordinateSet]:
-        return ship_possibilities(ship, self.attacked)
+        return ship_possibilities(ship, self.attacked, self.geometry)
 
     def ship_densities(self) -> List[Coordinate]:
         """Return a list of coordinates weighted with possible full ship
         occurences."""
+        return list(self._cached('ship_densities', self._ship_densities))
+
+    def _ship_densities(self) -> Tuple[Coordinate, ...]:
         density = []
+        for coordinate, count in enumerate(self.density_counts):
+            density += [coordinate] * count
+        return tuple(density)
+
+    def density_counter(self) -> DensityCounter:
+        """Return a bit-sliced count of possible full ship occurences."""
+        counter = DensityCounter()
+        attacked = self.attacked.mask
         for ship in self.ships:
             if not self.ships[ship]:
-                masks = self._ship_possibilities(ship)
-                for mask in masks:
-                    density += list(mask)
+                counter.update(mask for mask
+                               in self.geometry.placements[len(ship)]
+                               if not mask & attacked)
+        return counter
+
+    def max_ship_densities(self) -> CoordinateSet:
+        """Return the unattacked coordinates with the most possible full
+        ship occurences.
+        """
+        return self.geometry.coordinate_set(
+            self._cached('max_ship_densities', self._max_ship_densities))
+
+    def _max_ship_densities(self) -> bitboard.Bitboard:
+        # Live placements of unhit ships avoid every peg, so attacked
+        # coordinates always count zero.
+        densest = 1
+        mask = bitboard.BB_EMPTY
+        for coordinate, count in enumerate(self.density_counts):
+            if count < densest:
+                continue
+            if count > densest:
+                densest = count
+                mask = bitboard.BB_EMPTY
+            mask |= 1 << coordinate
+        return mask
 
-        return density
+    def _fleet_masks(self) -> List[Tuple[int, bitboard.Bitboard]]:
+        """Return `(length, known hits)` for every ship."""
+        return [(len(ship), mask.mask) for ship, mask in self.ships.items()]
+
+    def canonical(self) -> Canonical:
+        """Return the canonical form of the board under the board's
+        rotations and reflections, with the transform which produces it.
+
+        raises `ValueError` on boards other than 10x10.
+        """
+        if not self.geometry.is_classic():
+            raise ValueError("Canonical forms are only defined for the "
+                             "10x10 board")
+        return canonicalize(self.attacked.mask, self.hit.mask,
+                            [mask.mask for mask in self.ships.values()])
+
+    def sampled_densities(self, samples: int = SAMPLES,
+                          budget: Optional[float] = None) -> DensityEstimate:
+        """Estimate ship occupancy probabilities from fleet layouts drawn
+        consistent with the board.
+
+        Params
+        ------
+        samples : int
+            Maximum number of layouts to draw.
+        budget : float, optional
+            Maximum number of seconds to spend drawing layouts.
+        """
+        return sample_densities(self.attacked.mask, self.hit.mask,
+                                self._fleet_masks(), samples, budget,
+                                geometry=self.geometry)
+
+    def ship_posterior(self,
+                       max_nodes: int = MAX_NODES) -> Optional[Posterior]:
+        """Return exact ship occupancy probabilities over every joint
+        layout of the fleet consistent with the board, or None if the
+        search would visit more than `max_nodes` partial layouts.
+        """
+        return posterior(self.attacked.mask, self.hit.mask,
+                         self._fleet_masks(), max_nodes, self.geometry)
+
+    def likeliest_attacks(self, max_nodes: int = MAX_NODES) -> CoordinateSet:
+        """Return the unattacked coordinates most likely to hold a ship,
+        or an empty set if the exact posterior is too expensive.
+        """
+        ship_posterior = self.ship_posterior(max_nodes)
+        new_set = self.geometry.coordinate_set
+        if not ship_posterior:
+            return new_set()
+        return new_set(ship_posterior.max_density(~self.attacked.mask))
+
+    def likeliest_sampled_attacks(self, samples: int = SAMPLES,
+                                  budget: Optional[float] = None
+                                  ) -> CoordinateSet:
+        """Return the unattacked coordinates most often occupied in
+        sampled fleet layouts.
+        """
+        estimate = self.sampled_densities(samples, budget)
+        return self.geometry.coordinate_set(
+            estimate.max_density(~self.attacked.mask))
@@ -0,0 +1,396 @@
+"""Module for board geometries.
+
+A `Geometry` is a board of any width and height, up to 26 columns.  Its
+coordinates number the squares from ``0`` at A1 along each row, so
+coordinate ``c`` lies in column ``c % width`` and row ``c // width`` and its
+Bitboard is ``1 << c``, just as on the 10x10 board of `game.bitboard`.
+
+Every mask and table a board needs (shift masks, parity masks, rays and
+ship placements) is generated from the width and height, the tables on
+first use.  `CLASSIC_GEOMETRY` is the 10x10 board, whose tables are those of
+`game.bitboard`, loaded from the packaged table file.
+"""
+from functools import cached_property
+from string import ascii_uppercase
+from typing import Dict, Iterable, List, Tuple
+
+from game import bitboard, tables
+from game.bitboard import (BB_EMPTY, Bitboard, Coordinate, IntoCoordinateSet,
+                           coordinate_mask, into_mask)
+
+
+MAX_WIDTH = len(ascii_uppercase)
+
+
+class GeometrySet(bitboard.CoordinateSet):
+    """A set of coordinates on a board of a given `Geometry`.
+
+    `CoordinateSet` keeps its masks within the 10x10 board, so every
+    method which does so is overridden here to keep them within `_all`.
+    """
+
+    __slots__ = ()
+
+    _all: Bitboard
+    _geometry: 'Geometry'
+
+    def __init__(self, coordinates: IntoCoordinateSet = BB_EMPTY) -> None:
+        self.mask = into_mask(coordinates, self._all)
+
+    def add(self, coordinate: Coordinate) -> None:
+        self.mask |= coordinate_mask(coordinate, self._all)
+
+    def __reduce__(self):
+        # The class is built per geometry, so is pickled by its geometry.
+        return _geometry_set, (self._geometry, self.mask)
+
+    def isdisjoint(self, other: IntoCoordinateSet) -> bool:
+        return not self.mask & into_mask(other, self._all)
+
+    def issubset(self, other: IntoCoordinateSet) -> bool:
+        return not self.mask & ~into_mask(other, self._all)
+
+    def issuperset(self, other: IntoCoordinateSet) -> bool:
+        return not into_mask(other, self._all) & ~self.mask
+
+    def __or__(self, other: IntoCoordinateSet):
+        return self._new(self.mask | into_mask(other, self._all))
+
+    def __and__(self, other: IntoCoordinateSet):
+        return self._new(self.mask & into_mask(other, self._all))
+
+    def __sub__(self, other: IntoCoordinateSet):
+        return self._new(self.mask & ~into_mask(other, self._all))
+
+    def __xor__(self, other: IntoCoordinateSet):
+        return self._new(self.mask ^ into_mask(other, self._all))
+
+    def update(self, other: IntoCoordinateSet) -> None:
+        self.mask |= into_mask(other, self._all)
+
+    def __ior__(self, other: IntoCoordinateSet):
+        self.update(other)
+        return self
+
+    def intersection_update(self, other: IntoCoordinateSet) -> None:
+        self.mask &= into_mask(other, self._all)
+
+    def __iand__(self, other: IntoCoordinateSet):
+        self.intersection_update(other)
+        return self
+
+    def difference_update(self, other: IntoCoordinateSet) -> None:
+        self.mask &= ~into_mask(other, self._all)
+
+    def __isub__(self, other: IntoCoordinateSet):
+        self.difference_update(other)
+        return self
+
+    def symmetric_difference_update(self, other: IntoCoordinateSet) -> None:
+        self.mask ^= into_mask(other, self._all)
+
+    def __ixor__(self, other: IntoCoordinateSet):
+        self.symmetric_difference_update(other)
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        try:
+            return self.mask == into_mask(other, self._all)
+        except (TypeError, ValueError):
+            return NotImplemented
+
+    def __lshift__(self, shift: int):
+        return self._new((self.mask << shift) & self._all)
+
+    def __rshift__(self, shift: int):
+        return self._new((self.mask >> shift) & self._all)
+
+    def __ilshift__(self, shift: int):
+        self.mask = (self.mask << shift) & self._all
+        return self
+
+    def __irshift__(self, shift: int):
+        self.mask = (self.mask >> shift) & self._all
+        return self
+
+    def __invert__(self):
+        return self._new(~self.mask & self._all)
+
+    def tolist(self) -> List[bool]:
+        return [bool(self.mask >> c & 1) for c in self._geometry.coordinates]
+
+    def __str__(self) -> str:
+        return self._geometry.render(
+            ['1' if self.mask >> c & 1 else '.'
+             for c in self._geometry.coordinates], labels=False)
+
+    @classmethod
+    def ray(cls, a: Coordinate, b: Coordinate):
+        return cls._new(cls._geometry.ray(a, b))
+
+    @classmethod
+    def between(cls, a: Coordinate, b: Coordinate):
+        bb = cls._geometry.ray(a, b) & ~(1 << a) & ~(1 << b)
+        return cls._new(bb)
+
+    @classmethod
+    def from_coordinate(cls, coordinate: Coordinate):
+        if isinstance(coordinate, str):
+            coordinate = cls._geometry.parse_coordinate(coordinate)
+        return cls._new(coordinate_mask(coordinate, cls._all))
+
+
+def _geometry_set(geometry: 'Geometry', mask: Bitboard) -> GeometrySet:
+    """Rebuild a pickled `GeometrySet`."""
+    return geometry.coordinate_set(mask)
+
+
+class Geometry:
+    """A `width` x `height` board.
+
+    ``Geometry(width, height)`` returns the same object for the same size,
+    and ``Geometry(size)`` is a square board.
+
+    Attributes:
+    -----------
+    width, height, size : int
+        Columns, rows and coordinates of the board.
+    coordinates : range
+        Every coordinate.
+    coordinate_names : List[str]
+        Name of each coordinate, e.g. ``'A1'``.
+    bb_all : Bitboard
+        Every coordinate.
+    rows, cols : List[Bitboard]
+        Each row from row 1, and each column from column A.
+    bb_not_left, bb_not_right : Bitboard
+        Every coordinate but those of the first or last column, the masks
+        which stop a shift wrapping between rows.
+    evens, odds : Bitboard
+        The two colours of the checkerboard, A1 being even.
+    parities : List[Bitboard]
+        The hunt colours of a CPU, odds then evens.
+    directions : Dict[str, int]
+        Coordinate step of each direction a ship is laid in.
+    """
+
+    _interned: Dict[Tuple[int, int], 'Geometry'] = {}
+
+    def __new__(cls, width: int, height: int = 0) -> 'Geometry':
+        height = height or width
+        try:
+            return cls._interned[width, height]
+        except KeyError:
+            pass
+        if not 0 < width <= MAX_WIDTH or height < 1:
+            raise ValueError(f"Unsupported board size: {width}x{height}")
+        geometry = object.__new__(cls)
+        geometry._setup(width, height)
+        cls._interned[width, height] = geometry
+        return geometry
+
+    def _setup(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.coordinates = range(self.size)
+        self.coordinate_names = [col + str(row + 1) for row in range(height)
+                                 for col in ascii_uppercase[:width]]
+        self._index = {name: c for c, name in enumerate(self.coordinate_names)}
+
+        self.bb_all = (1 << self.size) - 1
+        self.rows = [((1 << width) - 1) << width * row
+                     for row in range(height)]
+        col_a = sum(1 << width * row for row in range(height))
+        self.cols = [col_a << col for col in range(width)]
+        self.bb_not_left = self.bb_all & ~self.cols[0]
+        self.bb_not_right = self.bb_all & ~self.cols[-1]
+        self.evens = sum(1 << c for c in self.coordinates
+                         if (self.row(c) + self.col(c)) % 2 == 0)
+        self.odds = self.bb_all & ~self.evens
+        self.parities = [self.odds, self.evens]
+        self.directions = {"UP": width, "DOWN": -width,
+                           "RIGHT": 1, "LEFT": -1}
+
+    def __reduce__(self):
+        return Geometry, (self.width, self.height)
+
+    def __repr__(self) -> str:
+        return f'Geometry({self.width}, {self.height})'
+
+    def __str__(self) -> str:
+        return f'{self.width}x{self.height}'
+
+    def is_classic(self) -> bool:
+        """Return True for the 10x10 board of `game.bitboard`."""
+        return self is CLASSIC_GEOMETRY
+
+    # Coordinates
+
+    def parse_coordinate(self, name: str) -> Coordinate:
+        """Get coordinate value from name."""
+        try:
+            return self._index[name]
+        except KeyError:
+            raise ValueError(f"{name!r} is not a coordinate") from None
+
+    def coordinate_name(self, coordinate: Coordinate) -> str:
+        """Get name of coordinate."""
+        return self.coordinate_names[coordinate]
+
+    def row(self, coordinate: Coordinate) -> int:
+        """Get index of coordinate's row where ``0`` is row 1."""
+        return coordinate // self.width
+
+    def col(self, coordinate: Coordinate) -> int:
+        """Get index of coordinate's column where ``0`` is column A."""
+        return coordinate % self.width
+
+    def step_distance(self, a: Coordinate, b: Coordinate) -> int:
+        """Get the distance from coordinate `a` to `b`."""
+        return max(abs(self.col(a) - self.col(b)),
+                   abs(self.row(a) - self.row(b)))
+
+    @cached_property
+    def coordinate_set(self) -> type:
+        """The `CoordinateSet` class of sets on this board."""
+        if self.is_classic():
+            return bitboard.CoordinateSet
+        return type('CoordinateSet', (GeometrySet,),
+                    {'__slots__': (), '_all': self.bb_all,
+                     '_geometry': self})
+
+    # Shifts
+
+    def shift_up(self, bb: Bitboard) -> Bitboard:
+        """Shift all coordinates up one row."""
+        return (bb << self.width) & self.bb_all
+
+    def shift_down(self, bb: Bitboard) -> Bitboard:
+        """Shift all coordinates down one row."""
+        return bb >> self.width
+
+    def shift_right(self, bb: Bitboard) -> Bitboard:
+        """Shift all coordinates right one column."""
+        return (bb << 1) & self.bb_not_left
+
+    def shift_left(self, bb: Bitboard) -> Bitboard:
+        """Shift all coordinates left one column."""
+        return (bb >> 1) & self.bb_not_right
+
+    # Rays and placements
+
+    def ray(self, a: Coordinate, b: Coordinate) -> Bitboard:
+        """Return Bitboard representation of all Coordinates between and
+        including a and b, or `BB_EMPTY` if they share no row or column.
+        """
+        low, high = min(a, b), max(a, b)
+        if self.row(low) == self.row(high):
+            return ((2 << high - low) - 1) << low
+        if self.col(low) == self.col(high):
+            return self.cols[self.col(low)] & ((2 << high) - (1 << low))
+        return BB_EMPTY
+
+    @cached_property
+    def rays(self) -> List[List[Bitboard]]:
+        """`ray(a, b)` of every pair of coordinates."""
+        if self.is_classic():
+            return tables.get('rays')
+        return [[self.ray(a, b) for b in self.coordinates]
+                for a in self.coordinates]
+
+    def placement(self, bow: Coordinate, length: int,
+                  delta: int) -> Bitboard:
+        """Return the Bitboard of a ship of `length` laid from `bow` in the
+        direction of `delta`, or `BB_EMPTY` if the ship would not fit.
+        """
+        tail = bow + delta * (length - 1)
+        if not 0 <= tail < self.size:
+            return BB_EMPTY
+        if abs(delta) == 1 and self.row(bow) != self.row(tail):
+            return BB_EMPTY
+        return self.ray(bow, tail)
+
+    def _placements(self, length: int) -> List[Bitboard]:
+        """Calculate all legal placements of a ship of `length`."""
+        placements = []
+        if length < 1:
+            return placements
+        for bow in self.coordinates:
+            deltas = [1, self.width] if length > 1 else [1]
+            for delta in deltas:
+                bb = self.placement(bow, length, delta)
+                if bb:
+                    placements.append(bb)
+        return placements
+
+    @cached_property
+    def placements(self) -> List[List[Bitboard]]:
+        """Every placement of a ship of each length, by length."""
+        if self.is_classic():
+            return tables.get('placements')
+        return [self._placements(length)
+                for length in range(max(self.width, self.height) + 1)]
+
+    @cached_property
+    def coordinate_placements(self) -> List[List[List[int]]]:
+        """Indices into `placements[length]` of the placements covering
+        each coordinate, by length.
+        """
+        if self.is_classic():
+            return tables.get('coordinate_placements')
+        coordinate_placements = []
+        for placements in self.placements:
+            by_coordinate = [[] for _ in self.coordinates]
+            for i, bb in enumerate(placements):
+                for coord in bitboard.scan_forward(bb):
+                    by_coordinate[coord].append(i)
+            coordinate_placements.append(by_coordinate)
+        return coordinate_placements
+
+    @cached_property
+    def placement_coordinates(self) -> List[List[List[Coordinate]]]:
+        """The coordinates of every placement, by length."""
+        if self.is_classic():
+            return tables.get('placement_coordinates')
+        return [[list(bitboard.scan_forward(bb)) for bb in placements]
+                for placements in self.placements]
+
+    def near_attacks(self, coord: Coordinate, occupied: Bitboard,
+                     deltas: Iterable[int], max_d: int = 4) -> Bitboard:
+        """Calculate all attackable coordinates from starting coordinate,
+        stepping up to `max_d` times in each direction of `deltas` until
+        the edge of the board or an `occupied` coordinate.
+        """
+        attacks = BB_EMPTY
+        for delta in deltas:
+            horizontal = abs(delta) == 1
+            prev = coord
+            for _ in range(max_d):
+                _co = prev + delta
+                if (not 0 <= _co < self.size
+                        or horizontal and self.row(_co) != self.row(prev)
+                        or occupied >> _co & 1):
+                    break
+                attacks |= 1 << _co
+                prev = _co
+        return attacks
+
+    # Rendering
+
+    def render(self, symbols: List[str], labels: bool = True) -> str:
+        """Render one single character symbol per coordinate as a board,
+        row 1 at the bottom, with row and column labels if `labels`.
+        """
+        lines = []
+        for row in reversed(range(self.height)):
+            line = ' '.join(symbols[row * self.width:(row + 1) * self.width])
+            lines.append(f'| {line} | {row + 1}' if labels else line)
+        if not labels:
+            return '\n'.join(lines)
+        border = '+' + '-' * (2 * self.width + 1) + '+'
+        cols = '  ' + ' '.join(ascii_uppercase[:self.width])
+        return '\n'.join([border] + lines + [border, cols])
+
+
+CLASSIC_GEOMETRY = Geometry(10, 10)
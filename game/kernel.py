@@ -0,0 +1,235 @@
+"""Module for the headless game kernel used for CPU vs CPU play.
+
+The kernel plays the same game as `game.battleship.Battleship`, but keeps
+every coordinate as an integer and resolves shots directly against the
+defender's ship masks.  Nothing is rendered unless a log is requested, so
+`Battleship` remains the interactive front end.
+
+Both CPUs must play on boards of the same `game.geometry.Geometry`.  Logs
+and records, whose shots are single bytes, need the 10x10 board.
+
+`play_salvo_game` plays the salvo variant, in which each turn a player
+fires one shot per ship they have afloat, and the whole salvo is resolved
+at once with `ShipBoard.resolve_salvo`.
+"""
+from time import perf_counter_ns
+from typing import Optional, Tuple
+
+from game.battleship import GameLog
+from game.player import CPU, Player
+from game.records import GameRecord, fleet_masks, result_code
+from game.timing import CHOOSE, PLACE, RESOLVE, MoveTimings
+
+
+KernelResult = Tuple[Player, Player, int, Optional[GameLog]]
+
+
+def place_ships(player: CPU) -> None:
+    """Clear the CPU's boards and randomly place its fleet."""
+    player.clear_boards()
+    player.set_ships_placed(False)
+    player.place_fleet()
+    player.set_ships_placed(True)
+
+
+def _play(players: Tuple[CPU, CPU], shots: Optional[bytearray],
+          timings: Optional[MoveTimings]) -> Tuple[Optional[int], int]:
+    """Play a game, appending each shot's coordinate and result code to
+    `shots` if given.
+
+    Returns the index of the winner, or None on a timeout, and the number
+    of half turns played.
+    """
+    fleets = []
+    afloat = []
+    for player in players:
+        if timings is None:
+            place_ships(player)
+        else:
+            start = perf_counter_ns()
+            place_ships(player)
+            timings.record(player.level, PLACE, 0, perf_counter_ns() - start)
+        fleets.append([[ship, mask.mask]
+                       for ship, mask in player.ship_board.ships.items()])
+        afloat.append(player.ship_board.occupied.mask)
+
+    half_turns = 0
+    max_half_turns = 2 * players[0].geometry.size
+    while half_turns < max_half_turns:
+        turn = half_turns & 1
+        attacker = players[turn]
+        board = players[turn ^ 1].ship_board
+
+        if timings is not None:
+            start = perf_counter_ns()
+        coord = attacker.choose_index()
+        if timings is not None:
+            timings.record(attacker.level, CHOOSE, half_turns // 2 + 1,
+                           perf_counter_ns() - start)
+            start = perf_counter_ns()
+        bb_coord = 1 << coord
+        board.attacked.mask |= bb_coord
+        hit = bool(afloat[turn ^ 1] & bb_coord)
+        sunk = False
+        ship = None
+        if hit:
+            board.hit.mask |= bb_coord
+            afloat[turn ^ 1] ^= bb_coord
+            for entry in fleets[turn ^ 1]:
+                if entry[1] & bb_coord:
+                    entry[1] ^= bb_coord
+                    ship = entry[0]
+                    sunk = not entry[1]
+                    break
+        else:
+            board.miss.mask |= bb_coord
+
+        attacker.add_attack_peg(coord, (hit, sunk, ship))
+        if timings is not None:
+            timings.record(attacker.level, RESOLVE, half_turns // 2 + 1,
+                           perf_counter_ns() - start)
+        if shots is not None:
+            shots.append(coord)
+            shots.append(result_code(hit, sunk, ship and ship.ship_type()))
+        half_turns += 1
+        if not afloat[turn ^ 1]:
+            return turn, half_turns
+    return None, half_turns
+
+
+def _result(players: Tuple[CPU, CPU], winner: Optional[int],
+            half_turns: int, log: Optional[GameLog]) -> KernelResult:
+    """Build the `KernelResult` of a game."""
+    turns = (half_turns + 1) // 2
+    if winner is None:
+        return None, None, turns + 1, log
+    return players[winner], players[winner ^ 1], turns, log
+
+
+def _check_recordable(players: Tuple[CPU, CPU]) -> None:
+    """Raise `ValueError` unless a game between `players` can be
+    recorded.
+    """
+    if not all(player.geometry.is_classic() for player in players):
+        raise ValueError("Only games on the 10x10 board can be recorded")
+
+
+def _record(players: Tuple[CPU, CPU], winner: Optional[int],
+            shots: bytearray) -> GameRecord:
+    """Build the `GameRecord` of a game."""
+    return GameRecord(
+        tuple(player.level for player in players), winner,
+        tuple(fleet_masks(player.ship_board) for player in players),
+        bytes(shots))
+
+
+def play_game(player1: CPU, player2: CPU, log: bool = False,
+              timings: Optional[MoveTimings] = None) -> KernelResult:
+    """Play a full game between two CPUs.
+
+    PARAMS
+    ------
+    player1 : CPU
+        The CPU which moves first.
+    player2 : CPU
+        The CPU which moves second.
+    log : bool
+        If True, build a `GameLog` of the shots.
+    timings : MoveTimings, optional
+        If given, record the latency of each placement, move and shot.
+
+    RETURNS
+    -------
+    result : KernelResult
+        (winner, loser, turns, log)
+    """
+    players = (player1, player2)
+    shots = None
+    if log:
+        _check_recordable(players)
+        shots = bytearray()
+    winner, half_turns = _play(players, shots, timings)
+    game_log = None
+    if shots is not None:
+        game_log = GameLog.from_record(_record(players, winner, shots))
+    return _result(players, winner, half_turns, game_log)
+
+
+def record_game(player1: CPU, player2: CPU,
+                timings: Optional[MoveTimings] = None
+                ) -> Tuple[KernelResult, GameRecord]:
+    """Play a full game between two CPUs as `play_game` does, also
+    returning a `GameRecord` of the fleets and shots.
+    """
+    players = (player1, player2)
+    _check_recordable(players)
+    shots = bytearray()
+    winner, half_turns = _play(players, shots, timings)
+    return (_result(players, winner, half_turns, None),
+            _record(players, winner, shots))
+
+
+def _play_salvo(players: Tuple[CPU, CPU],
+                timings: Optional[MoveTimings]) -> Tuple[Optional[int], int]:
+    """Play a salvo game.
+
+    Returns the index of the winner, or None on a timeout, and the number
+    of half turns played.
+    """
+    for player in players:
+        if timings is None:
+            place_ships(player)
+        else:
+            start = perf_counter_ns()
+            place_ships(player)
+            timings.record(player.level, PLACE, 0, perf_counter_ns() - start)
+
+    half_turns = 0
+    max_half_turns = 2 * players[0].geometry.size
+    while half_turns < max_half_turns:
+        turn = half_turns & 1
+        attacker = players[turn]
+        board = players[turn ^ 1].ship_board
+
+        if timings is not None:
+            start = perf_counter_ns()
+        salvo = attacker.choose_salvo(attacker.ships_afloat())
+        if timings is not None:
+            timings.record(attacker.level, CHOOSE, half_turns // 2 + 1,
+                           perf_counter_ns() - start)
+            start = perf_counter_ns()
+        attacker.add_attack_salvo(board.resolve_salvo(salvo))
+        if timings is not None:
+            timings.record(attacker.level, RESOLVE, half_turns // 2 + 1,
+                           perf_counter_ns() - start)
+        half_turns += 1
+        if board.check_all_sunk():
+            return turn, half_turns
+    return None, half_turns
+
+
+def play_salvo_game(player1: CPU, player2: CPU,
+                    timings: Optional[MoveTimings] = None) -> KernelResult:
+    """Play a full salvo game between two CPUs.
+
+    Each turn the attacker fires one shot per ship of theirs afloat,
+    choosing every shot before any is resolved.  Salvo games have no log.
+
+    PARAMS
+    ------
+    player1 : CPU
+        The CPU which moves first.
+    player2 : CPU
+        The CPU which moves second.
+    timings : MoveTimings, optional
+        If given, record the latency of each placement, salvo and
+        resolution.
+
+    RETURNS
+    -------
+    result : KernelResult
+        (winner, loser, turns, None)
+    """
+    players = (player1, player2)
+    winner, half_turns = _play_salvo(players, timings)
+    return _result(players, winner, half_turns, None)
@@ -0,0 +1,96 @@
+"""Module for drawing random fleet layouts.
+
+Each ship is drawn uniformly from its placements which do not overlap the
+ships already placed, the same distribution as repeatedly picking a random
+bow and direction until a ship fits, but without ever retrying.  Remaining
+placements are tracked as bitsets over the per-length placement tables and
+narrowed with the pairwise conflict index after every ship.
+"""
+import random
+from array import array
+from typing import List, Optional, Sequence
+
+import game.bitboard as bitboard
+from game.geometry import CLASSIC_GEOMETRY, Geometry
+from game.posterior import placement_conflicts
+from game.sampling import select_bit
+from game.ship import SHIP_LENGTHS
+
+
+MAX_REDRAWS = 1000
+
+
+def _all_placements(length: int, geometry: Geometry) -> int:
+    """Return a bitset of every placement of a ship of `length`."""
+    return (1 << len(geometry.placements[length])) - 1
+
+
+def random_placements(lengths: Sequence[int] = SHIP_LENGTHS, rng=random,
+                      geometry: Geometry = CLASSIC_GEOMETRY) -> List[int]:
+    """Return a random placement index for each ship in `lengths`.
+
+    A crowded fleet can leave no placement for a later ship, in which case
+    the layout is drawn again, up to `MAX_REDRAWS` times.
+
+    raises `ValueError` if the fleet does not fit on the board, or no
+    layout is found.
+    """
+    if sum(lengths) > geometry.size:
+        raise ValueError(f"A fleet of {sum(lengths)} coordinates does not "
+                         f"fit on a {geometry} board")
+    for _ in range(MAX_REDRAWS):
+        indices = _draw_placements(lengths, rng, geometry)
+        if indices is not None:
+            return indices
+    raise ValueError(f"Unable to lay out the fleet on a {geometry} board")
+
+
+def _draw_placements(lengths: Sequence[int], rng,
+                     geometry: Geometry) -> Optional[List[int]]:
+    """Draw a placement index for each ship in `lengths`, or return None
+    if a ship is left with no placement.
+    """
+    lives = [_all_placements(length, geometry) for length in lengths]
+    indices = []
+    for ship, length in enumerate(lengths):
+        if not lives[ship]:
+            return None
+        i = select_bit(lives[ship], rng.randrange(
+            bitboard.popcount(lives[ship])))
+        indices.append(i)
+        for other in range(ship + 1, len(lengths)):
+            lives[other] &= ~placement_conflicts(length, lengths[other],
+                                                 geometry)[i]
+    return indices
+
+
+def layout_masks(indices: Sequence[int],
+                 lengths: Sequence[int] = SHIP_LENGTHS,
+                 geometry: Geometry = CLASSIC_GEOMETRY
+                 ) -> List[bitboard.Bitboard]:
+    """Convert placement indices to a Bitboard for each ship."""
+    return [geometry.placements[length][i]
+            for i, length in zip(indices, lengths)]
+
+
+def random_layout(lengths: Sequence[int] = SHIP_LENGTHS, rng=random,
+                  geometry: Geometry = CLASSIC_GEOMETRY
+                  ) -> List[bitboard.Bitboard]:
+    """Return a random non-overlapping Bitboard for each ship in
+    `lengths`.
+    """
+    return layout_masks(random_placements(lengths, rng, geometry), lengths,
+                        geometry)
+
+
+def random_layouts(num_layouts: int, lengths: Sequence[int] = SHIP_LENGTHS,
+                   rng=random) -> array:
+    """Draw many layouts as a flat array of placement indices.
+
+    Layout ``n`` occupies entries ``n * len(lengths)`` up to
+    ``(n + 1) * len(lengths)``; decode one with `layout_masks`.
+    """
+    layouts = array('H')
+    for _ in range(num_layouts):
+        layouts.extend(random_placements(lengths, rng))
+    return layouts
@@ -6,54 +6,47 @@ Player - Human player
 CPU - AI player
 """
 import random
-from typing import Dict, List, Tuple
+from typing import List, Optional, Tuple, Union
 
 import game.bitboard as bitboard
-from game.gameboards import AttackBoard, ShipBoard
-from game.ship import Ship
+from game.gameboards import AttackBoard, SalvoResult, ShipBoard
+from game.geometry import CLASSIC_GEOMETRY, Geometry
+from game.layouts import random_layout
+from game.sampling import SAMPLES
+from game.ship import CLASSIC_FLEET, Fleet, Ship
+from game.strategies import (AttackState, Strategy, get_strategy,
+                             level_strategy, random_coordinate)
 
 
 AttackResult = Tuple[bool, Ship]
 
-COORDINATES = bitboard.COORDINATE_NAMES
-ODD_COORDS = bitboard.CoordinateSet(bitboard.BB_ODDS)
-EVEN_COORDS = bitboard.CoordinateSet(bitboard.BB_EVENS)
-
-
-CHOICES = {
-    "coordinate": bitboard.COORDINATE_NAMES,
-    "direction": ["UP", "DOWN", "LEFT", "RIGHT"],
-}
-
-
-def get_probabilities(items: List[object]) -> Dict[int, List[object]]:
-    """Calculate percent probability of each unique object in list."""
-    probabilities = {}
-    items.sort()
-    #  total_items = len(items)
-    while items:
-        item = items[0]
-        num_item = items.count(item)
-        item_prob = num_item  # int(100 * num_item / total_items)
-        if item_prob not in probabilities:
-            probabilities[item_prob] = []
-        probabilities[item_prob].append(item)
-        items = items[num_item:]
-    return probabilities
+# What a human enters to quit.  Matched exactly, as boards 17 or more
+# columns wide have a column Q.
+QUIT = ["Q", "QUIT"]
 
 
 class Player:
     """The human player."""
 
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, fleet: Fleet = CLASSIC_FLEET,
+                 geometry: Geometry = CLASSIC_GEOMETRY) -> None:
         """Initialize a Player.
 
         Params
         ------
         name : str
             Player's name
+
+        OPTIONAL PARAMS
+        ---------------
+        fleet : Fleet
+            The ships each player places.
+        geometry : Geometry
+            The size of the boards.
         """
         self.name = name
+        self.fleet = fleet
+        self.geometry = geometry
         self.wins = 0
         self.losses = 0
 
@@ -78,8 +71,8 @@ class Player:
 
     def clear_boards(self) -> None:
         """Clear boards for a new game."""
-        self.attack_board = AttackBoard()
-        self.ship_board = ShipBoard()
+        self.attack_board = AttackBoard(self.fleet, self.geometry)
+        self.ship_board = ShipBoard(self.fleet, self.geometry)
 
     def set_ships_placed(self, all_placed: bool) -> None:
         """Update ships_placed variable."""
@@ -156,10 +149,21 @@ class Player:
         """
         self.ship_board.add_peg(coordinate, result)
 
+    def add_attack_salvo(self, result: SalvoResult) -> None:
+        """Add the pegs of a resolved salvo to the AttackBoard."""
+        self.attacks += bitboard.popcount(result.shots)
+        self.hits += bitboard.popcount(result.hit)
+        self.attack_board.add_salvo(result)
+
+    def ships_afloat(self) -> int:
+        """Return the number of ships on the ShipBoard not yet sunk."""
+        board = self.ship_board
+        return sum(1 for ship in board.ships if not board.check_sunk(ship))
+
     def _attack_options(self) -> List[str]:
         """Return a list of coordinate names which have not been attacked."""
         unattacked = ~self.attack_board.attacked
-        return [bitboard.COORDINATE_NAMES[i] for i in unattacked]
+        return [self.geometry.coordinate_names[i] for i in unattacked]
 
     def is_dead(self) -> bool:
         """Return True if all player's ships are sunk."""
@@ -182,7 +186,7 @@ class Human(Player):
         """Prompt Player for choice of direction."""
         options = ["UP", "DOWN", "LEFT", "RIGHT"]
         choice = ''
-        while choice not in options and "Q" not in choice:
+        while choice not in options and choice not in QUIT:
             choice = input('Choose Direction: ').upper()
         return choice
 
@@ -190,7 +194,7 @@ class Human(Player):
         """Prompt player to choose a coordinate."""
         options = self._attack_options()
         choice = ''
-        while choice not in options and "Q" not in choice:
+        while choice not in options and choice not in QUIT:
             choice = input('Choose Coordinate: ').upper()
         return choice
 
@@ -198,44 +202,80 @@ class Human(Player):
 class CPU(Player):
     """The AI variant of a Player."""
 
-    def __init__(self, name: str, level: int = 0) -> None:
-        super().__init__(name)
-        self.level = level
-        self.strat = None
+    def __init__(self, name: str, level: int = 0, samples: int = SAMPLES,
+                 budget: Optional[float] = None,
+                 strategy: Union[str, Strategy, None] = None,
+                 fleet: Fleet = CLASSIC_FLEET,
+                 geometry: Geometry = CLASSIC_GEOMETRY) -> None:
+        """Initialize a CPU.
+
+        Params
+        ------
+        name : str
+            CPU's name
+        level : int
+            Difficulty level from 0 (random) to 4 (exact posterior).
+        samples : int
+            Layouts sampled per level 4 move when the exact posterior is
+            too expensive.
+        budget : float, optional
+            Seconds allowed for sampling layouts per level 4 move.
+        strategy : str or Strategy, optional
+            Attack strategy, or the name of a registered one, to play
+            instead of the level's; see `game.strategies`.
+        fleet : Fleet
+            The ships each player places.
+        geometry : Geometry
+            The size of the boards.
+        """
+        if strategy is None:
+            strategy = level_strategy(level, samples, budget)
+        elif isinstance(strategy, str):
+            strategy = get_strategy(strategy)
+        self.strategy = strategy
+        self.level = getattr(strategy, 'level', None)
+        super().__init__(name, fleet, geometry)
 
     def clear_boards(self) -> None:
         """Clear boards for a new game."""
         super().clear_boards()
-        self._choose_hunt_strategy()
-
-    def _choose_hunt_strategy(self) -> None:
-        self.strat = random.choice([ODD_COORDS, EVEN_COORDS])
-
-    def _attack_options(self) -> List[str]:
-        """Return a list of coordinate names which have not been attacked."""
-        options = ~self.attack_board.attacked
-        if self.ships_placed and self.level > 0:
-            ship_attacks = self._get_ship_attacks()
-            if ship_attacks:
-                options = ship_attacks
-            elif self.level == 3:
-                densities = self.attack_board.ship_densities()
-                prob_table = get_probabilities(densities)
-                top_prob = sorted(prob_table)[-1]
-                options = [i for i in prob_table[top_prob] if i in self.strat]
-                if not options:
-                    options = prob_table[top_prob]
-            elif self.level == 2:
-                options.intersection_update(self.strat)
-        return [COORDINATES[i] for i in options]
-
-    def _get_ship_attacks(self) -> bitboard.CoordinateSet:
-        return self.attack_board.get_ship_attacks()
+        self.strategy.new_game()
 
     def choose_coordinate(self) -> str:
         """Choose an attack coordinate."""
-        options = self._attack_options()
-        return random.choice(options)
+        return self.geometry.coordinate_names[self.choose_index()]
+
+    def choose_index(self) -> bitboard.Coordinate:
+        """Choose an attack coordinate as a `bitboard.Coordinate`."""
+        if not self.ships_placed:
+            return random_coordinate(~self.attack_board.attacked.mask
+                                     & self.geometry.bb_all)
+        return self.strategy.choose(AttackState(self.attack_board))
+
+    def choose_salvo(self, shots: int) -> bitboard.Bitboard:
+        """Choose up to `shots` distinct unattacked coordinates to attack
+        at once, each chosen knowing the ones before it.
+        """
+        unattacked = ~self.attack_board.attacked.mask & self.geometry.bb_all
+        shots = min(shots, bitboard.popcount(unattacked))
+        salvo = bitboard.BB_EMPTY
+        for _ in range(shots):
+            if not self.ships_placed:
+                coord = random_coordinate(unattacked & ~salvo)
+            else:
+                coord = self.strategy.choose(
+                    AttackState(self.attack_board, salvo))
+                if salvo >> coord & 1:
+                    # A strategy which ignores the pending shots.
+                    coord = random_coordinate(unattacked & ~salvo)
+            salvo |= 1 << coord
+        return salvo
+
+    def place_fleet(self) -> None:
+        """Place every ship on a random legal layout."""
+        layout = random_layout(self.fleet.lengths, geometry=self.geometry)
+        for ship, mask in zip(self.fleet, layout):
+            self.ship_board.add_ship_mask(ship, mask)
 
     @staticmethod
     def choose_direction() -> str:
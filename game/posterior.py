@@ -0,0 +1,299 @@
+"""Module for the exact posterior of ship occupancy on an attack board.
+
+Every joint placement of the remaining fleet which agrees with the pegs on
+the board is equally likely.  Counting those layouts per coordinate gives the
+exact probability that each coordinate holds a ship.
+
+Placements of each ship are tracked as bitsets over the per-length placement
+tables of the board's `game.geometry.Geometry`, so choosing a placement for
+one ship removes the overlapping placements of every other ship with a
+single mask from the pairwise compatibility index.
+"""
+import functools
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import game.bitboard as bitboard
+from game.bitboard import BB_EMPTY, Bitboard
+from game.density import DensityCounter
+from game.geometry import CLASSIC_GEOMETRY, Geometry
+
+
+FleetMasks = Sequence[Tuple[int, Bitboard]]
+
+MAX_NODES = 5_000
+
+
+@functools.lru_cache(maxsize=None)
+def placement_cover(length: int,
+                    geometry: Geometry = CLASSIC_GEOMETRY) -> List[int]:
+    """Return a bitset of placement indices covering each coordinate."""
+    return [sum(1 << i for i in indices)
+            for indices in geometry.coordinate_placements[length]]
+
+
+@functools.lru_cache(maxsize=None)
+def placement_conflicts(length_a: int, length_b: int,
+                        geometry: Geometry = CLASSIC_GEOMETRY) -> List[int]:
+    """Return, for each placement of a ship of `length_a`, a bitset of the
+    placements of a ship of `length_b` which overlap it.
+    """
+    cover = placement_cover(length_b, geometry)
+    conflicts = []
+    for mask in geometry.placements[length_a]:
+        conflict = 0
+        for coord in bitboard.scan_forward(mask):
+            conflict |= cover[coord]
+        conflicts.append(conflict)
+    return conflicts
+
+
+def live_placements(length: int, blocked: Bitboard,
+                    required: Bitboard = BB_EMPTY,
+                    geometry: Geometry = CLASSIC_GEOMETRY) -> int:
+    """Return a bitset of placements of a ship of `length` which avoid
+    `blocked` and cover every coordinate in `required`.
+    """
+    cover = placement_cover(length, geometry)
+    live = (1 << len(geometry.placements[length])) - 1
+    for coord in bitboard.scan_forward(blocked):
+        live &= ~cover[coord]
+    for coord in bitboard.scan_forward(required):
+        live &= cover[coord]
+    return live
+
+
+def fleet_placements(attacked: Bitboard, hit: Bitboard, fleet: FleetMasks,
+                     geometry: Geometry = CLASSIC_GEOMETRY
+                     ) -> Tuple[List[Tuple[int, int]], Bitboard]:
+    """Return `(length, live)` for each ship, most constrained first, and
+    the hits not yet attributed to any ship.
+    """
+    misses = attacked & ~hit
+    attributed = BB_EMPTY
+    for _, known in fleet:
+        attributed |= known
+
+    ships = []
+    for length, known in fleet:
+        blocked = misses | (attributed & ~known)
+        ships.append((length, live_placements(length, blocked, known,
+                                              geometry)))
+    ships.sort(key=lambda ship: bitboard.popcount(ship[1]))
+    return ships, hit & ~attributed
+
+
+class _BudgetExceeded(Exception):
+    """Raised internally when the search visits too many layouts."""
+
+
+class Posterior:
+    """Occupancy counts over all consistent joint fleet layouts.
+
+    Attributes:
+    -----------
+    total : int
+        Number of consistent layouts.
+    counts : List[int]
+        Number of consistent layouts in which each coordinate is occupied.
+    geometry : Geometry
+        The board.
+    """
+
+    def __init__(self, total: int, counts: List[int],
+                 geometry: Geometry = CLASSIC_GEOMETRY) -> None:
+        self.total = total
+        self.counts = counts
+        self.geometry = geometry
+
+    def __bool__(self) -> bool:
+        return bool(self.total)
+
+    def probability(self, coordinate: bitboard.Coordinate) -> float:
+        """Return the probability that `coordinate` holds a ship."""
+        if not self.total:
+            return 0.0
+        return self.counts[coordinate] / self.total
+
+    def tolist(self) -> List[float]:
+        """Convert posterior to a list of probabilities by coordinate."""
+        return [self.probability(coord)
+                for coord in self.geometry.coordinates]
+
+    def max_density(self, mask: Optional[Bitboard] = None) -> Bitboard:
+        """Return the coordinates in `mask`, by default the whole board,
+        most likely to hold a ship.
+        """
+        best = 0
+        bb = BB_EMPTY
+        if mask is None:
+            mask = self.geometry.bb_all
+        for coord in bitboard.scan_forward(mask & self.geometry.bb_all):
+            count = self.counts[coord]
+            if count > best:
+                best = count
+                bb = BB_EMPTY
+            if count and count == best:
+                bb |= 1 << coord
+        return bb
+
+
+class _Search:
+    """Memoized depth-first count of joint placements of a fleet."""
+
+    def __init__(self, lengths: List[int], lives: List[int],
+                 max_nodes: int, geometry: Geometry = CLASSIC_GEOMETRY
+                 ) -> None:
+        self.lengths = lengths
+        self.lives = lives
+        self.max_nodes = max_nodes
+        self.geometry = geometry
+        self.nodes = 0
+        self.memo: Dict[Tuple[int, Bitboard, Bitboard], int] = {}
+        self.conflicts = [
+            [placement_conflicts(a, b, geometry) for b in lengths]
+            for a in lengths
+        ]
+
+        # Only coordinates a remaining ship could still occupy matter when
+        # keying the memo on the coordinates already taken.
+        self.reach = [BB_EMPTY] * (len(lengths) + 1)
+        for depth in reversed(range(len(lengths))):
+            table = geometry.placements[lengths[depth]]
+            reach = self.reach[depth + 1]
+            for i in bitboard.scan_forward(lives[depth]):
+                reach |= table[i]
+            self.reach[depth] = reach
+
+    def _children(self, depth: int, occupied: Bitboard,
+                  unexplained: Bitboard, lives: Tuple[int, ...]):
+        """Yield each placement of the ship at `depth` with its child."""
+        table = self.geometry.placements[self.lengths[depth]]
+        conflicts = self.conflicts[depth]
+        for i in bitboard.scan_forward(lives[0]):
+            rest = tuple(live & ~conflicts[depth + 1 + j][i]
+                         for j, live in enumerate(lives[1:]))
+            if all(rest):
+                mask = table[i]
+                yield i, occupied | mask, unexplained & ~mask, rest
+
+    def _last(self, unexplained: Bitboard, lives: Tuple[int, ...]) -> int:
+        """Return a bitset of placements for the final ship."""
+        valid = lives[0]
+        cover = placement_cover(self.lengths[-1], self.geometry)
+        for coord in bitboard.scan_forward(unexplained):
+            valid &= cover[coord]
+        return valid
+
+    def count(self, depth: int, occupied: Bitboard, unexplained: Bitboard,
+              lives: Tuple[int, ...]) -> int:
+        """Return the number of layouts of the ships from `depth` on."""
+        if depth == len(self.lengths):
+            return 0 if unexplained else 1
+        if depth == len(self.lengths) - 1:
+            return bitboard.popcount(self._last(unexplained, lives))
+        if unexplained & ~self.reach[depth]:
+            return 0
+
+        key = (depth, occupied & self.reach[depth], unexplained)
+        if key in self.memo:
+            return self.memo[key]
+
+        total = 0
+        for _, child, child_unexplained, rest in self._children(
+                depth, occupied, unexplained, lives):
+            self.nodes += 1
+            if self.nodes > self.max_nodes:
+                raise _BudgetExceeded
+            total += self.count(depth + 1, child, child_unexplained, rest)
+        self.memo[key] = total
+        return total
+
+    def marginals(self, unexplained: Bitboard) -> Tuple[int, List[int]]:
+        """Return the layout count and per-coordinate occupancy counts.
+
+        Walks the memoized search one ship at a time, carrying how many
+        partial layouts reach each position, so every placement is weighted
+        by the layouts through it without revisiting the subtrees.
+        """
+        lives = tuple(self.lives)
+        total = self.count(0, BB_EMPTY, unexplained, lives)
+        counts = [0] * self.geometry.size
+        if not total or not self.lengths:
+            return total, counts
+
+        layer = {(BB_EMPTY, unexplained): (1, BB_EMPTY, lives)}
+        for depth, length in enumerate(self.lengths):
+            table = self.geometry.placements[length]
+            weights: Dict[int, int] = {}
+            last = DensityCounter()
+            next_layer: Dict[Tuple[Bitboard, Bitboard],
+                             Tuple[int, Bitboard, Tuple[int, ...]]] = {}
+            for (_, node_unexplained), (mass, occupied, node_lives) in \
+                    layer.items():
+                if depth == len(self.lengths) - 1:
+                    last.add(self._last(node_unexplained, node_lives), mass)
+                    continue
+                for i, child, child_unexplained, rest in self._children(
+                        depth, occupied, node_unexplained, node_lives):
+                    paths = self.count(depth + 1, child, child_unexplained,
+                                       rest)
+                    if not paths:
+                        continue
+                    weights[i] = weights.get(i, 0) + mass * paths
+                    key = (child & self.reach[depth + 1], child_unexplained)
+                    if key in next_layer:
+                        prev = next_layer[key]
+                        next_layer[key] = (prev[0] + mass, prev[1], prev[2])
+                    else:
+                        next_layer[key] = (mass, child, rest)
+            for i in bitboard.scan_forward(last.nonzero()):
+                weights[i] = last.count(i)
+            for i, weight in weights.items():
+                for coord in bitboard.scan_forward(table[i]):
+                    counts[coord] += weight
+            layer = next_layer
+        return total, counts
+
+
+def posterior(attacked: Bitboard, hit: Bitboard, fleet: FleetMasks,
+              max_nodes: int = MAX_NODES,
+              geometry: Geometry = CLASSIC_GEOMETRY) -> Optional[Posterior]:
+    """Calculate exact occupancy probabilities for the remaining fleet.
+
+    PARAMS
+    ------
+    attacked : Bitboard
+        Every attacked coordinate.
+    hit : Bitboard
+        Every attacked coordinate which hit a ship.
+    fleet : Sequence[Tuple[int, Bitboard]]
+        `(length, known)` for each ship, where `known` holds the hits
+        already attributed to that ship.
+    max_nodes : int
+        Maximum number of partial layouts to visit before giving up.
+    geometry : Geometry
+        The board.
+
+    RETURNS
+    -------
+    posterior : Posterior or None
+        None if the search exceeds `max_nodes`.
+    """
+    ships, unexplained = fleet_placements(attacked, hit, fleet, geometry)
+
+    # Without memo hits the search visits the product of the live
+    # placement counts of every ship but the last.  Memoization rarely
+    # saves more than half of that, so skip searches that cannot finish.
+    bound = 1
+    for _, live in ships[:-1]:
+        bound *= bitboard.popcount(live)
+    if bound > 2 * max_nodes:
+        return None
+
+    search = _Search([length for length, _ in ships],
+                     [live for _, live in ships], max_nodes, geometry)
+    try:
+        total, counts = search.marginals(unexplained)
+    except _BudgetExceeded:
+        return None
+    return Posterior(total, counts, geometry)
@@ -0,0 +1,209 @@
+"""Module for compact binary game records.
+
+A record file starts with a header of the magic bytes and format version,
+followed by game records laid out one after another:
+
+    levels      2 bytes   CPU level of each player, 255 for a Human or a
+                          CPU playing a strategy without a level
+    winner      1 byte    0 or 1, or 255 if the game timed out
+    num_shots   2 bytes   little-endian
+    fleets      130 bytes each player's ship Bitboards, 13 bytes apiece,
+                          in `game.ship.SHIPS` order; a fleet with
+                          several ships of a type records their union
+    shots       2 bytes   per shot: the coordinate, then the result code
+
+Player 0 takes the even numbered shots.  A result code is ``0`` for a miss,
+``1 + ship_type`` for a hit, with `SUNK` set if the hit sank the ship.
+"""
+import struct
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Tuple, Union
+
+from game.bitboard import Bitboard, Coordinate
+from game.ship import SHIPS, ShipType
+
+
+MAGIC = b'BSHIPREC'
+VERSION = 1
+FILE_HEADER = struct.Struct('<8sH')
+RECORD_HEADER = struct.Struct('<BBBH')
+BITBOARD_BYTES = 13
+FLEET_BYTES = BITBOARD_BYTES * len(SHIPS)
+SHOT_BYTES = 2
+
+NO_LEVEL = 255
+NO_WINNER = 255
+
+MISS = 0
+SUNK = 0x80
+
+Fleet = Tuple[Bitboard, ...]
+DecodedShot = Tuple[Coordinate, bool, bool, Optional[ShipType]]
+
+
+def result_code(hit: bool, sunk: bool, ship_type: Optional[ShipType]) -> int:
+    """Encode the result of a shot in one byte."""
+    if not hit:
+        return MISS
+    return (1 + ship_type) | (SUNK if sunk else 0)
+
+
+def decode_result(code: int) -> Tuple[bool, bool, Optional[ShipType]]:
+    """Decode a result code to `(hit, sunk, ship_type)`."""
+    if code == MISS:
+        return False, False, None
+    return True, bool(code & SUNK), (code & ~SUNK) - 1
+
+
+def fleet_masks(board) -> Fleet:
+    """Return the Bitboard of the ships of each type in `SHIPS` order from a
+    ship board, empty for a type missing from its fleet.
+    """
+    return tuple(board.fleet.type_masks(board.ships))
+
+
+class GameRecord(NamedTuple):
+    """A compact record of one game.
+
+    Attributes:
+    -----------
+    levels : Tuple[int, int]
+        CPU level of each player, `NO_LEVEL` for a player without one.
+    winner : int, optional
+        Index of the winning player, None if the game timed out.
+    fleets : Tuple[Fleet, Fleet]
+        Each player's ship Bitboards in `SHIPS` order.
+    shots : bytes
+        Two bytes per shot: coordinate and result code.
+    """
+    levels: Tuple[int, int]
+    winner: Optional[int]
+    fleets: Tuple[Fleet, Fleet]
+    shots: bytes
+
+    def num_shots(self) -> int:
+        """Return the number of shots taken."""
+        return len(self.shots) // SHOT_BYTES
+
+    def shot(self, half_turn: int) -> DecodedShot:
+        """Return `(coordinate, hit, sunk, ship_type)` of a shot."""
+        offset = half_turn * SHOT_BYTES
+        return (self.shots[offset],) + decode_result(self.shots[offset + 1])
+
+    def moves(self) -> Iterator[DecodedShot]:
+        """Iterate over every shot as `(coordinate, hit, sunk,
+        ship_type)`.
+        """
+        for half_turn in range(self.num_shots()):
+            yield self.shot(half_turn)
+
+    def encode(self) -> bytes:
+        """Encode the record to bytes."""
+        winner = NO_WINNER if self.winner is None else self.winner
+        out = [RECORD_HEADER.pack(*self.levels, winner, self.num_shots())]
+        for fleet in self.fleets:
+            for mask in fleet:
+                out.append(mask.to_bytes(BITBOARD_BYTES, 'little'))
+        out.append(bytes(self.shots))
+        return b''.join(out)
+
+    @classmethod
+    def decode(cls, buffer: Union[bytes, memoryview], offset: int = 0
+               ) -> 'GameRecord':
+        """Decode the record at `offset` of `buffer`."""
+        level1, level2, winner, num_shots = RECORD_HEADER.unpack_from(
+            buffer, offset)
+        offset += RECORD_HEADER.size
+        fleets = []
+        for _ in range(2):
+            fleet = []
+            for _ in SHIPS:
+                fleet.append(int.from_bytes(
+                    buffer[offset:offset + BITBOARD_BYTES], 'little'))
+                offset += BITBOARD_BYTES
+            fleets.append(tuple(fleet))
+        shots = bytes(buffer[offset:offset + num_shots * SHOT_BYTES])
+        return cls((level1, level2),
+                   None if winner == NO_WINNER else winner,
+                   tuple(fleets), shots)
+
+
+def record_size(buffer: Union[bytes, memoryview], offset: int = 0) -> int:
+    """Return the size in bytes of the record at `offset` of `buffer`."""
+    num_shots = RECORD_HEADER.unpack_from(buffer, offset)[3]
+    return RECORD_HEADER.size + 2 * FLEET_BYTES + num_shots * SHOT_BYTES
+
+
+def player_level(player) -> int:
+    """Return a player's level as stored in a record."""
+    level = getattr(player, 'level', None)
+    return NO_LEVEL if level is None else level
+
+
+class RecordWriter:
+    """Stream game records to a file.
+
+    Records are written as they arrive, so memory does not grow with the
+    number of games.  Use as a context manager, or call `close`.
+
+    PARAMS
+    ------
+    path : str
+        File to write.
+    append : bool
+        If True, add to the records already in an existing file.
+    """
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        self.games = 0
+        self.file: BinaryIO = open(path, 'ab' if append else 'wb')
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, record: GameRecord) -> None:
+        """Append a record."""
+        self.file.write(record.encode())
+        self.games += 1
+
+    def write_encoded(self, data: bytes, games: int) -> None:
+        """Append `games` records already encoded to `data`."""
+        self.file.write(data)
+        self.games += games
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        self.file.close()
+
+
+def check_header(buffer: Union[bytes, memoryview]) -> int:
+    """Check a record file's header and return the offset of its first
+    record.
+
+    raises `ValueError` if the header is not a supported record file.
+    """
+    if len(buffer) < FILE_HEADER.size:
+        raise ValueError("Not a game record file")
+    magic, version = FILE_HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError("Not a game record file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported record version: {version}")
+    return FILE_HEADER.size
+
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    """Iterate over the records of a file."""
+    with open(path, 'rb') as file:
+        check_header(file.read(FILE_HEADER.size))
+        while True:
+            header = file.read(RECORD_HEADER.size)
+            if not header:
+                return
+            size = record_size(header)
+            yield GameRecord.decode(
+                header + file.read(size - RECORD_HEADER.size))
@@ -0,0 +1,200 @@
+"""Module for estimating ship occupancy by sampling fleet layouts.
+
+Counting every joint layout of the fleet (see `game.posterior`) is too
+expensive early in the game, so this module draws layouts instead.  Each
+layout is built one ship at a time from the placements still compatible with
+the board and the ships already placed, so no draw is ever thrown away for
+overlapping.  Because the sequential draws are not uniform over joint
+layouts, each one is weighted by the number of choices made along the way,
+which makes the weighted frequencies an estimate of the exact posterior.
+"""
+import random
+import time
+from typing import List, Optional, Tuple
+
+import game.bitboard as bitboard
+from game.bitboard import BB_EMPTY, Bitboard
+from game.geometry import CLASSIC_GEOMETRY, Geometry
+from game.posterior import (FleetMasks, fleet_placements, placement_conflicts,
+                            placement_cover)
+
+
+SAMPLES = 200
+
+
+def select_bit(bitset: int, k: int) -> int:
+    """Return the index of the `k`-th (from zero) set bit of `bitset`."""
+    offset = 0
+    while True:
+        word = bitset & 0xffff_ffff_ffff_ffff
+        count = bitboard.popcount(word)
+        if k < count:
+            break
+        k -= count
+        bitset >>= 64
+        offset += 64
+    for index in bitboard.scan_forward(word):
+        if not k:
+            return offset + index
+        k -= 1
+    raise ValueError("select_bit index out of range")
+
+
+class DensityEstimate:
+    """Weighted per-coordinate occupancy frequencies of sampled layouts.
+
+    Attributes:
+    -----------
+    samples : int
+        Number of layouts drawn.
+    elapsed : float
+        Seconds spent drawing layouts.
+    geometry : Geometry
+        The board.
+    """
+
+    def __init__(self, geometry: Geometry = CLASSIC_GEOMETRY) -> None:
+        self.samples = 0
+        self.elapsed = 0.0
+        self.weight = 0
+        self.weight_sq = 0
+        self.geometry = geometry
+        self.counts = [0] * geometry.size
+        self.counts_sq = [0] * geometry.size
+
+    def __bool__(self) -> bool:
+        return bool(self.weight)
+
+    def add(self, layout: Bitboard, weight: int) -> None:
+        """Add a sampled `layout` with importance `weight`."""
+        self.samples += 1
+        if not weight:
+            return
+        self.weight += weight
+        self.weight_sq += weight * weight
+        for coord in bitboard.scan_forward(layout):
+            self.counts[coord] += weight
+            self.counts_sq[coord] += weight * weight
+
+    def effective_samples(self) -> float:
+        """Return the effective sample size of the weighted draws."""
+        if not self.weight_sq:
+            return 0.0
+        return self.weight * self.weight / self.weight_sq
+
+    def probability(self, coordinate: bitboard.Coordinate) -> float:
+        """Return the estimated probability `coordinate` holds a ship."""
+        if not self.weight:
+            return 0.0
+        return self.counts[coordinate] / self.weight
+
+    def variance(self, coordinate: bitboard.Coordinate) -> float:
+        """Return the estimated variance of `probability(coordinate)`."""
+        if not self.weight:
+            return 0.0
+        prob = self.probability(coordinate)
+        spread = (self.counts_sq[coordinate] * (1 - 2 * prob)
+                  + prob * prob * self.weight_sq)
+        return spread / (self.weight * self.weight)
+
+    def max_variance(self) -> float:
+        """Return the largest estimated variance over all coordinates."""
+        return max(self.variance(coord)
+                   for coord in self.geometry.coordinates)
+
+    def tolist(self) -> List[float]:
+        """Convert estimate to a list of probabilities by coordinate."""
+        return [self.probability(coord)
+                for coord in self.geometry.coordinates]
+
+    def max_density(self, mask: Optional[Bitboard] = None) -> Bitboard:
+        """Return the coordinates in `mask`, by default the whole board,
+        most often occupied.
+        """
+        best = 0
+        bb = BB_EMPTY
+        if mask is None:
+            mask = self.geometry.bb_all
+        for coord in bitboard.scan_forward(mask & self.geometry.bb_all):
+            count = self.counts[coord]
+            if count > best:
+                best = count
+                bb = BB_EMPTY
+            if count and count == best:
+                bb |= 1 << coord
+        return bb
+
+
+def _sample(lengths: List[int], lives: List[int],
+            conflicts: List[List[List[int]]], unexplained: Bitboard,
+            rng, geometry: Geometry) -> Tuple[Bitboard, int]:
+    """Draw one layout, returning `(layout, weight)`."""
+    layout = BB_EMPTY
+    weight = 1
+    lives = list(lives)
+    last = len(lengths) - 1
+    for depth, length in enumerate(lengths):
+        live = lives[depth]
+        if depth == last:
+            cover = placement_cover(length, geometry)
+            for coord in bitboard.scan_forward(unexplained & ~layout):
+                live &= cover[coord]
+        choices = bitboard.popcount(live)
+        if not choices:
+            return layout, 0
+        i = select_bit(live, rng.randrange(choices))
+        weight *= choices
+        layout |= geometry.placements[length][i]
+        for j in range(depth + 1, len(lengths)):
+            lives[j] &= ~conflicts[depth][j][i]
+            if not lives[j]:
+                return layout, 0
+    if unexplained & ~layout:
+        return layout, 0
+    return layout, weight
+
+
+def sample_densities(attacked: Bitboard, hit: Bitboard, fleet: FleetMasks,
+                     samples: int = SAMPLES, budget: Optional[float] = None,
+                     rng=random, geometry: Geometry = CLASSIC_GEOMETRY
+                     ) -> DensityEstimate:
+    """Estimate occupancy probabilities for the remaining fleet.
+
+    PARAMS
+    ------
+    attacked : Bitboard
+        Every attacked coordinate.
+    hit : Bitboard
+        Every attacked coordinate which hit a ship.
+    fleet : Sequence[Tuple[int, Bitboard]]
+        `(length, known)` for each ship, where `known` holds the hits
+        already attributed to that ship.
+    samples : int
+        Maximum number of layouts to draw.
+    budget : float, optional
+        Maximum number of seconds to spend drawing layouts.
+    rng : random.Random
+        Source of randomness, defaults to the `random` module.
+    geometry : Geometry
+        The board.
+
+    RETURNS
+    -------
+    estimate : DensityEstimate
+    """
+    start = time.perf_counter()
+    ships, unexplained = fleet_placements(attacked, hit, fleet, geometry)
+    lengths = [length for length, _ in ships]
+    lives = [live for _, live in ships]
+    conflicts = [[placement_conflicts(a, b, geometry) for b in lengths]
+                 for a in lengths]
+
+    estimate = DensityEstimate(geometry)
+    while estimate.samples < samples:
+        if (budget is not None and estimate.samples % 16 == 0
+                and time.perf_counter() - start > budget):
+            break
+        estimate.add(*_sample(lengths, lives, conflicts, unexplained, rng,
+                              geometry))
+    estimate.elapsed = time.perf_counter() - start
+    return estimate
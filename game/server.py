@@ -0,0 +1,324 @@
+"""Module for a TCP server hosting many human vs CPU games at once.
+
+Each connection is a session of games against a CPU, and every session is
+served by one asyncio event loop.  CPU moves are chosen on a pool of worker
+processes, each handed a copy of the CPU's strategy and attack board, so a
+slow level 3 or 4 move delays only its own session.  Strategies therefore
+must keep any per-game state they set in `new_game`, not in `choose`.
+
+Protocol
+--------
+Both sides send lines of words.  The server sends ``READY`` on connecting
+and after each game, and then the client sends:
+
+    NEW [LEVEL]            play a game against a CPU of LEVEL (default 3)
+    PLACE BOW DIRECTION    place the ship asked for, e.g. ``PLACE A1 UP``
+    PLACE RANDOM           place every remaining ship at random
+    FIRE COORDINATE        attack a coordinate, e.g. ``FIRE J10``
+    BOARD                  show both boards
+    QUIT                   end the session
+
+During a game the server asks for each ship with ``PLACE LENGTH NAME``,
+and for each shot with ``TURN``.  It answers shots with:
+
+    RESULT COORDINATE MISS|HIT|SUNK [SHIP]    the client's shot
+    INCOMING COORDINATE MISS|HIT|SUNK [SHIP]  the CPU's shot
+    WIN TURNS | LOSE TURNS | DRAW TURNS       the end of the game
+
+``BOARD`` is answered with the lines of the rendered boards, each prefixed
+with ``BOARD``, then ``END``.  A line the server cannot accept is answered
+with ``ERR MESSAGE`` and the last request is repeated.
+
+Usage
+-----
+python -m game.server [--host HOST] [--port PORT] [--workers N]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional
+
+from game.bitboard import Coordinate
+from game.gameboards import AttackBoard, AttackResult
+from game.layouts import random_layout
+from game.player import CPU, Player
+from game.strategies import AttackState, LEVELS, Strategy
+
+
+HOST = '127.0.0.1'
+PORT = 8765
+LEVEL = 3
+
+
+def choose_index(strategy: Strategy, board: AttackBoard) -> Coordinate:
+    """Return the coordinate `strategy` attacks on `board`; run on the
+    worker processes.
+    """
+    return strategy.choose(AttackState(board))
+
+
+def _outcome(result: AttackResult) -> str:
+    """Return the protocol words of an attack result."""
+    hit, sunk, ship = result
+    if not hit:
+        return 'MISS'
+    return f"{'SUNK' if sunk else 'HIT'} {ship.name}"
+
+
+class Session:
+    """A connection playing games against a CPU.
+
+    PARAMS
+    ------
+    reader : asyncio.StreamReader
+        The connection's incoming lines.
+    writer : asyncio.StreamWriter
+        The connection's outgoing lines.
+    pool : Executor, optional
+        The pool CPU moves are chosen on, or None to choose them in the
+        event loop.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter,
+                 pool: Optional[Executor] = None) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.pool = pool
+        self.human = Player('human')
+        self.cpu: Optional[CPU] = None
+
+    async def send(self, *lines: str) -> None:
+        """Send lines to the client."""
+        self.writer.write(''.join(f'{line}\n' for line in lines).encode())
+        await self.writer.drain()
+
+    async def request(self, prompt: str) -> Optional[List[str]]:
+        """Send `prompt` and return the words of the client's next
+        command other than ``BOARD``, or None once the client quits or
+        disconnects.
+        """
+        await self.send(prompt)
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return None
+            words = line.decode(errors='replace').split()
+            if not words:
+                continue
+            words[0] = words[0].upper()
+            if words[0] == 'QUIT':
+                return None
+            if words[0] != 'BOARD':
+                return words
+            await self.send(*self.boards(), 'END')
+
+    async def error(self, message: str) -> None:
+        """Tell the client their last line was not accepted."""
+        await self.send(f'ERR {message}')
+
+    def boards(self) -> List[str]:
+        """Return the protocol lines of both of the human's boards."""
+        lines = str(self.human.attack_board).splitlines()
+        lines += [''] + str(self.human.ship_board).splitlines()
+        return [f'BOARD {line}' for line in lines]
+
+    async def run(self) -> None:
+        """Play games until the client quits or disconnects."""
+        try:
+            while True:
+                words = await self.request('READY')
+                if words is None:
+                    return
+                if words[0] != 'NEW':
+                    await self.error("Expected NEW [LEVEL]")
+                    continue
+                level = LEVEL
+                if len(words) > 1:
+                    if not words[1].isdigit() or int(words[1]) >= len(LEVELS):
+                        await self.error(f"Unknown level: {words[1]}")
+                        continue
+                    level = int(words[1])
+                if self.cpu is None or self.cpu.level != level:
+                    self.cpu = CPU(f'cpu lvl: {level}', level)
+                if not await self.play_game():
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            self.writer.close()
+
+    async def play_game(self) -> bool:
+        """Play a game, returning False if the client quit during it."""
+        human, cpu = self.human, self.cpu
+        for player in (human, cpu):
+            player.clear_boards()
+            player.set_ships_placed(False)
+        cpu.place_fleet()
+        cpu.set_ships_placed(True)
+        if not await self.place_ships():
+            return False
+        human.set_ships_placed(True)
+
+        geometry = human.geometry
+        for turn in range(1, geometry.size + 1):
+            coordinate = await self.choose_coordinate()
+            if coordinate is None:
+                return False
+            result = cpu.attacked(coordinate)
+            cpu.add_ship_peg(coordinate, result)
+            human.add_attack_peg(coordinate, result)
+            await self.send(f'RESULT {coordinate} {_outcome(result)}')
+            if cpu.is_dead():
+                human.win()
+                cpu.lose()
+                await self.send(f'WIN {turn}')
+                return True
+
+            coordinate = geometry.coordinate_names[await self.cpu_move()]
+            result = human.attacked(coordinate)
+            human.add_ship_peg(coordinate, result)
+            cpu.add_attack_peg(coordinate, result)
+            await self.send(f'INCOMING {coordinate} {_outcome(result)}')
+            if human.is_dead():
+                human.lose()
+                cpu.win()
+                await self.send(f'LOSE {turn}')
+                return True
+        await self.send(f'DRAW {geometry.size}')
+        return True
+
+    async def place_ships(self) -> bool:
+        """Ask the client to place each ship, returning False if they
+        quit.
+        """
+        human = self.human
+        for ship in human.fleet:
+            while True:
+                words = await self.request(f'PLACE {len(ship)} {ship.name}')
+                if words is None:
+                    return False
+                if words[0] != 'PLACE' or len(words) not in (2, 3):
+                    await self.error("Expected PLACE BOW DIRECTION or "
+                                     "PLACE RANDOM")
+                    continue
+                if words[1].upper() == 'RANDOM':
+                    self._place_randomly()
+                    return True
+                try:
+                    if len(words) == 3 and human.add_ship(
+                            ship, words[1].upper(), words[2]):
+                        break
+                except ValueError as err:
+                    await self.error(str(err))
+                    continue
+                await self.error(f"Unable to place {ship.name}")
+        return True
+
+    def _place_randomly(self) -> None:
+        """Place each ship the client has not placed on a random free
+        placement, or the whole fleet afresh if one no longer fits.
+        """
+        board = self.human.ship_board
+        for ship, mask in board.ships.items():
+            if mask:
+                continue
+            occupied = board.occupied.mask
+            options = [placement for placement
+                       in board.geometry.placements[len(ship)]
+                       if not placement & occupied]
+            if not options:
+                board.clear_board()
+                layout = random_layout(self.human.fleet.lengths,
+                                       geometry=board.geometry)
+                for fleet_ship, fleet_mask in zip(self.human.fleet, layout):
+                    board.add_ship_mask(fleet_ship, fleet_mask)
+                return
+            board.add_ship_mask(ship, random.choice(options))
+
+    async def choose_coordinate(self) -> Optional[str]:
+        """Ask the client for a coordinate to attack, or return None if
+        they quit.
+        """
+        geometry = self.human.geometry
+        while True:
+            words = await self.request('TURN')
+            if words is None:
+                return None
+            if words[0] != 'FIRE' or len(words) != 2:
+                await self.error("Expected FIRE COORDINATE")
+                continue
+            coordinate = words[1].upper()
+            if coordinate not in geometry.coordinate_names:
+                await self.error(f"{coordinate!r} is not a coordinate")
+            elif not self.human.attack_board.unattacked(coordinate):
+                await self.error(f"{coordinate} was already attacked")
+            else:
+                return coordinate
+
+    async def cpu_move(self) -> Coordinate:
+        """Return the CPU's next attack, chosen on the worker pool."""
+        cpu = self.cpu
+        if self.pool is None:
+            return cpu.choose_index()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, choose_index,
+                                          cpu.strategy, cpu.attack_board)
+
+
+async def serve(host: str = HOST, port: int = PORT,
+                workers: Optional[int] = None) -> None:
+    """Serve sessions until cancelled.
+
+    PARAMS
+    ------
+    host : str
+        The address to listen on.
+    port : int
+        The port to listen on, or 0 for any free port.
+    workers : int, optional
+        Number of worker processes choosing CPU moves, defaults to the
+        number of CPUs.  With 0, moves are chosen in the event loop.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+
+    async def handle(reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter) -> None:
+        await Session(reader, writer, pool).run()
+
+    try:
+        server = await asyncio.start_server(handle, host, port)
+        async with server:
+            address = server.sockets[0].getsockname()
+            print(f'Listening on {address[0]}:{address[1]}', flush=True)
+            await server.serve_forever()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def main() -> int:
+    """Run the server."""
+    parser = argparse.ArgumentParser(prog="python -m game.server")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT,
+                        help="port to listen on, 0 for any free port")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes choosing CPU moves (default: "
+                             "one per CPU, 0 to choose them in the event "
+                             "loop)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,14 @@
 """There are 5 ship types in the game of Battleship.  Each ship has a specific
 length (number of coordinates).
-"""
 
-import dataclasses
+A `Fleet` is the composition of ships each player places: by default one of
+each type, but any list of types, such as one with extra patrol boats or no
+carrier.  Ships are interned, so every reference to a ship is the same
+object and hashes by identity, and their attributes are looked up once when
+the ship is first created.
+"""
+from collections import Counter
+from typing import Dict, Iterator, List, Sequence, Tuple
 
 
 ShipType = int
@@ -11,40 +17,173 @@ SHIP_NAMES = ["Carrier", "Battleship", "Submarine", "Destroyer", "Patrol Boat"]
 SHIP_SYMBOLS = ["C", "B", "S", "D", "P"]
 SHIP_LENGTHS = [5, 4, 3, 3, 2]
 
+MAX_COPIES = 10
+
 
-@dataclasses.dataclass(frozen=True)
 class Ship:
-    """A dataclass representation of a Ship.
+    """A ship of a given type.
+
+    ``Ship(name)`` returns the interned ship of that name.  A fleet with
+    several ships of one type numbers the copies after the first, e.g.
+    ``'Patrol Boat 2'``.
 
     Attributes:
     -----------
     name : str
         Name of Ship.
+    copy : int
+        Number of ships of the same type in a fleet before this one.
     """
-    name: str
+
+    __slots__ = ('name', 'copy', '_type', '_length', '_symbol')
+
+    _interned: Dict[str, 'Ship'] = {}
+
+    def __new__(cls, name: str) -> 'Ship':
+        try:
+            return cls._interned[name]
+        except KeyError:
+            pass
+        ship_type, _, copy = name.rpartition(' ')
+        if copy.isdigit() and ship_type in SHIP_NAMES and int(copy) > 1:
+            return cls.from_type(SHIP_NAMES.index(ship_type), int(copy) - 1)
+        if name not in SHIP_NAMES:
+            raise ValueError(f"Unknown ship: {name}")
+        return cls.from_type(SHIP_NAMES.index(name))
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return Ship.from_type, (self._type, self.copy)
 
     def __str__(self) -> str:
         return self.name
 
+    def __repr__(self) -> str:
+        return f'Ship({self.name!r})'
+
     def __len__(self) -> int:
         """The amount of coordinates this ship occupies on the game board."""
-        return SHIP_LENGTHS[self.ship_type()]
+        return self._length
 
     def symbol(self) -> str:
         """Symbol representation displayed on game board."""
-        return SHIP_SYMBOLS[self.ship_type()]
+        return self._symbol
 
     def ship_type(self) -> ShipType:
         """Return the ShipType."""
-        return SHIP_NAMES.index(self.name)
+        return self._type
 
     @classmethod
-    def from_symbol(cls, symbol: str):
-        """Create a `Ship` instance from ship symbol."""
-        name = SHIP_NAMES[SHIP_SYMBOLS.index(symbol.upper())]
-        return cls(name)
+    def from_symbol(cls, symbol: str) -> 'Ship':
+        """Return the first `Ship` of the type with a ship symbol."""
+        return cls.from_type(SHIP_SYMBOLS.index(symbol.upper()))
 
     @classmethod
-    def from_type(cls, ship_type: ShipType):
-        """Create a `Ship` instance from ShipType."""
-        return cls(SHIP_NAMES[ship_type])
+    def from_type(cls, ship_type: ShipType, copy: int = 0) -> 'Ship':
+        """Return copy number `copy` (from 0) of a ShipType."""
+        name = SHIP_NAMES[ship_type]
+        if copy:
+            name = f'{name} {copy + 1}'
+        try:
+            return cls._interned[name]
+        except KeyError:
+            pass
+        ship = object.__new__(cls)
+        for attr, value in (('name', name), ('copy', copy),
+                            ('_type', ship_type),
+                            ('_length', SHIP_LENGTHS[ship_type]),
+                            ('_symbol', SHIP_SYMBOLS[ship_type])):
+            object.__setattr__(ship, attr, value)
+        cls._interned[name] = ship
+        return ship
+
+
+class Fleet:
+    """The ships each player places, indexed from 0 in placement order.
+
+    Attributes:
+    -----------
+    types : Tuple[ShipType, ...]
+        Type of each ship.
+    ships : Tuple[Ship, ...]
+        Each ship.
+    lengths : Tuple[int, ...]
+        Length of each ship.
+    symbols : Tuple[str, ...]
+        Board symbol of each ship.
+    """
+
+    __slots__ = ('types', 'ships', 'lengths', 'symbols', 'index', '_hash')
+
+    def __init__(self, ship_types: Sequence[ShipType]) -> None:
+        copies: Counter = Counter()
+        ships = []
+        for ship_type in ship_types:
+            if ship_type not in SHIPS:
+                raise ValueError(f"Unknown ship type: {ship_type}")
+            if copies[ship_type] == MAX_COPIES:
+                raise ValueError(f"A fleet holds at most {MAX_COPIES} ships "
+                                 "of a type")
+            ships.append(Ship.from_type(ship_type, copies[ship_type]))
+            copies[ship_type] += 1
+        if not ships:
+            raise ValueError("A fleet needs at least one ship")
+        self.types: Tuple[ShipType, ...] = tuple(ship_types)
+        self.ships: Tuple[Ship, ...] = tuple(ships)
+        self.lengths = tuple(SHIP_LENGTHS[t] for t in self.types)
+        self.symbols = tuple(SHIP_SYMBOLS[t] for t in self.types)
+        self.index: Dict[Ship, int] = {ship: i for i, ship in enumerate(ships)}
+        self._hash = hash(self.types)
+
+    @classmethod
+    def from_names(cls, names: Sequence[str]) -> 'Fleet':
+        """Create a fleet from ship type names, e.g. ``['Battleship',
+        'Patrol Boat', 'Patrol Boat']``.
+        """
+        for name in names:
+            if name not in SHIP_NAMES:
+                raise ValueError(f"Unknown ship: {name}")
+        return cls([SHIP_NAMES.index(name) for name in names])
+
+    def __len__(self) -> int:
+        return len(self.ships)
+
+    def __iter__(self) -> Iterator[Ship]:
+        return iter(self.ships)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Fleet):
+            return NotImplemented
+        return self.types == other.types
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        return Fleet, (self.types,)
+
+    def __repr__(self) -> str:
+        return f'Fleet({[SHIP_NAMES[t] for t in self.types]!r})'
+
+    def masks(self, ships: Dict[Ship, object]) -> List[int]:
+        """Return the Bitboard of each ship from a board's `ships` dict,
+        in fleet order.
+        """
+        return [int(ships[ship]) for ship in self.ships]
+
+    def type_masks(self, ships: Dict[Ship, object]) -> List[int]:
+        """Return the union of the Bitboards of the ships of each type from
+        a board's `ships` dict, in `SHIPS` order.
+        """
+        masks = [0] * len(SHIPS)
+        for ship in self.ships:
+            masks[ship.ship_type()] |= int(ships[ship])
+        return masks
+
+
+# The board order of the original five ship game, which seeded games
+# depend on.
+CLASSIC_FLEET = Fleet([CARRIER, BATTLESHIP, DESTROYER, SUBMARINE,
+                       PATROLBOAT])
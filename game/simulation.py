@@ -0,0 +1,308 @@
+"""Module for simulating many CPU vs CPU games across processes.
+
+Games are split into chunks which are played by a pool of worker processes.
+Every game seeds the random module from the simulation seed and its own game
+number, so a game plays out the same no matter which worker runs it and the
+merged results do not depend on the number of workers.
+
+Game records are encoded by the workers and streamed to the record file
+chunk by chunk, in game order.
+
+A run can stop early, once the chunks played so far resolve which CPU is
+stronger; see `SimulationResult.resolved`.
+"""
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+from game import kernel
+from game.player import CPU
+from game.geometry import CLASSIC_GEOMETRY, Geometry
+from game.records import RecordWriter
+from game.ship import CLASSIC_FLEET, Fleet
+from game.stats import (MIN_GAMES, Z_95, RunningStats, TurnHistogram,
+                        means_resolved, rate_resolved, wilson_interval)
+from game.timing import MoveTimings
+
+
+CHUNK_SIZE = 250
+
+
+def game_seed(seed: int, game_num: int) -> int:
+    """Return the seed for game number `game_num` of a simulation."""
+    return (seed << 64) + game_num
+
+
+class SimulationResult:
+    """Aggregated results of simulated games.
+
+    Each per-player list is indexed by the player's position, ``0`` for
+    the first CPU, which moves first unless the simulation alternates.
+
+    Attributes:
+    -----------
+    games : int
+        Number of games played.
+    wins : List[int]
+        Games won by each player.
+    hits : List[int]
+        Attacks by each player which hit a ship.
+    attacks : List[int]
+        Attacks made by each player.
+    turns : int
+        Total number of turns over all games.
+    turn_stats : RunningStats
+        Mean and variance of turns per game.
+    turn_histogram : TurnHistogram
+        Games by number of turns.
+    win_turns : List[RunningStats]
+        Turns per game won by each player.
+    first_mover_wins : int
+        Games won by the player which moved first.
+    runtime : float
+        Total seconds spent playing games.
+    timings : MoveTimings, optional
+        Phase latencies, if the games were timed.
+    records : bytearray, optional
+        Encoded records of the games, if recorded.  `simulate` writes them
+        out chunk by chunk rather than merging them.
+    """
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.wins = [0, 0]
+        self.hits = [0, 0]
+        self.attacks = [0, 0]
+        self.turns = 0
+        self.turn_stats = RunningStats()
+        self.turn_histogram = TurnHistogram()
+        self.win_turns = [RunningStats(), RunningStats()]
+        self.first_mover_wins = 0
+        self.runtime = 0.0
+        self.timings: Optional[MoveTimings] = None
+        self.records: Optional[bytearray] = None
+
+    def losses(self, player: int) -> int:
+        """Return the number of games lost by `player`."""
+        return self.games - self.wins[player]
+
+    def avg_turns(self) -> float:
+        """Return the average number of turns per game."""
+        return self.turns / self.games if self.games else 0.0
+
+    def avg_runtime(self) -> float:
+        """Return the average number of seconds per game."""
+        return self.runtime / self.games if self.games else 0.0
+
+    def add_game(self, winner: int, turns: int, first_mover: int) -> None:
+        """Count a game won by `winner` after `turns` turns."""
+        self.games += 1
+        self.turns += turns
+        self.turn_stats.add(turns)
+        self.turn_histogram.add(turns)
+        self.win_turns[winner].add(turns)
+        if winner == first_mover:
+            self.first_mover_wins += 1
+
+    def win_interval(self, player: int,
+                     z: float = Z_95) -> Tuple[float, float]:
+        """Return a confidence interval of `player`'s win rate."""
+        return wilson_interval(self.wins[player], self.games, z)
+
+    def first_mover_interval(self, z: float = Z_95) -> Tuple[float, float]:
+        """Return a confidence interval of the first mover's win rate."""
+        return wilson_interval(self.first_mover_wins, self.games, z)
+
+    def resolved(self, z: float) -> Optional[str]:
+        """Return what separates the two players at `z` standard errors:
+        ``'win rate'`` if one wins more than half the games, ``'turns'``
+        if one needs fewer turns to win, or None if neither is resolved.
+        """
+        if rate_resolved(self.wins[0], self.games, z=z):
+            return 'win rate'
+        if means_resolved(*self.win_turns, z=z):
+            return 'turns'
+        return None
+
+    def merge(self, other: 'SimulationResult') -> None:
+        """Add the results of `other` to these results."""
+        self.games += other.games
+        self.turns += other.turns
+        self.turn_stats.merge(other.turn_stats)
+        self.turn_histogram.merge(other.turn_histogram)
+        self.first_mover_wins += other.first_mover_wins
+        self.runtime += other.runtime
+        for player in range(2):
+            self.wins[player] += other.wins[player]
+            self.hits[player] += other.hits[player]
+            self.attacks[player] += other.attacks[player]
+            self.win_turns[player].merge(other.win_turns[player])
+        if other.timings is not None:
+            if self.timings is None:
+                self.timings = MoveTimings()
+            self.timings.merge(other.timings)
+
+
+def play_games(cpu1_lvl: int, cpu2_lvl: int, start: int, stop: int,
+               seed: int = 0, timed: bool = False, recorded: bool = False,
+               alternate: bool = False, fleet: Fleet = CLASSIC_FLEET,
+               geometry: Geometry = CLASSIC_GEOMETRY) -> SimulationResult:
+    """Play games numbered `start` up to `stop` and return their results.
+
+    With `alternate`, the second CPU moves first in odd numbered games.
+    """
+    cpus = [CPU(f'cpu1 lvl: {cpu1_lvl}', level=cpu1_lvl, fleet=fleet,
+                geometry=geometry),
+            CPU(f'cpu2 lvl: {cpu2_lvl}', level=cpu2_lvl, fleet=fleet,
+                geometry=geometry)]
+    return play_cpus(cpus, start, stop, seed, timed, recorded, alternate)
+
+
+def play_cpus(cpus: List[CPU], start: int, stop: int, seed: int = 0,
+              timed: bool = False, recorded: bool = False,
+              alternate: bool = False) -> SimulationResult:
+    """Play games numbered `start` up to `stop` between two new CPUs and
+    return their results; see `play_games`.
+    """
+    result = SimulationResult()
+    if timed:
+        result.timings = MoveTimings()
+    if recorded:
+        result.records = bytearray()
+    for game_num in range(start, stop):
+        random.seed(game_seed(seed, game_num))
+        first_mover = game_num & 1 if alternate else 0
+        players = cpus[::-1] if first_mover else cpus
+        begin = time.perf_counter()
+        if recorded:
+            (winner, loser, turns, _), record = kernel.record_game(
+                *players, timings=result.timings)
+            result.records += record.encode()
+        else:
+            winner, loser, turns, _ = kernel.play_game(
+                *players, timings=result.timings)
+        result.runtime += time.perf_counter() - begin
+        winner.win()
+        loser.lose()
+        result.add_game(cpus.index(winner), turns, first_mover)
+
+    for player, cpu in enumerate(cpus):
+        result.wins[player] = cpu.wins
+        result.hits[player] = cpu.hits
+        result.attacks[player] = cpu.attacks
+    return result
+
+
+def _chunks(num_games: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Split `num_games` into `(start, stop)` ranges."""
+    for start in range(0, num_games, chunk_size):
+        yield start, min(start + chunk_size, num_games)
+
+
+def simulate(cpu1_lvl: int, cpu2_lvl: int, num_games: int,
+             workers: Optional[int] = None, seed: int = 0,
+             chunk_size: int = CHUNK_SIZE, timed: bool = False,
+             record: Optional[str] = None, alternate: bool = False,
+             stop_z: Optional[float] = None,
+             min_games: int = MIN_GAMES,
+             fleet: Fleet = CLASSIC_FLEET,
+             geometry: Geometry = CLASSIC_GEOMETRY) -> SimulationResult:
+    """Simulate `num_games` games between two CPU levels.
+
+    PARAMS
+    ------
+    cpu1_lvl : int
+        Level of the CPU which moves first.
+    cpu2_lvl : int
+        Level of the CPU which moves second.
+    num_games : int
+        Number of games to play.
+    workers : int, optional
+        Number of worker processes, defaults to the number of CPUs.  A
+        single worker plays every game in this process.
+    seed : int
+        Simulation seed from which every game's seed is derived.
+    chunk_size : int
+        Number of games handed to a worker at a time.
+    timed : bool
+        If True, record phase latencies in the result's `timings`.
+    record : str, optional
+        File to stream a `game.records.GameRecord` of every game to.
+    alternate : bool
+        If True, the CPUs take turns moving first.
+    stop_z : float, optional
+        If given, stop after the first chunk which brings the games played
+        to at least `min_games` and resolves the CPUs' win rates or turns
+        to win at `stop_z` standard errors; see `game.stats.Z_STOP`.
+    min_games : int
+        Games to play before stopping early.
+    fleet : Fleet
+        The ships each CPU places.
+    geometry : Geometry
+        The size of the boards.  Games on boards other than 10x10 cannot
+        be recorded.
+
+    RETURNS
+    -------
+    result : SimulationResult
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    chunks: List[Tuple[int, int]] = list(_chunks(num_games, chunk_size))
+
+    result = SimulationResult()
+    writer = None if record is None else RecordWriter(record)
+    chunk_results = _play_chunks(cpu1_lvl, cpu2_lvl, chunks, workers, seed,
+                                 timed, writer is not None, alternate,
+                                 fleet, geometry)
+    try:
+        for chunk in chunk_results:
+            if writer is not None:
+                writer.write_encoded(chunk.records, chunk.games)
+                chunk.records = None
+            result.merge(chunk)
+            if (stop_z is not None and result.games >= min_games
+                    and result.resolved(stop_z)):
+                break
+    finally:
+        chunk_results.close()
+        if writer is not None:
+            writer.close()
+    return result
+
+
+def _play_chunks(cpu1_lvl: int, cpu2_lvl: int, chunks: List[Tuple[int, int]],
+                 workers: int, seed: int, timed: bool, recorded: bool,
+                 alternate: bool, fleet: Fleet, geometry: Geometry
+                 ) -> Iterator[SimulationResult]:
+    """Yield the results of each chunk of games in order.
+
+    At most two chunks per worker are queued ahead of the results
+    consumed, so finished results are not held and an early stop abandons
+    little work.
+    """
+    args = (seed, timed, recorded, alternate, fleet, geometry)
+    if workers == 1:
+        for start, stop in chunks:
+            yield play_games(cpu1_lvl, cpu2_lvl, start, stop, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        remaining = iter(chunks)
+        pending = deque(pool.submit(play_games, cpu1_lvl, cpu2_lvl,
+                                    start, stop, *args)
+                        for start, stop in islice(remaining, 2 * workers))
+        try:
+            while pending:
+                chunk = pending.popleft().result()
+                for start, stop in islice(remaining, 1):
+                    pending.append(pool.submit(play_games, cpu1_lvl,
+                                               cpu2_lvl, start, stop, *args))
+                yield chunk
+        finally:
+            for future in pending:
+                future.cancel()
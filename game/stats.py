@@ -0,0 +1,172 @@
+"""Module for online statistics over simulated games.
+
+Every statistic is updated one game at a time in constant memory and merges
+with the statistics of another run, so worker processes can each keep their
+own and the parent combines them.
+"""
+import math
+from typing import Optional, Tuple
+
+
+Z_95 = 1.96
+# Checking for a result after every chunk of games tests many times over, so
+# an early stop requires a stricter bound than a single 95% test would.
+Z_STOP = 3.0
+MIN_GAMES = 100
+
+# A pairing's sequential test tells whether the first player is this many
+# Elo points stronger or weaker than the second.
+ELO_BOUND = 30.0
+SPRT_ERROR = 0.05
+
+MAX_TURNS = 101
+
+
+class RunningStats:
+    """Welford's running mean and variance."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a value."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'RunningStats') -> None:
+        """Add the values summarised by `other`."""
+        count = self.count + other.count
+        if not count:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    def variance(self) -> float:
+        """Return the sample variance."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def stdev(self) -> float:
+        """Return the sample standard deviation."""
+        return math.sqrt(self.variance())
+
+    def stderr(self) -> float:
+        """Return the standard error of the mean."""
+        return math.sqrt(self.variance() / self.count) if self.count else 0.0
+
+
+class TurnHistogram:
+    """Counts of games by number of turns."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (MAX_TURNS + 1)
+
+    def add(self, turns: int) -> None:
+        """Count a game of `turns` turns."""
+        self.counts[min(turns, MAX_TURNS)] += 1
+
+    def merge(self, other: 'TurnHistogram') -> None:
+        """Add the games counted by `other`."""
+        for turns, count in enumerate(other.counts):
+            self.counts[turns] += count
+
+    def percentile(self, percent: float) -> int:
+        """Return the `percent` percentile number of turns."""
+        rank = percent / 100 * sum(self.counts)
+        seen = 0
+        for turns, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return turns
+        return 0
+
+
+def wilson_interval(successes: int, trials: int,
+                    z: float = Z_95) -> Tuple[float, float]:
+    """Return the Wilson score interval of a success rate."""
+    if not trials:
+        return 0.0, 1.0
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / trials
+                           + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def rate_resolved(successes: int, trials: int, rate: float = 0.5,
+                  z: float = Z_STOP) -> bool:
+    """Return True if the success rate is distinguishable from `rate`."""
+    low, high = wilson_interval(successes, trials, z)
+    return not low <= rate <= high
+
+
+def means_resolved(a: RunningStats, b: RunningStats,
+                   z: float = Z_STOP) -> bool:
+    """Return True if the means of `a` and `b` differ by more than `z`
+    standard errors of their difference.
+    """
+    if a.count < 2 or b.count < 2:
+        return False
+    stderr = math.sqrt(a.variance() / a.count + b.variance() / b.count)
+    return abs(a.mean - b.mean) > z * stderr
+
+
+def format_interval(interval: Tuple[float, float]) -> str:
+    """Format a rate interval as percentages."""
+    return f'[{interval[0]:.1%}, {interval[1]:.1%}]'
+
+
+def expected_score(elo: float) -> float:
+    """Return the expected score of a player `elo` points stronger."""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_difference(score: float) -> float:
+    """Return the Elo difference implied by a score between 0 and 1."""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+class SPRT:
+    """Wald's sequential probability ratio test of one player's wins against
+    another.
+
+    H0 is that the first player is `elo0` points stronger, H1 that it is
+    `elo1` points stronger.  Each game adds to the log-likelihood ratio
+    until it crosses a bound set by the error rates `alpha` and `beta`.
+    The default hypotheses are symmetric, so accepting either tells which
+    player is the stronger.
+    """
+
+    def __init__(self, elo0: float = -ELO_BOUND, elo1: float = ELO_BOUND,
+                 alpha: float = SPRT_ERROR, beta: float = SPRT_ERROR
+                 ) -> None:
+        self.elo0 = elo0
+        self.elo1 = elo1
+        p0 = expected_score(elo0)
+        p1 = expected_score(elo1)
+        self.win_llr = math.log(p1 / p0)
+        self.loss_llr = math.log((1 - p1) / (1 - p0))
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+
+    def llr(self, wins: int, losses: int) -> float:
+        """Return the log-likelihood ratio of H1 to H0."""
+        return wins * self.win_llr + losses * self.loss_llr
+
+    def decide(self, wins: int, losses: int) -> Optional[bool]:
+        """Return True if H1 is accepted, False if H0 is, or None if more
+        games are needed.
+        """
+        llr = self.llr(wins, losses)
+        if llr >= self.upper:
+            return True
+        if llr <= self.lower:
+            return False
+        return None
@@ -0,0 +1,276 @@
+"""Module for CPU attack strategies.
+
+A strategy chooses a CPU's attacks.  Each move it is handed an
+`AttackState` and returns the coordinate to attack as an int.  The state
+holds the attacker's pegs and the hits on each ship of the fleet hunted as
+plain Bitboards, and the sunk ships as a bitmask of fleet indices.  In a
+salvo the shots already chosen this turn are `pending`, and are left out
+of every set of coordinates the state offers.
+
+Strategies are registered by name in `STRATEGIES` and built with
+`get_strategy`.  The strategy of each CPU level is named in `LEVELS`:
+
+    0  random     any unattacked coordinate
+    1  target     finish off wounded ships, else random
+    2  parity     as target, hunting on one colour of the checkerboard
+    3  density    as parity, hunting where the most ship placements fit
+    4  posterior  as density, hunting where ships are likeliest given every
+                  layout of the fleet consistent with the board
+
+A new AI only needs a `new_game` and a `choose` method:
+
+    @register('eager')
+    class Eager:
+        def new_game(self) -> None:
+            pass
+
+        def choose(self, state: AttackState) -> Coordinate:
+            return random_coordinate(state.targets() or state.unattacked)
+"""
+import random
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+
+import game.bitboard as bitboard
+from game.bitboard import Bitboard, Coordinate
+from game.sampling import SAMPLES
+from game.ship import Fleet
+
+
+LEVELS = ['random', 'target', 'parity', 'density', 'posterior']
+
+
+class AttackState:
+    """What an attacker knows of the opponent's board.
+
+    Attributes:
+    -----------
+    attacked : Bitboard
+        Coordinates attacked.
+    hit : Bitboard
+        Coordinates attacked which hit a ship.
+    fleet : Tuple[Bitboard, ...]
+        Hits on each ship in fleet order.
+    sunk : int
+        Bit `i` is set if ship `i` of the fleet is sunk.
+    pending : Bitboard
+        Shots chosen this turn but not yet resolved.
+    """
+
+    __slots__ = ('attacked', 'hit', 'pending', '_board')
+
+    def __init__(self, board, pending: Bitboard = bitboard.BB_EMPTY) -> None:
+        self._board = board
+        self.attacked = board.attacked.mask
+        self.hit = board.hit.mask
+        self.pending = pending
+
+    @property
+    def fleet(self) -> Tuple[Bitboard, ...]:
+        return tuple(hits.mask for hits in self._board.ships.values())
+
+    @property
+    def sunk(self) -> int:
+        sunk = 0
+        for i, (mask, length) in enumerate(zip(self.fleet, self.lengths)):
+            if bitboard.popcount(mask) == length:
+                sunk |= 1 << i
+        return sunk
+
+    @property
+    def ships(self) -> Fleet:
+        """Return the fleet hunted."""
+        return self._board.fleet
+
+    @property
+    def lengths(self) -> Tuple[int, ...]:
+        """Return the length of each ship in fleet order."""
+        return self._board.fleet.lengths
+
+    @property
+    def unattacked(self) -> Bitboard:
+        """Return the coordinates not yet attacked."""
+        return ~(self.attacked | self.pending) & self._board.geometry.bb_all
+
+    def parity(self, colour: int) -> Bitboard:
+        """Return the coordinates of a colour of the checkerboard, ``0``
+        for odds and ``1`` for evens.
+        """
+        return self._board.geometry.parities[colour]
+
+    def remaining(self) -> List[int]:
+        """Return the fleet indices of the ships not yet sunk."""
+        sunk = self.sunk
+        return [i for i in range(len(self.lengths)) if not sunk >> i & 1]
+
+    def targets(self) -> Bitboard:
+        """Return the coordinates which could extend a wounded ship."""
+        return self._board.get_ship_attacks().mask & ~self.pending
+
+    def densest(self) -> Bitboard:
+        """Return the unattacked coordinates covered by the most placements
+        of ships not yet hit.
+        """
+        return self._board.max_ship_densities().mask & ~self.pending
+
+    def likeliest(self, samples: int = SAMPLES,
+                  budget: Optional[float] = None) -> Bitboard:
+        """Return the unattacked coordinates most likely to hold a ship,
+        exactly if the posterior is cheap enough, else from sampled fleet
+        layouts.
+        """
+        board = self._board
+        return (board.likeliest_attacks()
+                or board.likeliest_sampled_attacks(samples, budget)
+                ).mask & ~self.pending
+
+
+class Strategy(Protocol):
+    """The interface of an attack strategy."""
+
+    def new_game(self) -> None:
+        """Reset any per-game state."""
+
+    def choose(self, state: AttackState) -> Coordinate:
+        """Return the coordinate to attack."""
+
+
+StrategyFactory = Callable[..., Strategy]
+
+STRATEGIES: Dict[str, StrategyFactory] = {}
+
+
+def register(name: str) -> Callable[[StrategyFactory], StrategyFactory]:
+    """Register a strategy factory under `name`, replacing any of the same
+    name.
+    """
+    def decorator(factory: StrategyFactory) -> StrategyFactory:
+        STRATEGIES[name] = factory
+        return factory
+    return decorator
+
+
+def get_strategy(name: str, **options) -> Strategy:
+    """Build the strategy registered under `name` with `options`.
+
+    raises `ValueError` if no strategy is registered under `name`.
+    """
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {name}")
+    return STRATEGIES[name](**options)
+
+
+def level_strategy(level: int, samples: int = SAMPLES,
+                   budget: Optional[float] = None) -> Strategy:
+    """Build the strategy of a CPU level; `samples` and `budget` configure
+    the level 4 sampler.
+    """
+    if level == 4:
+        return get_strategy(LEVELS[level], samples=samples, budget=budget)
+    return get_strategy(LEVELS[level])
+
+
+def random_coordinate(mask: Bitboard) -> Coordinate:
+    """Return a random coordinate of a non-empty Bitboard."""
+    return random.choice(list(bitboard.scan_forward(mask)))
+
+
+class LevelStrategy(ABC):
+    """Base of the level strategies, which hunt on a random colour of the
+    checkerboard each game; see `AttackState.parity`.
+
+    Every level draws the colour, used or not, so that seeded games draw
+    the same random numbers whatever the levels playing.
+    """
+
+    level: Optional[int] = None
+
+    def __init__(self) -> None:
+        self.colour = 0
+
+    def new_game(self) -> None:
+        self.colour = random.randrange(2)
+
+    def choose(self, state: AttackState) -> Coordinate:
+        return random_coordinate(self.options(state))
+
+    @abstractmethod
+    def options(self, state: AttackState) -> Bitboard:
+        """Return the coordinates the strategy is willing to attack."""
+
+
+@register('random')
+class RandomStrategy(LevelStrategy):
+    """Attack any unattacked coordinate."""
+
+    level = 0
+
+    def options(self, state: AttackState) -> Bitboard:
+        return state.unattacked
+
+
+@register('target')
+class TargetStrategy(LevelStrategy):
+    """Attack around wounded ships, otherwise anywhere."""
+
+    level = 1
+
+    def options(self, state: AttackState) -> Bitboard:
+        return state.targets() or self.hunt(state)
+
+    def hunt(self, state: AttackState) -> Bitboard:
+        """Return the coordinates to attack when no ship is wounded."""
+        return state.unattacked
+
+
+@register('parity')
+class ParityStrategy(TargetStrategy):
+    """Attack around wounded ships, otherwise on the hunt colour."""
+
+    level = 2
+
+    def hunt(self, state: AttackState) -> Bitboard:
+        unattacked = state.unattacked
+        return (unattacked & state.parity(self.colour)) or unattacked
+
+
+@register('density')
+class DensityStrategy(TargetStrategy):
+    """Attack around wounded ships, otherwise where the most placements of
+    unhit ships fit, preferring the hunt colour.
+    """
+
+    level = 3
+
+    def hunt(self, state: AttackState) -> Bitboard:
+        densest = state.densest()
+        return ((densest & state.parity(self.colour)) or densest
+                or state.unattacked)
+
+
+@register('posterior')
+class PosteriorStrategy(DensityStrategy):
+    """Attack where a ship is likeliest, preferring the hunt colour.
+
+    Params
+    ------
+    samples : int
+        Layouts sampled per move when the exact posterior is too
+        expensive.
+    budget : float, optional
+        Seconds allowed for sampling layouts per move.
+    """
+
+    level = 4
+
+    def __init__(self, samples: int = SAMPLES,
+                 budget: Optional[float] = None) -> None:
+        super().__init__()
+        self.samples = samples
+        self.budget = budget
+
+    def options(self, state: AttackState) -> Bitboard:
+        likeliest = state.likeliest(self.samples, self.budget)
+        if likeliest:
+            return (likeliest & state.parity(self.colour)) or likeliest
+        return super().options(state)
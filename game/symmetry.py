@@ -0,0 +1,161 @@
+"""Module for the 8-fold dihedral symmetry of the board.
+
+The board is unchanged by its four rotations and four reflections.  A board
+state of attacked, hit and per-ship masks is mapped to the canonical member
+of its symmetry class, together with the transform which produced it, so a
+result computed once for the canonical state can be mapped back onto every
+symmetric state.
+"""
+import functools
+from typing import Callable, List, NamedTuple, Sequence, Tuple
+
+import game.bitboard as bitboard
+from game import tables
+from game.bitboard import Bitboard, Coordinate
+
+
+Transform = int
+
+TRANSFORM_NAMES = [
+    'identity',
+    'rotate_90',
+    'rotate_180',
+    'rotate_270',
+    'flip_vertical',
+    'flip_horizontal',
+    'flip_diagonal',
+    'flip_anti_diagonal',
+]
+IDENTITY = 0
+
+
+def rotate_90(bb: Bitboard) -> Bitboard:
+    """Rotates the board a quarter turn clockwise."""
+    return bitboard.flip_vertical(bitboard.flip_diagonal(bb))
+
+
+def rotate_180(bb: Bitboard) -> Bitboard:
+    """Rotates the board a half turn."""
+    return bitboard.flip_vertical(bitboard.flip_horizontal(bb))
+
+
+def rotate_270(bb: Bitboard) -> Bitboard:
+    """Rotates the board a quarter turn counterclockwise."""
+    return bitboard.flip_diagonal(bitboard.flip_vertical(bb))
+
+
+TRANSFORMS: List[Callable[[Bitboard], Bitboard]] = [
+    lambda bb: bb,
+    rotate_90,
+    rotate_180,
+    rotate_270,
+    bitboard.flip_vertical,
+    bitboard.flip_horizontal,
+    bitboard.flip_diagonal,
+    bitboard.flip_anti_diagonal,
+]
+
+
+@tables.table('coordinate_transforms')
+def _coordinate_transforms() -> List[List[Coordinate]]:
+    return [[bitboard.lsb(transform(bb)) for bb in bitboard.BB_COORDINATES]
+            for transform in TRANSFORMS]
+
+
+@tables.table('inverse_transforms')
+def _inverses() -> List[Transform]:
+    coordinate_transforms = tables.get('coordinate_transforms')
+    return [
+        next(u for u, undo in enumerate(coordinate_transforms)
+             if all(undo[coordinates[c]] == c for c in bitboard.COORDINATES))
+        for coordinates in coordinate_transforms
+    ]
+
+
+def transform(bb: Bitboard, t: Transform) -> Bitboard:
+    """Apply transform `t` to a Bitboard."""
+    return TRANSFORMS[t](bb)
+
+
+def transform_coordinate(coordinate: Coordinate, t: Transform) -> Coordinate:
+    """Apply transform `t` to a coordinate."""
+    return tables.get('coordinate_transforms')[t][coordinate]
+
+
+def inverse(t: Transform) -> Transform:
+    """Return the transform which undoes `t`."""
+    return tables.get('inverse_transforms')[t]
+
+
+def transform_values(values: Sequence, t: Transform) -> list:
+    """Move per-coordinate `values` (e.g. densities) by transform `t`."""
+    coordinates = tables.get('coordinate_transforms')[t]
+    moved = [None] * len(values)
+    for coordinate, value in enumerate(values):
+        moved[coordinates[coordinate]] = value
+    return moved
+
+
+@functools.lru_cache(maxsize=None)
+def placement_transforms(length: int) -> List[List[int]]:
+    """Return, for each transform, the placement index each placement of a
+    ship of `length` is moved to.
+    """
+    placements = bitboard.BB_PLACEMENTS[length]
+    index = {bb: i for i, bb in enumerate(placements)}
+    return [[index[t(bb)] for bb in placements] for t in TRANSFORMS]
+
+
+class BoardState(NamedTuple):
+    """Attacked, hit and per-ship masks of an attack board."""
+    attacked: Bitboard
+    hit: Bitboard
+    ships: Tuple[Bitboard, ...] = ()
+
+    def transform(self, t: Transform) -> 'BoardState':
+        """Return the state moved by transform `t`."""
+        apply = TRANSFORMS[t]
+        return BoardState(apply(self.attacked), apply(self.hit),
+                          tuple(apply(ship) for ship in self.ships))
+
+
+class Canonical(NamedTuple):
+    """The canonical member of a state's symmetry class.
+
+    `transform` moves the original state to `state`; apply
+    `inverse(transform)` to map results for `state` back.
+    """
+    state: BoardState
+    transform: Transform
+
+
+def canonicalize(attacked: Bitboard, hit: Bitboard,
+                 ships: Sequence[Bitboard] = ()) -> Canonical:
+    """Return the canonical form of a board state.
+
+    The canonical state is the least of the eight transformed states,
+    comparing attacked, then hit, then each ship mask in order.  Symmetric
+    states share a canonical state.
+    """
+    state = BoardState(attacked, hit, tuple(ships))
+    best = Canonical(state, IDENTITY)
+    for t in range(1, len(TRANSFORMS)):
+        moved = state.transform(t)
+        if moved < best.state:
+            best = Canonical(moved, t)
+    return best
+
+
+# Tables built on first use, by the module attribute names they replace.
+_LAZY_TABLES = {
+    'COORDINATE_TRANSFORMS': 'coordinate_transforms',
+    'INVERSES': 'inverse_transforms',
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_TABLES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = tables.get(_LAZY_TABLES[name])
+    globals()[name] = value
+    return value
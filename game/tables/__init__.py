@@ -0,0 +1,242 @@
+"""Module for the precomputed tables of the board.
+
+Rays, ship placements and symmetry maps are built on first use rather than
+on import, so processes which never touch a table never pay for it.  A table
+is loaded from the table file shipped with the package when the file holds
+it at the current `VERSION`, and computed by its registered builder
+otherwise.
+
+A table is an int, or a list nested to any depth whose leaves are
+non-negative ints.  The table file starts with a header of the magic bytes,
+format version and number of tables, followed by each table:
+
+    name        32 bytes  ASCII, NUL padded
+    depth       1 byte    levels of list nesting
+    typecode    1 byte    `array` typecode of the leaves, or 'W' for ints
+                          of up to 128 bits stored as two 'Q' words
+    size        4 bytes   bytes of zlib compressed data which follow
+
+The data holds, for each level of nesting, the number of lists as a 'I'
+word then each list's length as 'I' words, followed by the leaves.  Words
+are little-endian.
+
+Bump `VERSION` whenever a builder changes, and regenerate the file with
+``python -m game.tables``; ``--check`` compares the file with the builders.
+"""
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+
+MAGIC = b'BSHIPTBL'
+VERSION = 1
+FILE_HEADER = struct.Struct('<8sHH')
+TABLE_HEADER = struct.Struct('<32sBcI')
+
+# The table file, or None to always build tables.
+PATH: Optional[str] = os.path.join(os.path.dirname(__file__), 'tables.bin')
+
+Table = Union[int, list]
+
+_BUILDERS: Dict[str, Callable[[], Table]] = {}
+_TABLES: Dict[str, Table] = {}
+_stored: Optional[Dict[str, Tuple[int, bytes, bytes]]] = None
+
+
+def table(name: str) -> Callable[[Callable[[], Table]], Callable[[], Table]]:
+    """Register the builder of the table `name`."""
+    def decorator(builder: Callable[[], Table]) -> Callable[[], Table]:
+        _BUILDERS[name] = builder
+        return builder
+    return decorator
+
+
+def get(name: str) -> Table:
+    """Return the table `name`, loading or building it on first use."""
+    try:
+        return _TABLES[name]
+    except KeyError:
+        pass
+    value = _load(name)
+    if value is None:
+        value = _BUILDERS[name]()
+    _TABLES[name] = value
+    return value
+
+
+def names() -> List[str]:
+    """Return the names of the tables registered so far."""
+    return list(_BUILDERS)
+
+
+def loaded() -> List[str]:
+    """Return the names of the tables loaded or built so far."""
+    return list(_TABLES)
+
+
+def clear() -> None:
+    """Forget every loaded table, so each is loaded or built again."""
+    global _stored
+    _TABLES.clear()
+    _stored = None
+
+
+def _load(name: str) -> Optional[Table]:
+    """Return the table `name` from the table file, or None if the file
+    does not hold it.
+    """
+    global _stored
+    if _stored is None:
+        _stored = _read(PATH) if PATH is not None else {}
+    if name not in _stored:
+        return None
+    depth, typecode, data = _stored[name]
+    return decode(depth, typecode, zlib.decompress(data))
+
+
+def _read(path: str) -> Dict[str, Tuple[int, bytes, bytes]]:
+    """Index the tables of a table file by name, or return no tables if the
+    file is missing or of another version.
+    """
+    try:
+        with open(path, 'rb') as file:
+            buffer = file.read()
+    except OSError:
+        return {}
+    if len(buffer) < FILE_HEADER.size:
+        return {}
+    magic, version, count = FILE_HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        return {}
+    stored = {}
+    offset = FILE_HEADER.size
+    for _ in range(count):
+        name, depth, typecode, size = TABLE_HEADER.unpack_from(buffer, offset)
+        offset += TABLE_HEADER.size
+        stored[name.rstrip(b'\0').decode('ascii')] = (
+            depth, typecode, buffer[offset:offset + size])
+        offset += size
+    return stored
+
+
+def _array(typecode: str, data: bytes) -> array:
+    """Return an array of little-endian words."""
+    words = array(typecode, data)
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return words
+
+
+def _bytes(words: array) -> bytes:
+    """Return the little-endian bytes of an array."""
+    if sys.byteorder == 'big':
+        words = array(words.typecode, words)
+        words.byteswap()
+    return words.tobytes()
+
+
+def encode(value: Table) -> Tuple[int, bytes, bytes]:
+    """Encode a table to `(depth, typecode, data)`."""
+    depth = 0
+    levels = []
+    leaves = [value]
+    while leaves and isinstance(leaves[0], list):
+        levels.append(array('I', [len(items) for items in leaves]))
+        leaves = [item for items in leaves for item in items]
+        depth += 1
+    data = []
+    for lengths in levels:
+        data.append(_bytes(array('I', [len(lengths)])))
+        data.append(_bytes(lengths))
+    largest = max(leaves, default=0)
+    for typecode in 'BHIQ':
+        if largest < 1 << 8 * array(typecode).itemsize:
+            data.append(_bytes(array(typecode, leaves)))
+            break
+    else:
+        typecode = 'W'
+        if largest >> 128:
+            raise ValueError("Table leaves must fit in 128 bits")
+        low = (1 << 64) - 1
+        data.append(_bytes(array('Q', [leaf & low for leaf in leaves])))
+        data.append(_bytes(array('Q', [leaf >> 64 for leaf in leaves])))
+    return depth, typecode.encode('ascii'), b''.join(data)
+
+
+def decode(depth: int, typecode: bytes, data: bytes) -> Table:
+    """Decode a table encoded by `encode`."""
+    levels = []
+    offset = 0
+    for _ in range(depth):
+        count = _array('I', data[offset:offset + 4])[0]
+        offset += 4
+        lengths = _array('I', data[offset:offset + 4 * count])
+        offset += 4 * count
+        levels.append(lengths)
+    if typecode == b'W':
+        words = _array('Q', data[offset:])
+        half = len(words) // 2
+        leaves = [low | high << 64 if high else low
+                  for low, high in zip(words[:half], words[half:])]
+    else:
+        leaves = _array(typecode.decode('ascii'), data[offset:]).tolist()
+    for lengths in reversed(levels):
+        nested = []
+        start = 0
+        for length in lengths:
+            nested.append(leaves[start:start + length])
+            start += length
+        leaves = nested
+    return leaves[0]
+
+
+def build_all() -> Dict[str, Table]:
+    """Build every registered table with its builder, ignoring the table
+    file.
+    """
+    global _stored
+    _register_builders()
+    _TABLES.clear()
+    _stored = {}
+    return {name: get(name) for name in names()}
+
+
+def write(path: str) -> int:
+    """Build every registered table, write them to a table file and return
+    how many were written.
+    """
+    tables = build_all()
+    with open(path, 'wb') as file:
+        file.write(FILE_HEADER.pack(MAGIC, VERSION, len(tables)))
+        for name, value in tables.items():
+            depth, typecode, data = encode(value)
+            data = zlib.compress(data, 9)
+            file.write(TABLE_HEADER.pack(name.encode('ascii'), depth,
+                                         typecode, len(data)))
+            file.write(data)
+    return len(tables)
+
+
+def check(path: str) -> List[str]:
+    """Return the names of the registered tables which a table file is
+    missing or holds with contents other than their builder's.
+    """
+    stored = _read(path)
+    stale = []
+    for name, value in build_all().items():
+        if name not in stored:
+            stale.append(name)
+            continue
+        depth, typecode, data = stored[name]
+        if decode(depth, typecode, zlib.decompress(data)) != value:
+            stale.append(name)
+    return stale
+
+
+def _register_builders() -> None:
+    """Import the modules which register table builders."""
+    import game.bitboard  # noqa: F401
+    import game.symmetry  # noqa: F401
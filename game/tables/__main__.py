@@ -0,0 +1,35 @@
+"""Write, or check, the table file.
+
+Usage
+-----
+python -m game.tables [PATH] [--check]
+"""
+import argparse
+import sys
+
+from game import tables
+
+
+def main() -> int:
+    """Write, or check, the table file."""
+    parser = argparse.ArgumentParser(prog="python -m game.tables")
+    parser.add_argument("path", nargs="?", default=tables.PATH,
+                        help="table file (default: the packaged file)")
+    parser.add_argument("--check", action="store_true",
+                        help="exit 1 if the file is missing or has stale "
+                             "tables")
+    args = parser.parse_args()
+    if args.check:
+        stale = tables.check(args.path)
+        if stale:
+            print(f"Stale tables: {', '.join(stale)}")
+            return 1
+        print("Tables up to date")
+        return 0
+    written = tables.write(args.path)
+    print(f"Wrote {written} tables to {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
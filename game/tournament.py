@@ -0,0 +1,424 @@
+"""Module for tournaments between CPU configurations.
+
+Entrants are named CPU configurations in the `ENTRANTS` registry: one per
+level by default, to which any registered strategy, or a variant with other
+options such as a level 4 sample count or time budget, can be added with
+`register`.  Worker processes build each entrant's strategy by name, so a
+strategy registered outside `game.strategies` must be registered on import
+of its module.  A tournament plays every pairing of a round robin, or of one
+challenger against the field, in chunks on a pool of worker processes:
+
+- the entrants of a pairing take turns moving first;
+- each pairing stops once its sequential probability ratio test decides
+  which entrant is stronger (see `game.stats.SPRT`), or after its maximum
+  number of games;
+- the results of every pairing are fitted to Elo ratings with error bars.
+
+Chunks of a pairing are merged and tested in game order, so results do not
+depend on the number of workers.
+
+Usage
+-----
+python -m game.tournament [ENTRANT ...] [--gauntlet NAME] [--games N]
+"""
+import argparse
+import math
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import combinations
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from game.geometry import CLASSIC_GEOMETRY, Geometry
+from game.player import CPU
+from game.ship import CLASSIC_FLEET, Fleet
+from game.simulation import SimulationResult, play_cpus
+from game.stats import SPRT, Z_95, elo_difference
+from game.strategies import LEVELS, get_strategy
+
+
+GAMES = 2_000
+CHUNK_SIZE = 50
+# Each pairing counts as one drawn game more than it played, which keeps
+# the ratings of an entrant that wins or loses every game finite.
+PRIOR_DRAWS = 1
+
+Pairing = Tuple[str, str]
+
+
+class Entrant(NamedTuple):
+    """A named CPU configuration.
+
+    Attributes:
+    -----------
+    name : str
+        Name in the tournament.
+    strategy : str
+        Name of a registered attack strategy; see `game.strategies`.
+    options : Dict[str, object], optional
+        Keyword arguments for the strategy.
+    """
+    name: str
+    strategy: str
+    options: Optional[Dict[str, object]] = None
+
+    def cpu(self, fleet: Fleet = CLASSIC_FLEET,
+            geometry: Geometry = CLASSIC_GEOMETRY) -> CPU:
+        """Return a new CPU with this configuration placing `fleet` on
+        boards of `geometry`.
+        """
+        return CPU(self.name, strategy=get_strategy(self.strategy,
+                                                    **(self.options or {})),
+                   fleet=fleet, geometry=geometry)
+
+
+ENTRANTS: Dict[str, Entrant] = {}
+
+
+def register(entrant: Entrant) -> Entrant:
+    """Add an entrant to the registry, replacing any of the same name."""
+    ENTRANTS[entrant.name] = entrant
+    return entrant
+
+
+for _level, _strategy in enumerate(LEVELS):
+    register(Entrant(f'level{_level}', _strategy))
+
+
+def round_robin(names: List[str]) -> List[Pairing]:
+    """Return every pairing of the named entrants."""
+    return list(combinations(names, 2))
+
+
+def gauntlet(challenger: str, names: List[str]) -> List[Pairing]:
+    """Return the pairings of `challenger` against every other entrant."""
+    return [(challenger, name) for name in names if name != challenger]
+
+
+def play_pairing(entrants: Tuple[Entrant, Entrant], start: int, stop: int,
+                 seed: int, fleet: Fleet = CLASSIC_FLEET,
+                 geometry: Geometry = CLASSIC_GEOMETRY) -> SimulationResult:
+    """Play games numbered `start` up to `stop` of a pairing."""
+    return play_cpus([entrant.cpu(fleet, geometry) for entrant in entrants],
+                     start, stop, seed, alternate=True)
+
+
+class Match:
+    """The games of one pairing.
+
+    Attributes:
+    -----------
+    pairing : Pairing
+        Names of the two entrants.
+    fleet : Fleet
+        The ships each entrant places.
+    geometry : Geometry
+        The size of the boards.
+    result : SimulationResult
+        Games merged so far, indexed by entrant.
+    verdict : bool, optional
+        True if the SPRT found the first entrant stronger, False if the
+        second, None if undecided.
+    """
+
+    def __init__(self, pairing: Pairing, seed: int, games: int,
+                 chunk_size: int, sprt: SPRT,
+                 fleet: Fleet = CLASSIC_FLEET,
+                 geometry: Geometry = CLASSIC_GEOMETRY) -> None:
+        self.pairing = pairing
+        self.seed = seed
+        self.fleet = fleet
+        self.geometry = geometry
+        self.sprt = sprt
+        self.result = SimulationResult()
+        self.verdict: Optional[bool] = None
+        self.chunks = [(start, min(start + chunk_size, games))
+                       for start in range(0, games, chunk_size)]
+        self.submitted = 0
+        self._merged = 0
+        self._ready: Dict[int, SimulationResult] = {}
+
+    def finished(self) -> bool:
+        """Return True once no more games are needed."""
+        return self.verdict is not None or self._merged == len(self.chunks)
+
+    def next_chunk(self) -> Optional[Tuple[int, int, int]]:
+        """Return `(index, start, stop)` of the next chunk to play, or None
+        if every chunk has been handed out or the match is decided.
+        """
+        if self.verdict is not None or self.submitted == len(self.chunks):
+            return None
+        index = self.submitted
+        self.submitted += 1
+        return (index,) + self.chunks[index]
+
+    def add(self, index: int, chunk: SimulationResult) -> None:
+        """Add the results of chunk `index`, testing after each chunk merged
+        in order.
+        """
+        self._ready[index] = chunk
+        while self.verdict is None and self._merged in self._ready:
+            self.result.merge(self._ready.pop(self._merged))
+            self._merged += 1
+            self.verdict = self.sprt.decide(*self.result.wins)
+        if self.verdict is not None:
+            self._ready.clear()
+
+
+class Rating(NamedTuple):
+    """An entrant's Elo rating and its standard error."""
+    elo: float
+    stderr: float
+
+
+class TournamentResult:
+    """Results of a tournament.
+
+    Attributes:
+    -----------
+    names : List[str]
+        Entrant names.
+    matches : List[Match]
+        One per pairing.
+    """
+
+    def __init__(self, names: List[str], matches: List[Match]) -> None:
+        self.names = names
+        self.matches = matches
+
+    def games(self, name: str) -> int:
+        """Return the number of games played by an entrant."""
+        return sum(match.result.games for match in self.matches
+                   if name in match.pairing)
+
+    def wins(self, name: str) -> int:
+        """Return the number of games won by an entrant."""
+        return sum(match.result.wins[match.pairing.index(name)]
+                   for match in self.matches if name in match.pairing)
+
+    def ratings(self) -> Dict[str, Rating]:
+        """Return every entrant's rating; see `elo_ratings`."""
+        wins = {}
+        for match in self.matches:
+            for player, name in enumerate(match.pairing):
+                opponent = match.pairing[1 - player]
+                wins[name, opponent] = match.result.wins[player]
+        return elo_ratings(self.names, wins)
+
+    def report(self, z: float = Z_95) -> str:
+        """Return a table of ratings, with error bars of `z` standard
+        errors, followed by the result of every pairing.
+        """
+        ratings = self.ratings()
+        out = [f"{'':>4} {'Entrant':<16}{'Games':>7}{'Score':>8}"
+               f"{'Elo':>8}"]
+        ranked = sorted(self.names, key=lambda name: -ratings[name].elo)
+        for rank, name in enumerate(ranked, 1):
+            games = self.games(name)
+            score = self.wins(name) / games if games else 0.0
+            elo, stderr = ratings[name]
+            out.append(f"{rank:>4} {name:<16}{games:>7}{score:>8.1%}"
+                       f"{elo:>+8.0f} ± {z * stderr:.0f}")
+        out.append('')
+        for match in self.matches:
+            first, second = match.pairing
+            result = match.result
+            if match.verdict is None:
+                verdict = 'undecided'
+            else:
+                verdict = f'{first if match.verdict else second} stronger'
+            score = ((result.wins[0] + PRIOR_DRAWS)
+                     / (result.games + 2 * PRIOR_DRAWS))
+            out.append(f"{first} vs {second}: {result.wins[0]}-"
+                       f"{result.wins[1]} ({elo_difference(score):+.0f} "
+                       f"Elo), {verdict} after {result.games} games")
+        return '\n'.join(out)
+
+
+def elo_ratings(names: List[str], wins: Dict[Pairing, int],
+                tolerance: float = 1e-9,
+                max_iterations: int = 10_000) -> Dict[str, Rating]:
+    """Fit Elo ratings to game results.
+
+    Ratings are the maximum likelihood Bradley-Terry strengths, fitted by
+    minorization-maximization, on an Elo scale averaging zero.  Standard
+    errors come from the diagonal of the Fisher information.
+
+    PARAMS
+    ------
+    names : List[str]
+        Entrant names.
+    wins : Dict[Pairing, int]
+        Games won by the first entrant of each pair against the second.
+    """
+    games = {name: {} for name in names}
+    for (name, opponent), won in wins.items():
+        lost = wins.get((opponent, name), 0)
+        if won + lost:
+            games[name][opponent] = won + lost + 2 * PRIOR_DRAWS
+    scores = {name: sum(wins.get((name, opponent), 0) + PRIOR_DRAWS
+                        for opponent in games[name])
+              for name in names}
+
+    strength = dict.fromkeys(names, 1.0)
+    for _ in range(max_iterations):
+        change = 0.0
+        for name in names:
+            if not games[name]:
+                continue
+            denominator = sum(played / (strength[name] + strength[opponent])
+                              for opponent, played in games[name].items())
+            updated = scores[name] / denominator
+            change = max(change, abs(math.log(updated / strength[name])))
+            strength[name] = updated
+        mean = sum(math.log(value) for value in strength.values()) / len(names)
+        for name in names:
+            strength[name] /= math.exp(mean)
+        if change < tolerance:
+            break
+
+    scale = 400 / math.log(10)
+    ratings = {}
+    for name in names:
+        information = sum(
+            played * strength[name] * strength[opponent]
+            / (strength[name] + strength[opponent]) ** 2
+            for opponent, played in games[name].items())
+        stderr = scale / math.sqrt(information) if information else math.inf
+        ratings[name] = Rating(scale * math.log(strength[name]), stderr)
+    return ratings
+
+
+def tournament(names: List[str], pairings: Optional[List[Pairing]] = None,
+               games: int = GAMES, workers: Optional[int] = None,
+               seed: int = 0, chunk_size: int = CHUNK_SIZE,
+               sprt: Optional[SPRT] = None,
+               fleet: Fleet = CLASSIC_FLEET,
+               geometry: Geometry = CLASSIC_GEOMETRY) -> TournamentResult:
+    """Play a tournament between registered entrants.
+
+    PARAMS
+    ------
+    names : List[str]
+        Names of the entrants, from `ENTRANTS`.
+    pairings : List[Pairing], optional
+        Pairings to play, defaults to a round robin of `names`.
+    games : int
+        Maximum number of games per pairing.
+    workers : int, optional
+        Number of worker processes, defaults to the number of CPUs.  A
+        single worker plays every game in this process.
+    seed : int
+        Tournament seed from which every game's seed is derived.
+    chunk_size : int
+        Number of games handed to a worker at a time, and between tests.
+    sprt : SPRT, optional
+        The test applied to every pairing, defaults to `SPRT()`.
+    fleet : Fleet
+        The ships each entrant places.
+    geometry : Geometry
+        The size of the boards.
+
+    RETURNS
+    -------
+    result : TournamentResult
+    """
+    for name in names:
+        if name not in ENTRANTS:
+            raise ValueError(f"Unknown entrant: {name}")
+    if pairings is None:
+        pairings = round_robin(names)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if sprt is None:
+        sprt = SPRT()
+    matches = [Match(pairing, (seed << 16) + index, games, chunk_size, sprt,
+                     fleet, geometry)
+               for index, pairing in enumerate(pairings)]
+    if workers == 1:
+        for match in matches:
+            while not match.finished():
+                index, start, stop = match.next_chunk()
+                match.add(index, _play_chunk(match, start, stop))
+    else:
+        _play_matches(matches, workers)
+    return TournamentResult(list(names), matches)
+
+
+def _play_chunk(match: Match, start: int, stop: int) -> SimulationResult:
+    """Play one chunk of a match in this process."""
+    entrants = tuple(ENTRANTS[name] for name in match.pairing)
+    return play_pairing(entrants, start, stop, match.seed, match.fleet,
+                        match.geometry)
+
+
+def _play_matches(matches: List[Match], workers: int) -> None:
+    """Play every match on a pool of worker processes.
+
+    Chunks are handed out across the undecided matches in turn, keeping
+    each worker at most two chunks ahead.  Chunks still queued for a match
+    once it is decided are cancelled.
+    """
+    pending = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        turn = 0
+        while True:
+            while len(pending) < 2 * workers:
+                chunk = None
+                for _ in range(len(matches)):
+                    match = matches[turn % len(matches)]
+                    turn += 1
+                    chunk = match.next_chunk()
+                    if chunk is not None:
+                        break
+                if chunk is None:
+                    break
+                index, start, stop = chunk
+                entrants = tuple(ENTRANTS[name] for name in match.pairing)
+                future = pool.submit(play_pairing, entrants, start, stop,
+                                     match.seed, match.fleet, match.geometry)
+                pending[future] = match, index
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                match, index = pending.pop(future)
+                if future.cancelled():
+                    continue
+                match.add(index, future.result())
+                if match.verdict is not None:
+                    for other, (owner, _) in list(pending.items()):
+                        if owner is match and other.cancel():
+                            del pending[other]
+
+
+def main() -> int:
+    """Play a tournament and print the ratings."""
+    parser = argparse.ArgumentParser(prog="python -m game.tournament")
+    parser.add_argument("entrants", nargs="*", default=list(ENTRANTS),
+                        help="registered entrants (default: every level)")
+    parser.add_argument("--gauntlet", metavar="NAME",
+                        help="pair NAME against every other entrant only")
+    parser.add_argument("--games", type=int, default=GAMES,
+                        help="maximum games per pairing")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    names = list(dict.fromkeys(args.entrants))
+    pairings = None
+    if args.gauntlet is not None:
+        if args.gauntlet not in names:
+            names.insert(0, args.gauntlet)
+        pairings = gauntlet(args.gauntlet, names)
+    try:
+        result = tournament(names, pairings, args.games, args.workers,
+                            args.seed)
+    except ValueError as error:
+        parser.error(str(error))
+    print(result.report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
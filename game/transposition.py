@@ -0,0 +1,155 @@
+"""Module for the transposition cache of attack board queries.
+
+An attack board's pegs are hashed with Zobrist keys: one random 64-bit key
+per coordinate for a miss and per coordinate and ship for a hit, XORed
+together with a key per ship of the fleet hunted and a key for the size of
+the board.  Adding a peg updates the hash with a single XOR, and boards with
+the same pegs hash the same however the pegs were reached.
+
+Results of board queries are kept in a bounded LRU cache keyed by the query
+name and board hash, shared by every board in the process.
+"""
+import random
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from game.bitboard import COORDINATES, Bitboard, Coordinate
+from game.geometry import CLASSIC_GEOMETRY, Geometry
+from game.ship import MAX_COPIES, SHIPS, Fleet
+
+
+MAX_ENTRIES = 50_000
+
+_rng = random.Random(0x0ba77e5)
+# Row 0 keys misses, row ``1 + ship_type * MAX_COPIES + copy`` keys hits
+# on that copy of a ship type, so fleets repeating a type hash hits on each
+# copy apart.
+ZOBRIST = [[_rng.getrandbits(64) for _ in COORDINATES]
+           for _ in range(1 + len(SHIPS) * MAX_COPIES)]
+# Keys of each copy of each ship type in a fleet.
+FLEET_ZOBRIST = [[_rng.getrandbits(64) for _ in range(MAX_COPIES)]
+                 for _ in SHIPS]
+del _rng
+
+GeometryKeys = Tuple[int, List[List[int]]]
+
+_GEOMETRY_ZOBRIST: Dict[Geometry, GeometryKeys] = {}
+
+
+def geometry_zobrist(geometry: Geometry) -> GeometryKeys:
+    """Return the key of a board size and the keys of its coordinates,
+    laid out as `ZOBRIST`.
+
+    Boards of other sizes than 10x10 draw their keys on first use, from a
+    generator seeded by the size.
+    """
+    if geometry is CLASSIC_GEOMETRY:
+        return 0, ZOBRIST
+    try:
+        return _GEOMETRY_ZOBRIST[geometry]
+    except KeyError:
+        pass
+    rng = random.Random(f'zobrist {geometry}')
+    keys = (rng.getrandbits(64),
+            [[rng.getrandbits(64) for _ in geometry.coordinates]
+             for _ in range(1 + len(SHIPS) * MAX_COPIES)])
+    _GEOMETRY_ZOBRIST[geometry] = keys
+    return keys
+
+
+def zobrist_key(coordinate: Coordinate, ship_type: Optional[int],
+                geometry: Geometry = CLASSIC_GEOMETRY, copy: int = 0) -> int:
+    """Return the Zobrist key of a miss (`ship_type` None) or of a hit on
+    copy `copy` of `ship_type` at `coordinate`.
+    """
+    keys = ZOBRIST
+    if geometry is not CLASSIC_GEOMETRY:
+        keys = geometry_zobrist(geometry)[1]
+    if ship_type is None:
+        return keys[0][coordinate]
+    return keys[1 + ship_type * MAX_COPIES + copy][coordinate]
+
+
+def fleet_key(fleet: Fleet, geometry: Geometry = CLASSIC_GEOMETRY) -> int:
+    """Return the Zobrist key of a fleet, the hash of a board of `geometry`
+    hunting it before any peg is added.
+    """
+    key = geometry_zobrist(geometry)[0]
+    for ship in fleet:
+        key ^= FLEET_ZOBRIST[ship.ship_type()][ship.copy]
+    return key
+
+
+CacheKey = Tuple[str, int]
+
+
+class TranspositionCache:
+    """A bounded LRU cache of board query results.
+
+    Each entry also stores the attacked and hit masks of its board, so the
+    rare boards whose hashes collide are treated as misses rather than
+    answered wrongly.
+
+    Attributes:
+    -----------
+    maxsize : int
+        Maximum number of entries before the least recently used entry is
+        evicted.
+    hits : int
+        Lookups answered from the cache.
+    misses : int
+        Lookups not found in the cache.
+    evictions : int
+        Entries evicted to stay within `maxsize`.
+    """
+
+    def __init__(self, maxsize: int = MAX_ENTRIES) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey, attacked: Bitboard, hit: Bitboard):
+        """Return the cached result for `key`, or None."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != attacked or entry[1] != hit:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: CacheKey, attacked: Bitboard, hit: Bitboard,
+            value) -> None:
+        """Cache the result of `key`, evicting the least recently used
+        entries beyond `maxsize`.
+        """
+        self._entries[key] = (attacked, hit, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the cache counters and size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self),
+            "maxsize": self.maxsize,
+        }
+
+
+TRANSPOSITIONS = TranspositionCache()
@@ -0,0 +1,344 @@
+"""Module for simulating thousands of CPU vs CPU games in lockstep.
+
+Every game's boards are stored in NumPy arrays with each 100-bit Bitboard
+split into two ``uint64`` lanes (coordinates 0-63 and 64-99).  A half-turn
+is one vectorized step over all unfinished games: choose shots, resolve them
+against the defender's fleet and retire the games which have been won.
+
+Only CPU levels 0 to 3 are supported.  The random number stream differs from
+`game.simulation`, so results agree statistically rather than game by game.
+
+NumPy is an optional dependency and is only required by this module.
+"""
+import time
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+import game.bitboard as bitboard
+from game.ship import SHIP_LENGTHS
+from game.simulation import SimulationResult
+
+
+MAX_HALF_TURNS = 200
+LEVELS = range(4)
+
+_LANE_MASK = 0xffff_ffff_ffff_ffff
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("game.vectorized requires numpy")
+
+
+def to_lanes(bb: bitboard.Bitboard) -> 'np.ndarray':
+    """Split a Bitboard into its two ``uint64`` lanes."""
+    _require_numpy()
+    return np.array([bb & _LANE_MASK, bb >> 64], dtype=np.uint64)
+
+
+def from_lanes(lanes: 'np.ndarray') -> bitboard.Bitboard:
+    """Join two ``uint64`` lanes back into a Bitboard."""
+    return int(lanes[0]) | int(lanes[1]) << 64
+
+
+if np is not None:
+    _ALL = to_lanes(bitboard.BB_ALL)
+    _NOT_COL_A = to_lanes(bitboard.BB_ALL & ~bitboard.BB_COL_A)
+    _NOT_COL_J = to_lanes(bitboard.BB_ALL & ~bitboard.BB_COL_J)
+    _PARITIES = np.stack([to_lanes(bitboard.BB_ODDS),
+                          to_lanes(bitboard.BB_EVENS)])
+    _BB_COORDINATES = np.stack([to_lanes(bb)
+                                for bb in bitboard.BB_COORDINATES])
+    _LANE_OF = np.array([c // 64 for c in bitboard.COORDINATES])
+    _SHIFT_OF = np.array([c % 64 for c in bitboard.COORDINATES],
+                         dtype=np.uint64)
+    _SHIP_LENGTHS = np.array(SHIP_LENGTHS)
+
+
+def popcount(lanes: 'np.ndarray') -> 'np.ndarray':
+    """Count the set bits of each board, summed over the lanes."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(lanes).sum(axis=-1, dtype=np.int64)
+    x = lanes - ((lanes >> np.uint64(1)) & np.uint64(0x5555_5555_5555_5555))
+    x = ((x & np.uint64(0x3333_3333_3333_3333))
+         + ((x >> np.uint64(2)) & np.uint64(0x3333_3333_3333_3333)))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0f0f_0f0f_0f0f_0f0f)
+    x = (x * np.uint64(0x0101_0101_0101_0101)) >> np.uint64(56)
+    return x.sum(axis=-1, dtype=np.int64)
+
+
+def _any(lanes: 'np.ndarray') -> 'np.ndarray':
+    return (lanes[..., 0] | lanes[..., 1]) != 0
+
+
+def _shift_up(lanes: 'np.ndarray', k: int) -> 'np.ndarray':
+    """Shift boards towards higher coordinates by `k` bits."""
+    out = np.empty_like(lanes)
+    out[..., 1] = ((lanes[..., 1] << np.uint64(k))
+                   | (lanes[..., 0] >> np.uint64(64 - k)))
+    out[..., 0] = lanes[..., 0] << np.uint64(k)
+    return out & _ALL
+
+
+def _shift_down(lanes: 'np.ndarray', k: int) -> 'np.ndarray':
+    """Shift boards towards lower coordinates by `k` bits."""
+    out = np.empty_like(lanes)
+    out[..., 0] = ((lanes[..., 0] >> np.uint64(k))
+                   | (lanes[..., 1] << np.uint64(64 - k)))
+    out[..., 1] = lanes[..., 1] >> np.uint64(k)
+    return out
+
+
+def _east(lanes: 'np.ndarray') -> 'np.ndarray':
+    return _shift_up(lanes, 1) & _NOT_COL_A
+
+
+def _west(lanes: 'np.ndarray') -> 'np.ndarray':
+    return _shift_down(lanes, 1) & _NOT_COL_J
+
+
+def _north(lanes: 'np.ndarray') -> 'np.ndarray':
+    return _shift_up(lanes, 10)
+
+
+def _south(lanes: 'np.ndarray') -> 'np.ndarray':
+    return _shift_down(lanes, 10)
+
+
+def to_bits(lanes: 'np.ndarray') -> 'np.ndarray':
+    """Expand boards of shape ``(n, 2)`` to booleans of shape ``(n, 100)``."""
+    return ((lanes[:, _LANE_OF] >> _SHIFT_OF) & np.uint64(1)).astype(bool)
+
+
+def from_bits(bits: 'np.ndarray') -> 'np.ndarray':
+    """Pack booleans of shape ``(n, 100)`` into boards of shape ``(n, 2)``."""
+    padded = np.zeros((bits.shape[0], 128), dtype=bool)
+    padded[:, :bits.shape[1]] = bits
+    packed = np.packbits(padded, axis=1, bitorder='little')
+    return packed.view('<u8').astype(np.uint64)
+
+
+def _placement_tables(length: int):
+    """Return placement lanes and a placement by coordinate matrix."""
+    masks = bitboard.BB_PLACEMENTS[length]
+    lanes = np.stack([to_lanes(bb) for bb in masks])
+    cells = np.array([[bool(bb & bb_coord)
+                       for bb_coord in bitboard.BB_COORDINATES]
+                      for bb in masks], dtype=np.int32)
+    return lanes, cells
+
+
+def _choose(options: 'np.ndarray', rng) -> 'np.ndarray':
+    """Choose a random coordinate from each board in `options`."""
+    keys = rng.random((options.shape[0], len(bitboard.COORDINATES)),
+                      dtype=np.float32)
+    keys[~to_bits(options)] = -1.0
+    return keys.argmax(axis=1)
+
+
+def random_fleets(num_games: int, rng) -> 'np.ndarray':
+    """Place a random fleet for each game.
+
+    Each ship in turn is placed uniformly among the placements which do not
+    overlap the ships already placed in that game.
+
+    RETURNS
+    -------
+    fleets : np.ndarray
+        Per-ship masks of shape ``(num_games, ships, 2)``.
+    """
+    _require_numpy()
+    fleets = np.zeros((num_games, len(SHIP_LENGTHS), 2), dtype=np.uint64)
+    occupied = np.zeros((num_games, 2), dtype=np.uint64)
+    for ship, length in enumerate(SHIP_LENGTHS):
+        lanes, _ = _placement_tables(length)
+        legal = ~_any(lanes[None, :, :] & occupied[:, None, :])
+        keys = rng.random(legal.shape)
+        keys[~legal] = -1.0
+        fleets[:, ship] = lanes[keys.argmax(axis=1)]
+        occupied |= fleets[:, ship]
+    return fleets
+
+
+def fleets_from_layouts(layouts: Sequence[int]) -> 'np.ndarray':
+    """Convert a flat array of placement indices from
+    `game.layouts.random_layouts` to per-ship masks of shape
+    ``(layouts, ships, 2)``.
+    """
+    _require_numpy()
+    indices = np.asarray(layouts).reshape(-1, len(SHIP_LENGTHS))
+    fleets = np.empty(indices.shape + (2,), dtype=np.uint64)
+    for ship, length in enumerate(SHIP_LENGTHS):
+        lanes, _ = _placement_tables(length)
+        fleets[:, ship] = lanes[indices[:, ship]]
+    return fleets
+
+
+def ship_attacks(attacked: 'np.ndarray', fleets: 'np.ndarray') -> 'np.ndarray':
+    """Vectorized `AttackBoard.get_ship_attacks`.
+
+    Known hits of each ship are filled into the ray between the outermost
+    hits; the candidates are the unattacked neighbours of that ray along the
+    ship's axis (both axes after a single hit), or just the gaps in the ray
+    once it spans the whole ship.
+
+    PARAMS
+    ------
+    attacked : np.ndarray
+        Attacked boards of shape ``(n, 2)``.
+    fleets : np.ndarray
+        Defending per-ship masks of shape ``(n, ships, 2)``.
+    """
+    known = fleets & attacked[:, None, :]
+    hits = popcount(known)
+    games, ships = np.nonzero((hits > 0) & (hits < _SHIP_LENGTHS))
+    targets = np.zeros_like(attacked)
+    if not games.size:
+        return targets
+    known = known[games, ships]
+    hits = hits[games, ships]
+    lengths = _SHIP_LENGTHS[ships]
+
+    rays = []
+    axes = []
+    for forward, backward in [(_east, _west), (_north, _south)]:
+        ahead = [known]
+        behind = [known]
+        for _ in range(4):
+            ahead.append(forward(ahead[-1]))
+            behind.append(backward(behind[-1]))
+        rays.append((ahead[0] | ahead[1] | ahead[2] | ahead[3])
+                    & (behind[0] | behind[1] | behind[2] | behind[3]))
+        axes.append(_any(known & (ahead[1] | ahead[2] | ahead[3]
+                                  | ahead[4])))
+    ray = rays[0] | rays[1]
+    single = hits == 1
+    horizontal = (axes[0] | single)[:, None]
+    vertical = (axes[1] | single)[:, None]
+
+    zero = np.uint64(0)
+    neighbours = (np.where(horizontal, _east(ray) | _west(ray), zero)
+                  | np.where(vertical, _north(ray) | _south(ray), zero))
+    spanned = (popcount(ray) >= lengths)[:, None]
+    candidates = np.where(spanned, ray & ~known, neighbours)
+    candidates &= ~attacked[games]
+    np.bitwise_or.at(targets, games, candidates)
+    return targets
+
+
+def max_densities(attacked: 'np.ndarray', fleets: 'np.ndarray',
+                  tables) -> 'np.ndarray':
+    """Vectorized `AttackBoard.max_ship_densities`."""
+    unhit = popcount(fleets & attacked[:, None, :]) == 0
+    counts = np.zeros((attacked.shape[0], len(bitboard.COORDINATES)),
+                      dtype=np.int64)
+    for length, (lanes, cells) in tables.items():
+        weight = unhit[:, _SHIP_LENGTHS == length].sum(axis=1)
+        if not weight.any():
+            continue
+        legal = ~_any(lanes[None, :, :] & attacked[:, None, :])
+        counts += (legal * weight[:, None]).astype(np.int32) @ cells
+    counts[to_bits(attacked)] = 0
+    best = counts.max(axis=1, keepdims=True)
+    return from_bits((counts == best) & (counts > 0))
+
+
+def attack_options(level: int, attacked: 'np.ndarray', fleets: 'np.ndarray',
+                   strat: 'np.ndarray', tables=None) -> 'np.ndarray':
+    """Vectorized `LevelStrategy.options` for one CPU level."""
+    options = ~attacked & _ALL
+    if level == 0:
+        return options
+    targets = ship_attacks(attacked, fleets)
+    if level == 3:
+        densest = max_densities(attacked, fleets, tables)
+        preferred = densest & strat
+        densest = np.where(_any(preferred)[:, None], preferred, densest)
+        options = np.where(_any(densest)[:, None], densest, options)
+    elif level == 2:
+        preferred = options & strat
+        options = np.where(_any(preferred)[:, None], preferred, options)
+    return np.where(_any(targets)[:, None], targets, options)
+
+
+def simulate(cpu1_lvl: int, cpu2_lvl: int, num_games: int,
+             seed: Optional[int] = 0,
+             layouts: Optional[Sequence[int]] = None) -> SimulationResult:
+    """Simulate `num_games` games between two CPU levels in lockstep.
+
+    PARAMS
+    ------
+    cpu1_lvl : int
+        Level of the CPU which moves first.
+    cpu2_lvl : int
+        Level of the CPU which moves second.
+    num_games : int
+        Number of games to play.
+    seed : int, optional
+        Seed for NumPy's random generator.
+    layouts : Sequence[int], optional
+        Placement indices from `game.layouts.random_layouts` for two fleets
+        per game, the first CPU's fleet first.  Fleets are drawn with NumPy
+        if not given.
+
+    RETURNS
+    -------
+    result : SimulationResult
+    """
+    _require_numpy()
+    levels: List[int] = [cpu1_lvl, cpu2_lvl]
+    for level in levels:
+        if level not in LEVELS:
+            raise ValueError(f"Unsupported vectorized CPU level: {level}")
+    tables = None
+    if 3 in levels:
+        tables = {length: _placement_tables(length)
+                  for length in set(SHIP_LENGTHS)}
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    if layouts is None:
+        fleets = np.stack([random_fleets(num_games, rng) for _ in levels])
+    else:
+        fleets = fleets_from_layouts(layouts).reshape(
+            num_games, len(levels), len(SHIP_LENGTHS), 2).swapaxes(0, 1)
+    occupied = np.bitwise_or.reduce(fleets, axis=2)
+    strat = _PARITIES[rng.integers(0, 2, size=(len(levels), num_games))]
+    # attacked[d] holds the shots fired at player d's board.
+    attacked = np.zeros((len(levels), num_games, 2), dtype=np.uint64)
+
+    result = SimulationResult()
+    active = np.arange(num_games)
+    half_turns = 0
+    while active.size and half_turns < MAX_HALF_TURNS:
+        attacker = half_turns & 1
+        defender = attacker ^ 1
+        board = attacked[defender, active]
+        options = attack_options(levels[attacker], board,
+                                 fleets[defender, active],
+                                 strat[attacker, active], tables)
+        board |= _BB_COORDINATES[_choose(options, rng)]
+        attacked[defender, active] = board
+
+        won = ~_any(occupied[defender, active] & ~board)
+        wins = int(won.sum())
+        result.wins[attacker] += wins
+        for _ in range(wins):
+            # The first CPU always moves first.
+            result.add_game(attacker, half_turns // 2 + 1, 0)
+        active = active[~won]
+        half_turns += 1
+    result.games += active.size
+    result.turns += active.size * (MAX_HALF_TURNS // 2 + 1)
+
+    for player in range(len(levels)):
+        board = attacked[player ^ 1]
+        result.hits[player] = int(popcount(board & occupied[player ^ 1])
+                                  .sum())
+        result.attacks[player] = int(popcount(board).sum())
+    result.runtime = time.perf_counter() - start
+    return result
@@ -4,10 +4,11 @@ from __future__ import annotations
 
 import os
 import sys
-
-from datetime import datetime
+from typing import Optional
 
 from game import CPU, Human, Player, Battleship
+from game.simulation import simulate
+from game.stats import Z_STOP, format_interval
 
 
 BANNER = """
@@ -28,20 +29,26 @@ POSTGAME_OPTIONS = """
 def _get_num_games() -> int:
     """Get number of simulated games to play."""
     num_games = -1
-    print('How many games to simulate? (1 - 999)')
-    while num_games not in range(1, 1000):
+    print('How many games to simulate?')
+    while not isinstance(num_games, int) or num_games < 1:
         num_games = input('>> ')
         if num_games.isnumeric():
             num_games = int(num_games)
     return num_games
 
 
+def _get_early_stop() -> bool:
+    """Ask user whether to stop once the CPUs are told apart."""
+    answer = input('Stop early once the result is clear? (y/N) ')
+    return answer.strip().upper() == 'Y'
+
+
 def _get_cpu_level(cpu_name: str) -> int:
     """Ask user what level difficulty for CPU player."""
     cpu_level = -1
     print(f'Choose difficulty level for {cpu_name}')
-    print('Dunce: 0 | Easy: 1 | Medium: 2 | Hard: 3')
-    while cpu_level not in range(4):
+    print('Dunce: 0 | Easy: 1 | Medium: 2 | Hard: 3 | Expert: 4')
+    while cpu_level not in range(5):
         cpu_level = input('>> ')
         if cpu_level.isnumeric():
             cpu_level = int(cpu_level)
@@ -62,7 +69,8 @@ def welcome() -> str:
     elif game_type == 'S':
         p1_lvl = _get_cpu_level('cpu_p1')
         p2_lvl = _get_cpu_level('cpu_p2')
-        battle(p1_lvl, p2_lvl, num_games=_get_num_games())
+        battle(p1_lvl, p2_lvl, num_games=_get_num_games(),
+               early_stop=_get_early_stop())
     else:
         welcome()
 
@@ -112,32 +120,59 @@ def play(player1: Player, player2: Player) -> None:
                 break
 
 
-def battle(cpu1_lvl: int, cpu2_lvl: int, num_games: int):
-    """Battle them bots!"""
+def battle(cpu1_lvl: int, cpu2_lvl: int, num_games: int,
+           workers: Optional[int] = None, seed: int = 0,
+           timed: bool = True, record: Optional[str] = None,
+           alternate: bool = False, early_stop: bool = False):
+    """Battle them bots!
+
+    With `timed`, also report move latency percentiles and the share of
+    time spent in each phase, per CPU level.  With `record`, stream a
+    record of every game to that file.  With `alternate`, the CPUs take
+    turns moving first.  With `early_stop`, stop as soon as the win rates
+    or turns to win of the two CPUs are statistically resolved.
+    """
     if num_games < 0:
         sys.exit('Invalid number of games')
     cpu_1 = CPU(f'cpu1 lvl: {cpu1_lvl}', level=cpu1_lvl)
     cpu_2 = CPU(f'cpu2 lvl: {cpu2_lvl}', level=cpu2_lvl)
 
-    played = 0
-    total_turns = 0
-    total_runtime = 0
     print(f'Simulating {num_games} games...')
-    while played < num_games:
-        played += 1
-        start = datetime.now()
-        game = Battleship(cpu_1, cpu_2)
-        winner, loser = game.play_game()
-        runtime = datetime.now() - start
-        winner.win()
-        loser.lose()
-        total_turns += len(game.log)
-        total_runtime += runtime.total_seconds()
-
-    avg_turns = total_turns / num_games
-    avg_runtime = total_runtime / num_games
+    result = simulate(cpu1_lvl, cpu2_lvl, num_games, workers=workers,
+                      seed=seed, timed=timed, record=record,
+                      alternate=alternate,
+                      stop_z=Z_STOP if early_stop else None)
+    for player, cpu in enumerate([cpu_1, cpu_2]):
+        cpu.wins = result.wins[player]
+        cpu.losses = result.losses(player)
+        cpu.hits = result.hits[player]
+        cpu.attacks = result.attacks[player]
+
+    avg_turns = result.avg_turns()
+    avg_runtime = result.avg_runtime()
     print(cpu_1, '--', cpu_2)
     print(f'avg_turns: {avg_turns} - avg_runtime: {avg_runtime}')
+    turns = result.turn_stats
+    histogram = result.turn_histogram
+    print(f'turns: {turns.mean:.1f} +/- {turns.stdev():.1f} '
+          f'(p10 {histogram.percentile(10)}, p50 {histogram.percentile(50)},'
+          f' p90 {histogram.percentile(90)})')
+    for player, cpu in enumerate([cpu_1, cpu_2]):
+        win_turns = result.win_turns[player]
+        print(f'{cpu.name} win rate: {cpu.wins / result.games:.1%} '
+              f'{format_interval(result.win_interval(player))} - '
+              f'turns to win: {win_turns.mean:.1f} '
+              f'+/- {win_turns.stderr():.1f}')
+    print(f'first mover win rate: '
+          f'{result.first_mover_wins / result.games:.1%} '
+          f'{format_interval(result.first_mover_interval())}')
+    if result.games < num_games:
+        print(f'Stopped after {result.games} games: '
+              f'{result.resolved(Z_STOP)} resolved')
+    if result.timings is not None:
+        print(result.timings.report())
+    if record is not None:
+        print(f'Recorded {result.games} games to {record}')
 
 
 if __name__ == '__main__':